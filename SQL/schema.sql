@@ -190,6 +190,195 @@ CREATE TABLE IF NOT EXISTS CourseAggDaily (
     ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+/*
+ * 4b. 表级版本号（写入计数，用于 API 的 ETag 协商缓存）；
+ *     业务事务提交后再以独立短事务递增，写入方不会在事务内排队等待本表行锁
+ */
+CREATE TABLE IF NOT EXISTS TableVersion (
+  TableName VARCHAR(64) NOT NULL PRIMARY KEY,
+  Version   BIGINT      NOT NULL DEFAULT 0,
+  UpdatedAt DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO TableVersion (TableName, Version) VALUES
+('TermDict',0),('Department',0),('Student',0),('Course',0),('Teacher',0),
+('Classroom',0),('Teaching',0),('SC',0),('GradeScale',0),('CourseAggDaily',0);
+
+/*
+ * 4c. 操作日志（追加写入）与按小时汇总，供仪表盘 CRUD 热力图读取
+ */
+CREATE TABLE IF NOT EXISTS OperationLog (
+  LogID      BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  TableName  VARCHAR(64) NOT NULL,
+  Operation  VARCHAR(10) NOT NULL,
+  RecordKey  VARCHAR(100) NULL,
+  OccurredAt DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT ck_operationlog_op CHECK (Operation IN ('create','read','update','delete')),
+  INDEX idx_operationlog_time (OccurredAt)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS OperationRollup (
+  TableName VARCHAR(64) NOT NULL,
+  Operation VARCHAR(10) NOT NULL,
+  HourStart DATETIME    NOT NULL,
+  Count     BIGINT      NOT NULL DEFAULT 0,
+  UpdatedAt DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (TableName, Operation, HourStart),
+  INDEX idx_operationrollup_hour (HourStart),
+  INDEX idx_operationrollup_updated (UpdatedAt)
+) ENGINE=InnoDB;
+
+/*
+ * 4d. 选课事件发件箱：与选课写入同一事务追加，各 worker 轮询后推送给 SSE 订阅者
+ */
+CREATE TABLE IF NOT EXISTS EnrollmentEvent (
+  EventID    BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Kind       VARCHAR(10)  NOT NULL,
+  Sno        VARCHAR(12)  NOT NULL,
+  Cno        VARCHAR(10)  NOT NULL,
+  Status     VARCHAR(10)  NULL,
+  Grade      DECIMAL(5,2) NULL,
+  EnrollDate DATETIME     NULL,
+  CreatedAt  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT ck_enrollmentevent_kind CHECK (Kind IN ('created','updated','dropped','deleted')),
+  INDEX idx_enrollmentevent_created (CreatedAt)
+) ENGINE=InnoDB;
+
+/*
+ * 4e. 变更发件箱：与业务写入同一事务追加（表名、主键、操作、写入时的表版本），
+ *     各 worker 以高水位轮询后分发给缓存失效、检索索引等订阅者
+ */
+CREATE TABLE IF NOT EXISTS ChangeOutbox (
+  ChangeID  BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  TableName VARCHAR(64)  NOT NULL,
+  RecordKey VARCHAR(100) NULL,
+  Operation VARCHAR(10)  NOT NULL,
+  Version   BIGINT       NOT NULL,
+  CreatedAt DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT ck_changeoutbox_op CHECK (Operation IN ('create','update','delete')),
+  INDEX idx_changeoutbox_created (CreatedAt)
+) ENGINE=InnoDB;
+
+/*
+ * 4f. 开课名额计数（课程 + 学年 + 学期）：Capacity 为该学期各授课安排容量之和，
+ *     Taken 为占用名额的选课数（enrolled/completed），选课事务内以条件 UPDATE 原子递增
+ */
+CREATE TABLE IF NOT EXISTS OfferingSeat (
+  Cno       VARCHAR(10) NOT NULL,
+  YearTaken INT         NOT NULL,
+  Term      VARCHAR(10) NOT NULL,
+  Capacity  INT         NOT NULL,
+  Taken     INT         NOT NULL DEFAULT 0,
+  UpdatedAt DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (Cno, YearTaken, Term),
+  CONSTRAINT ck_offeringseat_taken CHECK (Taken >= 0)
+) ENGINE=InnoDB;
+
+/*
+ * 4g. 满员开课的候补队列：同一开课（课程 + 学年 + 学期）内按 WaitID 先进先出，
+ *     有名额释放时由后台任务批量校验先修课后转为正式选课
+ */
+CREATE TABLE IF NOT EXISTS Waitlist (
+  WaitID    BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Sno       VARCHAR(12) NOT NULL,
+  Cno       VARCHAR(10) NOT NULL,
+  YearTaken INT         NOT NULL,
+  Term      VARCHAR(10) NOT NULL,
+  JoinedAt  DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT uq_waitlist_student_course UNIQUE (Sno, Cno),
+  CONSTRAINT fk_waitlist_student FOREIGN KEY (Sno) REFERENCES Student(Sno)
+    ON UPDATE CASCADE ON DELETE CASCADE,
+  CONSTRAINT fk_waitlist_course FOREIGN KEY (Cno) REFERENCES Course(Cno)
+    ON UPDATE CASCADE ON DELETE CASCADE,
+  CONSTRAINT fk_waitlist_term FOREIGN KEY (Term) REFERENCES TermDict(TermCode)
+    ON UPDATE CASCADE ON DELETE RESTRICT,
+  INDEX idx_waitlist_offering (Cno, YearTaken, Term, WaitID)
+) ENGINE=InnoDB;
+
+/*
+ * 4h. 选课抽签轮次：窗口期内收集学生按志愿排序的选课申请，截止后按入学年份优先、
+ *     同年按固定种子抽签的顺序一次性分配所有开课的名额；AllocationResult 每名学生一行，
+ *     Outcomes 按志愿顺序每个字符记录一条志愿的结果；分配开始时以条件更新把 Status
+ *     从 open 改为 allocating 认领轮次，同一轮次只会有一个分配进程
+ */
+CREATE TABLE IF NOT EXISTS RegistrationRound (
+  RoundID     BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  YearTaken   INT         NOT NULL,
+  Term        VARCHAR(10) NOT NULL,
+  Seed        BIGINT      NOT NULL,
+  MaxCourses  SMALLINT    NOT NULL DEFAULT 5,
+  Status      VARCHAR(10) NOT NULL DEFAULT 'open',
+  CreatedAt   DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  AllocatedAt DATETIME    NULL,
+  CONSTRAINT ck_registrationround_status CHECK (Status IN ('open','allocating','allocated')),
+  CONSTRAINT fk_registrationround_term FOREIGN KEY (Term) REFERENCES TermDict(TermCode)
+    ON UPDATE CASCADE ON DELETE RESTRICT
+) ENGINE=InnoDB;
+-- 早先建立的库状态约束不含 allocating：重建约束，重复执行本脚本即可升级
+ALTER TABLE RegistrationRound DROP CHECK ck_registrationround_status;
+ALTER TABLE RegistrationRound
+  ADD CONSTRAINT ck_registrationround_status CHECK (Status IN ('open','allocating','allocated'));
+
+CREATE TABLE IF NOT EXISTS CourseRequest (
+  RoundID    BIGINT      NOT NULL,
+  Sno        VARCHAR(12) NOT NULL,
+  ChoiceRank SMALLINT    NOT NULL,
+  Cno        VARCHAR(10) NOT NULL,
+  PRIMARY KEY (RoundID, Sno, ChoiceRank),
+  CONSTRAINT uq_courserequest_course UNIQUE (RoundID, Sno, Cno),
+  CONSTRAINT ck_courserequest_rank CHECK (ChoiceRank >= 1),
+  CONSTRAINT fk_courserequest_round FOREIGN KEY (RoundID) REFERENCES RegistrationRound(RoundID)
+    ON DELETE CASCADE,
+  CONSTRAINT fk_courserequest_student FOREIGN KEY (Sno) REFERENCES Student(Sno)
+    ON UPDATE CASCADE ON DELETE CASCADE,
+  CONSTRAINT fk_courserequest_course FOREIGN KEY (Cno) REFERENCES Course(Cno)
+    ON UPDATE CASCADE ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS AllocationResult (
+  RoundID  BIGINT      NOT NULL,
+  Sno      VARCHAR(12) NOT NULL,
+  Outcomes VARCHAR(32) NOT NULL,
+  Assigned SMALLINT    NOT NULL DEFAULT 0,
+  PRIMARY KEY (RoundID, Sno),
+  CONSTRAINT fk_allocationresult_round FOREIGN KEY (RoundID) REFERENCES RegistrationRound(RoundID)
+    ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+/*
+ * 4i. 授课安排的每周上课节次：Weekday 1-7 对应周一至周日，Period 为当天第几节（1-12）；
+ *     选课时把开课与学生本学期的节次压缩成位掩码，按位与即可判断是否撞课
+ */
+CREATE TABLE IF NOT EXISTS TeachingSlot (
+  TeachID BIGINT   NOT NULL,
+  Weekday SMALLINT NOT NULL,
+  Period  SMALLINT NOT NULL,
+  PRIMARY KEY (TeachID, Weekday, Period),
+  CONSTRAINT ck_teachingslot_weekday CHECK (Weekday BETWEEN 1 AND 7),
+  CONSTRAINT ck_teachingslot_period CHECK (Period BETWEEN 1 AND 12),
+  CONSTRAINT fk_teachingslot_teaching FOREIGN KEY (TeachID) REFERENCES Teaching(TeachID)
+    ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+/*
+ * 4j. 教师工作量汇总：每位教师每学年学期一行，授课安排或课程学分/学时变化时重算该行，
+ *     选课增减时按开课名额变化增量调整选课人数；存量数据用 flask rebuild-workload 重建
+ */
+CREATE TABLE IF NOT EXISTS TeacherWorkload (
+  Tno              VARCHAR(10) NOT NULL,
+  YearOffered      INT         NOT NULL,
+  Term             VARCHAR(10) NOT NULL,
+  Offerings        INT         NOT NULL DEFAULT 0,
+  CreditHours      INT         NOT NULL DEFAULT 0,
+  ContactHours     INT         NOT NULL DEFAULT 0,
+  EnrolledStudents INT         NOT NULL DEFAULT 0,
+  UpdatedAt        DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (Tno, YearOffered, Term),
+  CONSTRAINT fk_teacherworkload_teacher FOREIGN KEY (Tno) REFERENCES Teacher(Tno)
+    ON UPDATE CASCADE ON DELETE CASCADE,
+  INDEX idx_teacherworkload_term (YearOffered, Term)
+) ENGINE=InnoDB;
+
 /*
  * 5. 初始示例数据
  */
@@ -292,6 +481,15 @@ CREATE INDEX idx_sc_course_term ON SC(Cno, YearTaken, Term);
 DROP INDEX IF EXISTS idx_sc_grade ON SC;
 CREATE INDEX idx_sc_grade ON SC(Grade);
 
+DROP INDEX IF EXISTS idx_student_updated ON Student;
+CREATE INDEX idx_student_updated ON Student(UpdatedAt);
+DROP INDEX IF EXISTS idx_course_updated ON Course;
+CREATE INDEX idx_course_updated ON Course(UpdatedAt);
+DROP INDEX IF EXISTS idx_teacher_updated ON Teacher;
+CREATE INDEX idx_teacher_updated ON Teacher(UpdatedAt);
+DROP INDEX IF EXISTS idx_sc_updated ON SC;
+CREATE INDEX idx_sc_updated ON SC(UpdatedAt);
+
 DROP INDEX IF EXISTS idx_teaching_time ON Teaching;
 CREATE INDEX idx_teaching_time ON Teaching(YearOffered, Term);
 DROP INDEX IF EXISTS idx_teaching_course ON Teaching;
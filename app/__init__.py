@@ -12,7 +12,10 @@ from .config import Config
 from .extensions import db, migrate
 from .api import register_api
 from .routes import bp as main_bp
+from .caching import init_fragment_cache, init_swr_cache
 from .cli import register_cli_commands
+from .compression import init_compression
+from .json_provider import init_json_provider
 
 # 在导入阶段加载 .env，确保 CLI / 测试环境也能获得变量
 load_dotenv()
@@ -34,6 +37,7 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     # 功能：构建并初始化 Flask 应用实例，同时注册扩展、蓝图与 CLI 命令。
     app = Flask(__name__, instance_relative_config=False)
     app.config.from_object(config_class)
+    init_json_provider(app)
 
     cors_origins = _normalize_origins(app.config.get("CORS_ORIGINS"))
     if cors_origins:
@@ -53,11 +57,54 @@ def create_app(config_class: type[Config] = Config) -> Flask:
 
     # Import models so that metadata is registered with SQLAlchemy
     from . import models  # noqa: F401  # pylint: disable=unused-import
+    from .services import (
+        init_change_bus,
+        init_enrollment_stream,
+        init_operation_log,
+        init_room_bookings,
+        init_waitlist,
+        register_seat_listener,
+        register_table_version_listener,
+        register_workload_listener,
+    )
+
+    # 写入时递增表版本号，供 API 生成 ETag
+    register_table_version_listener()
+
+    # 选课名额计数：与选课写入同一事务内原子占用/释放
+    register_seat_listener()
+
+    # 教师工作量汇总：授课安排变化时重算，选课变化时按名额净增减调整
+    register_workload_listener()
+
+    # 候补队列：释放名额的事务提交后由后台任务按先进先出递补
+    init_waitlist(app)
+
+    # CRUD 操作日志：提交后进入内存缓冲，由后台线程批量落库并按小时汇总
+    init_operation_log(app)
+
+    # 事务内写入变更发件箱，各 worker 轮询后通知缓存等订阅者
+    init_change_bus(app)
+
+    # 教室预订区间索引：授课安排写入时拒绝同一教室日期重叠
+    init_room_bookings(app)
+
+    # 选课事件发件箱与进程内环形缓冲区，供仪表盘 SSE 推送
+    init_enrollment_stream(app)
 
     # Register blueprints
     app.register_blueprint(main_bp)
     register_api(app)
 
+    # 统计/元数据的 stale-while-revalidate 缓存
+    init_swr_cache(app)
+
+    # 模板片段缓存 {% cache %}，与上面的缓存共用存储后端
+    init_fragment_cache(app)
+
+    # gzip/brotli 响应压缩
+    init_compression(app)
+
     # CLI commands (e.g., init-db)
     register_cli_commands(app)
 
@@ -2,56 +2,111 @@
 
 from __future__ import annotations
 
+import time
 from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request
 from sqlalchemy import func, select
 
+from ..caching import get_swr_cache, swr_cached
 from ..extensions import db
-from ..models import Classroom, Course, Enrollment, Student, Teacher, Teaching, TermDict
+from ..models import (
+    Classroom,
+    Course,
+    Enrollment,
+    OperationRollup,
+    Student,
+    Teacher,
+    Teaching,
+    TermDict,
+)
+from ..services import (
+    classroom_utilization,
+    fan_out,
+    get_enrollment_feed,
+    rows_of,
+    scalar_of,
+    scalars_of,
+)
+from ..services.audit_log import OPERATIONS, hour_bucket
+from .http_cache import SHORT_LIVED, conditional_get
 
 bp = Blueprint("analytics_api", __name__)
 
+RECENT_ENROLLMENT_LIMIT = 8
 
-def _count_rows(model) -> int:
-    stmt = select(func.count()).select_from(model)
-    return int(db.session.scalar(stmt) or 0)
+# 仪表盘统计所依赖的业务表：既用于 ETag，也用于写入后按表失效缓存
+DASHBOARD_MODELS = (Student, Course, Teacher, Classroom, Enrollment, Teaching, TermDict)
+
+# 仪表盘 CRUD 热力图的行：显示名称与对应的数据表
+HEATMAP_TABLES = (
+    ("学生", Student),
+    ("课程", Course),
+    ("教师", Teacher),
+    ("教室", Classroom),
+    ("选课", Enrollment),
+    ("授课安排", Teaching),
+)
 
 
 @bp.get("/dashboard")
+@conditional_get(*DASHBOARD_MODELS, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=DASHBOARD_MODELS)
 def dashboard_summary():
-    """Return aggregated metrics used by the dashboard view."""
-    student_count = _count_rows(Student)
-    course_count = _count_rows(Course)
-    teacher_count = _count_rows(Teacher)
-    classroom_count = _count_rows(Classroom)
-    enrollment_count = _count_rows(Enrollment)
-
-    active_terms = (
-        db.session.execute(
-            select(TermDict.term_name)
-            .join(Teaching, Teaching.term == TermDict.term_code)
-            .distinct()
-            .order_by(TermDict.term_name)
-        )
-        .scalars()
-        .all()
-    )
+    """Return aggregated metrics used by the dashboard view.
 
-    top_courses = (
-        db.session.execute(
-            select(
-                Course.cno,
-                Course.cname,
-                func.count(Enrollment.sno).label("enrolled_count"),
-            )
-            .join(Enrollment, Enrollment.cno == Course.cno, isouter=True)
-            .group_by(Course.cno, Course.cname)
-            .order_by(func.count(Enrollment.sno).desc(), Course.cname)
-            .limit(5)
-        )
-        .all()
+    The CRUD heatmap is served by :func:`operation_heatmap` instead: the
+    operation rollup changes on every logged read, which would otherwise give
+    this payload a new ETag on each page view.
+    """
+
+    def _count(model, *criteria):
+        return scalar_of(select(func.count()).select_from(model).where(*criteria))
+
+    # 各统计查询互不依赖，交给 fan_out 在独立连接上并行执行
+    results = fan_out(
+        {
+            "students": _count(Student),
+            "courses": _count(Course),
+            "teachers": _count(Teacher),
+            "classrooms": _count(Classroom),
+            "enrollments": _count(Enrollment),
+            "active_terms": scalars_of(
+                select(TermDict.term_name)
+                .join(Teaching, Teaching.term == TermDict.term_code)
+                .distinct()
+                .order_by(TermDict.term_name)
+            ),
+            "top_courses": rows_of(
+                select(
+                    Course.cno,
+                    Course.cname,
+                    func.count(Enrollment.sno).label("enrolled_count"),
+                )
+                .join(Enrollment, Enrollment.cno == Course.cno, isouter=True)
+                .group_by(Course.cno, Course.cname)
+                .order_by(func.count(Enrollment.sno).desc(), Course.cname)
+                .limit(5)
+            ),
+            "status_rows": rows_of(
+                select(Enrollment.status, func.count().label("cnt"))
+                .group_by(Enrollment.status)
+                .order_by(Enrollment.status)
+            ),
+        }
     )
+
+    def _int(name: str) -> int:
+        return int(results[name] or 0)
+
+    student_count = _int("students")
+    course_count = _int("courses")
+    teacher_count = _int("teachers")
+    classroom_count = _int("classrooms")
+    enrollment_count = _int("enrollments")
+    active_terms = results["active_terms"]
+
+    top_courses = results["top_courses"]
     top_course_chart = {
         "labels": [row.cname for row in top_courses],
         "values": [int(row.enrolled_count or 0) for row in top_courses],
@@ -65,139 +120,14 @@ def dashboard_summary():
         ],
     }
 
-    status_rows = (
-        db.session.execute(
-            select(Enrollment.status, func.count().label("cnt"))
-            .group_by(Enrollment.status)
-            .order_by(Enrollment.status)
-        )
-        .all()
-    )
+    status_rows = results["status_rows"]
     status_chart = {
         "labels": [status for status, _ in status_rows],
         "values": [int(cnt or 0) for _, cnt in status_rows],
     }
 
-    recent_enrollments = (
-        db.session.execute(
-            select(Enrollment, Student, Course)
-            .join(Student, Student.sno == Enrollment.sno)
-            .join(Course, Course.cno == Enrollment.cno)
-            .order_by(Enrollment.enroll_date.desc())
-            .limit(8)
-        )
-        .all()
-    )
-    recent_payload = [
-        {
-            "student_id": student.sno,
-            "student_name": student.sname,
-            "course_id": course.cno,
-            "course_name": course.cname,
-            "status": enrollment.status,
-            "grade": float(enrollment.grade) if enrollment.grade is not None else None,
-            "enroll_date": enrollment.enroll_date.isoformat() if enrollment.enroll_date else None,
-        }
-        for (enrollment, student, course) in recent_enrollments
-    ]
-
-    now = datetime.utcnow()
-    thirty_days_ago = now - timedelta(days=30)
-    current_year = now.year
-
-    def _count_recent(model, column):
-        if column is None:
-            return 0
-        stmt = select(func.count()).select_from(model).where(column >= thirty_days_ago)
-        return int(db.session.scalar(stmt) or 0)
-
-    enrollment_drop_count = int(
-        db.session.scalar(
-            select(func.count()).select_from(Enrollment).where(Enrollment.status == "dropped")
-        )
-        or 0
-    )
-    teaching_total = _count_rows(Teaching)
-    teaching_with_room = int(
-        db.session.scalar(
-            select(func.count()).select_from(Teaching).where(Teaching.room_id.is_not(None))
-        )
-        or 0
-    )
-    course_reference_count = (
-        enrollment_count
-        + int(
-            db.session.scalar(select(func.count()).select_from(Teaching).where(Teaching.cno.is_not(None)))
-            or 0
-        )
-    )
-    teacher_reference_count = int(
-        db.session.scalar(select(func.count()).select_from(Teaching)) or 0
-    )
-
-    teaching_current_year = int(
-        db.session.scalar(
-            select(func.count()).select_from(Teaching).where(Teaching.year_offered >= current_year)
-        )
-        or 0
-    )
-
-    heatmap_rows = [
-        {
-            "table": "学生",
-            "metrics": {
-                "create": _count_recent(Student, Student.created_at) or student_count,
-                "read": student_count,
-                "update": _count_recent(Student, Student.updated_at),
-                "delete": enrollment_count,
-            },
-        },
-        {
-            "table": "课程",
-            "metrics": {
-                "create": _count_recent(Course, Course.created_at) or course_count,
-                "read": course_count,
-                "update": _count_recent(Course, Course.updated_at),
-                "delete": course_reference_count,
-            },
-        },
-        {
-            "table": "教师",
-            "metrics": {
-                "create": _count_recent(Teacher, Teacher.created_at) or teacher_count,
-                "read": teacher_count,
-                "update": _count_recent(Teacher, Teacher.updated_at),
-                "delete": teacher_reference_count,
-            },
-        },
-        {
-            "table": "教室",
-            "metrics": {
-                "create": classroom_count,
-                "read": classroom_count,
-                "update": 0,
-                "delete": teaching_with_room,
-            },
-        },
-        {
-            "table": "选课",
-            "metrics": {
-                "create": _count_recent(Enrollment, Enrollment.enroll_date) or enrollment_count,
-                "read": enrollment_count,
-                "update": _count_recent(Enrollment, Enrollment.updated_at),
-                "delete": enrollment_drop_count,
-            },
-        },
-        {
-            "table": "授课安排",
-            "metrics": {
-                "create": teaching_current_year or teaching_total,
-                "read": teaching_total,
-                "update": 0,
-                "delete": teaching_with_room,
-            },
-        },
-    ]
+    # 最近选课直接取自进程内的选课事件缓冲区，不再按 EnrollDate 排序联表查询
+    recent_payload = get_enrollment_feed().recent(RECENT_ENROLLMENT_LIMIT)
 
     return jsonify(
         {
@@ -212,6 +142,138 @@ def dashboard_summary():
             "top_courses": top_course_chart,
             "status_chart": status_chart,
             "recent_enrollments": recent_payload,
-            "crud_heatmap": heatmap_rows,
+        }
+    )
+
+
+@bp.get("/heatmap")
+def operation_heatmap():
+    """Return the CRUD heatmap of the dashboard from the hourly operation rollup.
+
+    Reads are logged too, so the rollup changes on nearly every request and an
+    ETag would never match; the response is instead reusable for
+    ``AUDIT_HEATMAP_MAX_AGE`` seconds.
+    """
+    # 功能：直接读取按小时汇总的操作日志生成热力图，开销与数据量无关。
+    since = datetime.utcnow() - timedelta(days=current_app.config.get("AUDIT_HEATMAP_DAYS", 30))
+    rows = db.session.execute(
+        select(
+            OperationRollup.table_name,
+            OperationRollup.operation,
+            func.sum(OperationRollup.count).label("cnt"),
+        )
+        .where(OperationRollup.hour_start >= hour_bucket(since))
+        .group_by(OperationRollup.table_name, OperationRollup.operation)
+    ).all()
+    operation_counts = {(row.table_name, row.operation): int(row.cnt or 0) for row in rows}
+    response = jsonify(
+        {
+            "crud_heatmap": [
+                {
+                    "table": label,
+                    "metrics": {
+                        operation: operation_counts.get((model.__tablename__, operation), 0)
+                        for operation in OPERATIONS
+                    },
+                }
+                for label, model in HEATMAP_TABLES
+            ]
+        }
+    )
+    response.headers["Cache-Control"] = (
+        f"private, max-age={current_app.config.get('AUDIT_HEATMAP_MAX_AGE', 15)}"
+    )
+    return response
+
+
+@bp.get("/utilization")
+@conditional_get(Classroom, Teaching, Enrollment, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Classroom, Teaching, Enrollment))
+def utilization_summary():
+    """Return seat and day utilization of every classroom and building for one term.
+
+    ``year`` and ``term`` are required; the cached payload is keyed by them,
+    so each term is computed once until a classroom, teaching or enrollment
+    is written.
+    """
+    # 功能：按学期汇总教室与教学楼的座位/日期利用率、分位数以及低利用教室。
+    try:
+        year = int(request.args.get("year", ""))
+    except ValueError:
+        return jsonify({"error": "year must be an integer"}), 400
+    term = request.args.get("term")
+    if not term:
+        return jsonify({"error": "term is required"}), 400
+    try:
+        threshold = float(
+            request.args.get("threshold", current_app.config.get("CLASSROOM_UNDERUSED_THRESHOLD", 0.3))
+        )
+    except ValueError:
+        return jsonify({"error": "threshold must be a number"}), 400
+    return jsonify(classroom_utilization(year, term, underused_threshold=threshold))
+
+
+@bp.get("/stream")
+def enrollment_stream():
+    """Push enrollment create/update/drop events to the dashboard over Server-Sent Events.
+
+    A new connection first receives a ``snapshot`` event with the recent
+    enrollments; reconnecting with ``Last-Event-ID`` replays the buffered
+    events after that id instead. Each change arrives as an ``enrollment``
+    event whose data is the recent-enrollment row plus its ``kind``.
+    """
+    # 功能：从进程内事件缓冲区读取选课变更并以 text/event-stream 持续推送。
+    feed = get_enrollment_feed()
+    config = current_app.config
+    dumps = current_app.json.dumps
+    heartbeat = config.get("ENROLLMENT_STREAM_HEARTBEAT", 15.0)
+    max_seconds = config.get("ENROLLMENT_STREAM_MAX_SECONDS", 300.0)
+    retry_ms = config.get("ENROLLMENT_STREAM_RETRY_MS", 3000)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    cursor = feed.seq_for(last_event_id)
+    snapshot = None
+    if cursor is None:
+        cursor = feed.current_seq()
+        snapshot = feed.recent(RECENT_ENROLLMENT_LIMIT)
+
+    def generate():
+        position = cursor
+        yield f"retry: {retry_ms}\n\n"
+        if snapshot is not None:
+            yield f"event: snapshot\ndata: {dumps({'recent_enrollments': snapshot})}\n\n"
+        deadline = time.monotonic() + max_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            events = feed.wait_after(position, min(heartbeat, remaining))
+            if not events:
+                # 注释行作为心跳，防止代理因空闲断开连接
+                yield ": keep-alive\n\n"
+                continue
+            for item in events:
+                position = item.seq
+                data = dumps({"kind": item.kind, **item.payload})
+                event_id = f"id: {item.event_id}\n" if item.event_id is not None else ""
+                yield f"{event_id}event: enrollment\ndata: {data}\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.get("/cache")
+def cache_stats():
+    """Return per-entry hit/miss counters of the dashboard/meta cache."""
+    cache = get_swr_cache()
+    return jsonify(
+        {
+            "backend": type(cache.backend).__name__,
+            "soft_ttl": cache.soft_ttl,
+            "hard_ttl": cache.hard_ttl,
+            "entries": cache.stats(),
         }
     )
@@ -0,0 +1,151 @@
+"""Multiplexed ``/api/v1/batch`` endpoint that runs several API calls in one round trip."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping
+
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+from ..extensions import db
+
+bp = Blueprint("batch_api", __name__)
+
+BATCH_PATH = "/api/v1/batch"
+API_PREFIX = "/api/v1/"
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# 子请求不继承的请求头：子响应要以未压缩的原文内嵌进批量结果
+DROPPED_HEADERS = {"accept-encoding"}
+
+
+def _validate_sub_request(index: int, item: Any) -> Dict[str, Any]:
+    # 功能：校验单个子请求的结构，只允许访问 /api/v1 下除 batch 自身以外的路由。
+    if not isinstance(item, Mapping):
+        raise ValueError(f"requests[{index}] must be an object")
+    method = str(item.get("method") or "GET").upper()
+    if method not in ALLOWED_METHODS:
+        raise ValueError(f"requests[{index}]: unsupported method {method}")
+    path = item.get("path")
+    if not isinstance(path, str) or not path.startswith(API_PREFIX):
+        raise ValueError(f"requests[{index}]: path must start with {API_PREFIX}")
+    if path.rstrip("/") == BATCH_PATH:
+        raise ValueError(f"requests[{index}]: nested batch requests are not allowed")
+    params = item.get("params") or {}
+    if not isinstance(params, Mapping):
+        raise ValueError(f"requests[{index}]: params must be an object")
+    headers = item.get("headers") or {}
+    if not isinstance(headers, Mapping):
+        raise ValueError(f"requests[{index}]: headers must be an object")
+    return {
+        "id": item.get("id", index),
+        "method": method,
+        "path": path,
+        "params": {key: value for key, value in params.items() if value not in (None, "")},
+        "body": item.get("body"),
+        "headers": {key: value for key, value in headers.items() if str(key).lower() not in DROPPED_HEADERS},
+    }
+
+
+def _is_streaming(response: Response) -> bool:
+    return response.is_streamed or response.mimetype == "text/event-stream"
+
+
+def _response_payload(sub_id: Any, response: Response) -> Dict[str, Any]:
+    # 功能：把子请求的 Flask 响应折叠为 JSON 条目，JSON 响应体直接内嵌；流式响应不读取，返回 400 条目。
+    if _is_streaming(response):
+        # 关闭生成器而不是读到结束，SSE 等长连接会占住整个批量请求
+        response.close()
+        return {
+            "id": sub_id,
+            "status": 400,
+            "headers": {},
+            "body": {"error": "Streaming responses cannot be batched"},
+        }
+    body: Any
+    if response.is_json:
+        body = response.get_json(silent=True)
+    else:
+        body = response.get_data(as_text=True)
+    headers = {
+        key: value
+        for key, value in response.headers.items()
+        if key not in ("Content-Length", "Content-Type") and not key.startswith("Access-Control-")
+    }
+    return {"id": sub_id, "status": response.status_code, "headers": headers, "body": body}
+
+
+def _dispatch(app: Flask, spec: Dict[str, Any]) -> Dict[str, Any]:
+    # 功能：在当前应用上下文内构造子请求上下文并完整分发，复用同一数据库会话。
+    builder = EnvironBuilder(
+        path=spec["path"],
+        method=spec["method"],
+        query_string=spec["params"],
+        json=spec["body"],
+        headers=spec["headers"],
+        base_url=request.host_url,
+    )
+    try:
+        with app.request_context(builder.get_environ()):
+            response = app.full_dispatch_request()
+    except Exception as exc:  # noqa: BLE001 - a failing sub-request must not abort the batch
+        db.session.rollback()
+        current_app.logger.exception("Batch sub-request %s %s failed", spec["method"], spec["path"])
+        return {"id": spec["id"], "status": 500, "headers": {}, "body": {"error": str(exc)}}
+    finally:
+        builder.close()
+    return _response_payload(spec["id"], response)
+
+
+def _dispatch_isolated(app: Flask, spec: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    # 功能：并行模式下每个线程推入独立的应用上下文，结束时自动归还数据库连接。
+    builder = EnvironBuilder(
+        path=spec["path"],
+        method=spec["method"],
+        query_string=spec["params"],
+        headers=spec["headers"],
+        base_url=base_url,
+    )
+    try:
+        with app.app_context(), app.request_context(builder.get_environ()):
+            response = app.full_dispatch_request()
+            return _response_payload(spec["id"], response)
+    except Exception as exc:  # noqa: BLE001 - a failing sub-request must not abort the batch
+        app.logger.exception("Batch sub-request %s %s failed", spec["method"], spec["path"])
+        return {"id": spec["id"], "status": 500, "headers": {}, "body": {"error": str(exc)}}
+    finally:
+        builder.close()
+
+
+@bp.post("/batch")
+def run_batch():
+    """Execute an array of API sub-requests and return their responses in order.
+
+    Sub-requests run sequentially on the caller's app context and DB session.
+    With ``"parallel": true`` and only ``GET`` sub-requests, they run on a small
+    thread pool instead, each with its own context and pooled connection.
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("requests")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "requests must be a non-empty list"}), 400
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 25)
+    if len(items) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 400
+
+    try:
+        specs = [_validate_sub_request(index, item) for index, item in enumerate(items)]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    read_only = all(spec["method"] == "GET" for spec in specs)
+    workers = min(current_app.config.get("BATCH_MAX_WORKERS", 4), len(specs))
+    responses: List[Dict[str, Any]]
+    if payload.get("parallel") and read_only and workers > 1:
+        base_url = request.host_url
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            responses = list(pool.map(lambda spec: _dispatch_isolated(app, spec, base_url), specs))
+    else:
+        responses = [_dispatch(app, spec) for spec in specs]
+    return jsonify({"responses": responses})
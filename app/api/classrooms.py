@@ -2,20 +2,26 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any, Dict
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
+from ..caching import swr_cached
 from ..constants import ENTITY_PK_DUP_MSG, ENTITY_PK_EMPTY_MSG
 from ..extensions import db
-from ..models import Classroom
+from ..models import Classroom, Teaching
 from ..repositories.classroom_repository import ClassroomRepository
-from ..services import format_integrity_violation, validate_classroom_capacity
+from ..services import format_integrity_violation, get_room_booking_index, validate_classroom_capacity
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import parse_csv_arg
 
 bp = Blueprint("classrooms_api", __name__)
 
+TEACHING_COUNT_SCOPES = {"all", "window"}
+
 
 def _serialize_classroom(classroom: Classroom) -> Dict[str, Any]:
     return {
@@ -28,6 +34,7 @@ def _serialize_classroom(classroom: Classroom) -> Dict[str, Any]:
 
 
 @bp.get("/")
+@conditional_get(Classroom, Teaching)
 def list_classrooms():
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
@@ -36,20 +43,46 @@ def list_classrooms():
     room_no = request.args.get("room_no")
     keyword = request.args.get("q")
 
-    classrooms, total = ClassroomRepository.list(
-        building=building,
-        room_id=room_id,
-        room_no=room_no,
-        keyword=keyword,
-        page=page,
-        per_page=per_page,
-    )
+    # teaching_count_scope=window 时仅统计 year/term 指定窗口内的授课安排
+    scope = (request.args.get("teaching_count_scope") or "all").lower()
+    if scope not in TEACHING_COUNT_SCOPES:
+        return jsonify(
+            {"error": f"teaching_count_scope must be one of {', '.join(sorted(TEACHING_COUNT_SCOPES))}"}
+        ), 400
+    teaching_year = None
+    teaching_term = None
+    if scope == "window":
+        year_raw = request.args.get("year")
+        if year_raw:
+            try:
+                teaching_year = int(year_raw)
+            except ValueError:
+                return jsonify({"error": "year must be an integer"}), 400
+        teaching_term = request.args.get("term") or None
+        if teaching_year is None and teaching_term is None:
+            return jsonify({"error": "window scope requires year and/or term"}), 400
+
+    try:
+        items, total = ClassroomRepository.list_with_teaching_counts(
+            building=building,
+            room_id=room_id,
+            room_no=room_no,
+            keyword=keyword,
+            teaching_year=teaching_year,
+            teaching_term=teaching_term,
+            page=page,
+            per_page=per_page,
+            fields=parse_csv_arg("fields"),
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     return jsonify(
         {
-            "items": [_serialize_classroom(classroom) for classroom in classrooms],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
+            "teaching_count_scope": scope,
         }
     )
 
@@ -92,6 +125,7 @@ def create_classroom():
 
 
 @bp.get("/<string:room_id>")
+@conditional_get(Classroom, Teaching)
 def retrieve_classroom(room_id: str):
     classroom = ClassroomRepository.get(room_id)
     if not classroom:
@@ -99,6 +133,23 @@ def retrieve_classroom(room_id: str):
     return jsonify(_serialize_classroom(classroom))
 
 
+@bp.get("/<string:room_id>/availability")
+@conditional_get(Classroom, Teaching)
+def classroom_availability(room_id: str):
+    """Free date windows of a classroom between ``?from=`` and ``?to=`` (inclusive)."""
+    # 功能：从教室预订区间索引中取出窗口内的已占日期段，并返回其间的空闲日期段。
+    if not ClassroomRepository.get(room_id):
+        return jsonify({"error": "Classroom not found"}), 404
+    try:
+        start = datetime.strptime(request.args.get("from") or "", "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get("to") or "", "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "from and to are required in YYYY-MM-DD format"}), 400
+    if end < start:
+        return jsonify({"error": "to must not be before from"}), 400
+    return jsonify(get_room_booking_index().availability(room_id, start, end))
+
+
 @bp.put("/<string:room_id>")
 def update_classroom(room_id: str):
     classroom = ClassroomRepository.get(room_id)
@@ -139,6 +190,8 @@ def delete_classroom(room_id: str):
 
 
 @bp.get("/meta")
+@conditional_get(Classroom, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Classroom,))
 def classroom_meta():
     """Return aggregated stats for dashboards/icons."""
     total = db.session.scalar(select(func.count()).select_from(Classroom)) or 0
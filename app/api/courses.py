@@ -8,6 +8,7 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
+from ..caching import swr_cached
 from ..constants import (
     ENTITY_PK_DUP_MSG,
     ENTITY_PK_EMPTY_MSG,
@@ -25,6 +26,8 @@ from ..services import (
     validate_course_credits,
     validate_course_hours,
 )
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import lookup_ids_from_body, lookup_response, parse_csv_arg, sparse_options
 
 bp = Blueprint("courses_api", __name__)
 
@@ -58,8 +61,13 @@ def _parse_int(name: str, value: Any, minimum: Optional[int] = None, maximum: Op
 
 
 @bp.get("/")
+@conditional_get(Course, Department)
 def list_courses():
     # 功能：分页查询课程列表并支持按院系/关键字筛选。
+    raw_ids = parse_csv_arg("ids")
+    if raw_ids is not None:
+        return lookup_response(raw_ids, CourseRepository.get_rows)
+
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
     department = request.args.get("department")
@@ -68,19 +76,25 @@ def list_courses():
     name_filter = request.args.get("name")
     include_inactive = request.args.get("include_inactive", "false").lower() == "true"
 
-    courses, total = CourseRepository.list(
-        department=department,
-        active_only=not include_inactive,
-        course_id=course_id,
-        name=name_filter,
-        keyword=keyword,
-        page=page,
-        per_page=per_page,
-    )
+    fields, expand = sparse_options()
+    try:
+        items, total = CourseRepository.list_rows(
+            department=department,
+            active_only=not include_inactive,
+            course_id=course_id,
+            name=name_filter,
+            keyword=keyword,
+            page=page,
+            per_page=per_page,
+            fields=fields,
+            expand=expand,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify(
         {
-            "items": [_serialize_course(course) for course in courses],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
@@ -151,13 +165,24 @@ def create_course():
     return jsonify(_serialize_course(course)), 201
 
 
+@bp.post("/lookup")
+def lookup_courses():
+    # 功能：按课程号列表批量读取课程，返回以课程号为键的结果与缺失课程号。
+    return lookup_response(lookup_ids_from_body(), CourseRepository.get_rows)
+
+
 @bp.get("/<string:cno>")
+@conditional_get(Course, Department)
 def retrieve_course(cno: str):
     # 功能：根据课程编号返回详情，缺失时返回 404。
-    course = CourseRepository.get(cno)
+    fields, expand = sparse_options()
+    try:
+        course = CourseRepository.get_row(cno, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if not course:
         return jsonify({"error": "Course not found"}), 404
-    return jsonify(_serialize_course(course))
+    return jsonify(course)
 
 
 @bp.put("/<string:cno>")
@@ -239,6 +264,8 @@ def delete_course(cno: str):
 
 
 @bp.get("/meta")
+@conditional_get(Course, Department, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Course, Department))
 def course_meta():
     """Return dropdown data and aggregated statistics for course management."""
     departments = (
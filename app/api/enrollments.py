@@ -3,23 +3,34 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
+from ..caching import swr_cached
 from ..constants import (
     ENTITY_PK_DUP_MSG,
     ENTITY_PK_EMPTY_MSG,
     REFERENTIAL_STUDENT_COURSE_MSG,
 )
-from ..extensions import db
-from ..models import Course, Enrollment, Student, TermDict
+from ..models import Course, Enrollment, Student, Teaching, TeachingSlot, TermDict
 from ..repositories.course_repository import CourseRepository
 from ..repositories.enrollment_repository import EnrollmentRepository
 from ..repositories.student_repository import StudentRepository
-from ..services import format_integrity_violation
+from ..services import (
+    TimetableClashError,
+    check_timetable,
+    fan_out,
+    format_integrity_violation,
+    rows_of,
+    scalar_of,
+    term_clash_report,
+)
+from ..services.seats import SEAT_HOLDING_STATUSES, OfferingFullError
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import lookup_ids_from_body, lookup_response, parse_csv_arg, sparse_options
 
 bp = Blueprint("enrollments_api", __name__)
 
@@ -53,9 +64,39 @@ def _parse_grade(value: Any) -> Decimal:
     return grade
 
 
+def _parse_enrollment_key(value: Any) -> Tuple[str, str]:
+    # 功能：解析批量查询中的选课主键，支持 "学号:课程号"、[学号, 课程号] 与对象三种写法。
+    if isinstance(value, str):
+        sno, sep, cno = value.partition(":")
+    elif isinstance(value, dict):
+        sno, sep, cno = str(value.get("student_id") or ""), ":", str(value.get("course_id") or "")
+    elif isinstance(value, (list, tuple)) and len(value) == 2:
+        sno, sep, cno = str(value[0]), ":", str(value[1])
+    else:
+        sno, sep, cno = "", "", ""
+    sno, cno = sno.strip(), cno.strip()
+    if not sep or not sno or not cno:
+        raise ValueError(f"Invalid enrollment id: {value!r} (expected student_id:course_id)")
+    return sno, cno
+
+
+def _format_enrollment_key(key: Tuple[str, str]) -> str:
+    return f"{key[0]}:{key[1]}"
+
+
 @bp.get("/")
+@conditional_get(Enrollment, Student, Course)
 def list_enrollments():
     # 功能：按学生、课程、状态等条件分页查询选课记录。
+    raw_ids = parse_csv_arg("ids")
+    if raw_ids is not None:
+        return lookup_response(
+            raw_ids,
+            EnrollmentRepository.get_rows,
+            parse_key=_parse_enrollment_key,
+            format_key=_format_enrollment_key,
+        )
+
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
     student_id = request.args.get("student")
@@ -67,20 +108,26 @@ def list_enrollments():
 
     year_int = int(year) if year else None
 
-    enrollments, total = EnrollmentRepository.list(
-        student_id=student_id,
-        course_id=course_id,
-        status=status,
-        year=year_int,
-        term=term,
-        keyword=keyword,
-        page=page,
-        per_page=per_page,
-    )
+    fields, expand = sparse_options()
+    try:
+        items, total = EnrollmentRepository.list_rows(
+            student_id=student_id,
+            course_id=course_id,
+            status=status,
+            year=year_int,
+            term=term,
+            keyword=keyword,
+            page=page,
+            per_page=per_page,
+            fields=fields,
+            expand=expand,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify(
         {
-            "items": [_serialize_enrollment(item) for item in enrollments],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
@@ -135,6 +182,12 @@ def create_enrollment():
     else:
         grade = None
 
+    if status in SEAT_HOLDING_STATUSES:
+        try:
+            check_timetable(sno, cno, year, term, lock=True)
+        except TimetableClashError as exc:
+            return jsonify({"error": str(exc), "clashes": exc.clashes}), 409
+
     data = {
         "sno": sno,
         "cno": cno,
@@ -146,19 +199,51 @@ def create_enrollment():
 
     try:
         enrollment = EnrollmentRepository.create(data)
+    except OfferingFullError as exc:
+        return jsonify({"error": str(exc)}), 409
     except IntegrityError as exc:
         return jsonify({"error": "Failed to create enrollment", "details": str(exc.orig)}), 400
 
     return jsonify(_serialize_enrollment(enrollment)), 201
 
 
+@bp.get("/clashes")
+@conditional_get(Enrollment, Teaching, TeachingSlot)
+def timetable_clashes():
+    # 功能：返回指定学年学期内所有学生课表中上课时间冲突的课程对。
+    term = request.args.get("term")
+    try:
+        year = int(request.args.get("year", ""))
+    except ValueError:
+        return jsonify({"error": "year must be an integer"}), 400
+    if not term:
+        return jsonify({"error": "term is required"}), 400
+    return jsonify(term_clash_report(year, term))
+
+
+@bp.post("/lookup")
+def lookup_enrollments():
+    # 功能：按 学号:课程号 复合主键批量读取选课记录。
+    return lookup_response(
+        lookup_ids_from_body(),
+        EnrollmentRepository.get_rows,
+        parse_key=_parse_enrollment_key,
+        format_key=_format_enrollment_key,
+    )
+
+
 @bp.get("/<string:sno>/<string:cno>")
+@conditional_get(Enrollment, Student, Course)
 def retrieve_enrollment(sno: str, cno: str):
     # 功能：返回指定学生与课程的选课详情。
-    enrollment = EnrollmentRepository.get(sno, cno)
+    fields, expand = sparse_options()
+    try:
+        enrollment = EnrollmentRepository.get_row(sno, cno, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if not enrollment:
         return jsonify({"error": "Enrollment not found"}), 404
-    return jsonify(_serialize_enrollment(enrollment))
+    return jsonify(enrollment)
 
 
 @bp.put("/<string:sno>/<string:cno>")
@@ -198,8 +283,21 @@ def update_enrollment(sno: str, cno: str):
             return jsonify({"error": "term cannot be empty"}), 400
         update_data["term"] = payload["term"]
 
+    # 只有变为占名额状态或换到其他学期时才需要重新检查课表冲突
+    status = update_data.get("status", enrollment.status)
+    year = update_data.get("year_taken", enrollment.year_taken)
+    term = update_data.get("term", enrollment.term)
+    moved = (year, term) != (enrollment.year_taken, enrollment.term)
+    if status in SEAT_HOLDING_STATUSES and (moved or enrollment.status not in SEAT_HOLDING_STATUSES):
+        try:
+            check_timetable(sno, cno, year, term, lock=True)
+        except TimetableClashError as exc:
+            return jsonify({"error": str(exc), "clashes": exc.clashes}), 409
+
     try:
         enrollment = EnrollmentRepository.update(enrollment, update_data)
+    except OfferingFullError as exc:
+        return jsonify({"error": str(exc)}), 409
     except IntegrityError as exc:
         return jsonify({"error": "Failed to update enrollment", "details": str(exc.orig)}), 400
 
@@ -218,33 +316,30 @@ def delete_enrollment(sno: str, cno: str):
 
 
 @bp.get("/meta")
+@conditional_get(Enrollment, Student, Course, TermDict, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Enrollment, Student, Course, TermDict))
 def enrollment_meta():
     """Return dropdown options and stats for enrollment management."""
-    students = (
-        db.session.execute(select(Student).order_by(Student.sname))
-        .scalars()
-        .all()
-    )
-    courses = (
-        db.session.execute(select(Course).order_by(Course.cname))
-        .scalars()
-        .all()
-    )
-    terms = (
-        db.session.execute(select(TermDict).order_by(TermDict.term_code))
-        .scalars()
-        .all()
-    )
-
-    total = db.session.scalar(select(func.count()).select_from(Enrollment)) or 0
-    status_rows = (
-        db.session.execute(
-            select(Enrollment.status, func.count())
-            .group_by(Enrollment.status)
-            .order_by(Enrollment.status)
-        )
-        .all()
+    results = fan_out(
+        {
+            "students": rows_of(select(Student.sno, Student.sname).order_by(Student.sname)),
+            "courses": rows_of(select(Course.cno, Course.cname).order_by(Course.cname)),
+            "terms": rows_of(
+                select(TermDict.term_code, TermDict.term_name).order_by(TermDict.term_code)
+            ),
+            "total": scalar_of(select(func.count()).select_from(Enrollment)),
+            "status_rows": rows_of(
+                select(Enrollment.status, func.count())
+                .group_by(Enrollment.status)
+                .order_by(Enrollment.status)
+            ),
+        }
     )
+    students = results["students"]
+    courses = results["courses"]
+    terms = results["terms"]
+    total = results["total"] or 0
+    status_rows = results["status_rows"]
     status_distribution = [
         {"label": status, "value": int(count or 0)} for status, count in status_rows
     ]
@@ -0,0 +1,66 @@
+"""Conditional GET support (ETag / If-None-Match) for the v1 read endpoints."""
+
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import current_app, make_response, request
+
+from ..compression import supported_encodings
+from ..services.table_versions import table_version_token
+
+# 列表/详情：浏览器每次都需携带 If-None-Match 协商，数据未变时只返回 304
+REVALIDATE = "private, no-cache"
+# 统计/元数据：允许短时间直接复用，过期后再协商
+SHORT_LIVED = "private, max-age=30, must-revalidate"
+
+
+def _request_etag(token: str) -> str:
+    # 表版本相同但查询参数不同的请求必须得到不同的 ETag
+    raw = f"{request.method} {request.full_path}|{token}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _matching_etag(etag: str) -> Optional[str]:
+    # 功能：客户端可能缓存的是压缩后的表示（ETag 带编码后缀），逐一比较后返回命中的 ETag。
+    for candidate in (etag, *(f"{etag}-{encoding}" for encoding in supported_encodings())):
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def conditional_get(*models: Any, cache_control: str = REVALIDATE) -> Callable:
+    """Tag a GET view with an ETag derived from the versions of ``models``.
+
+    The version lookup runs before the view, so a matching ``If-None-Match``
+    returns ``304 Not Modified`` without executing the main query.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any):
+            # 功能：先比较表版本生成的 ETag，命中则直接返回 304，否则执行视图并附加缓存头。
+            etag = _request_etag(table_version_token(models))
+            matched = _matching_etag(etag)
+            if matched is not None:
+                response = current_app.response_class(status=304)
+                response.set_etag(matched)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                own_etag, _ = response.get_etag()
+                if own_etag is None:
+                    response.set_etag(etag)
+                elif _matching_etag(own_etag) is not None:
+                    # 视图自带内容 ETag（如缓存层返回的旧值）且与客户端一致
+                    response = current_app.response_class(status=304)
+                    response.set_etag(_matching_etag(own_etag))
+            response.headers["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,72 @@
+"""Request parsing shared by the v1 read endpoints."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from flask import jsonify, request
+
+# 单次批量查询允许的主键数量上限
+MAX_LOOKUP_IDS = 5000
+
+LookupFetcher = Callable[..., Dict[Hashable, Dict[str, Any]]]
+
+
+def parse_csv_arg(name: str) -> Optional[List[str]]:
+    """Split a comma-separated query argument, returning ``None`` when absent or blank."""
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    values = [value.strip() for value in raw.split(",") if value.strip()]
+    return values or None
+
+
+def sparse_options() -> Tuple[Optional[List[str]], Optional[List[str]]]:
+    """Return the ``?fields=`` and ``?expand=`` selections of the current request."""
+    # 功能：读取稀疏字段集与关联展开参数，交由投影层校验并生成 SQL 列。
+    return parse_csv_arg("fields"), parse_csv_arg("expand")
+
+
+def lookup_ids_from_body() -> Any:
+    """Return the ``ids`` list of a ``POST .../lookup`` JSON body."""
+    payload = request.get_json(silent=True) or {}
+    return payload.get("ids")
+
+
+def parse_str_key(value: Any) -> str:
+    """Accept a non-empty string primary key."""
+    if not isinstance(value, (str, int)) or not str(value).strip():
+        raise ValueError(f"Invalid id: {value!r}")
+    return str(value).strip()
+
+
+def lookup_response(
+    raw_ids: Any,
+    fetch: LookupFetcher,
+    *,
+    parse_key: Callable[[Any], Hashable] = parse_str_key,
+    format_key: Callable[[Hashable], str] = str,
+):
+    """Run a batch primary-key lookup and return ``{"items", "missing"}`` JSON."""
+    # 功能：校验并去重主键列表，批量读取后以主键为键返回结果，并列出未找到的主键。
+    if not isinstance(raw_ids, Sequence) or isinstance(raw_ids, str):
+        return jsonify({"error": "ids must be a list"}), 400
+    if len(raw_ids) > MAX_LOOKUP_IDS:
+        return jsonify({"error": f"At most {MAX_LOOKUP_IDS} ids per lookup"}), 400
+
+    keys: List[Hashable] = []
+    seen = set()
+    try:
+        for raw in raw_ids:
+            key = parse_key(raw)
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        fields, expand = sparse_options()
+        found = fetch(keys, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    items = {format_key(key): found[key] for key in keys if key in found}
+    missing = [format_key(key) for key in keys if key not in found]
+    return jsonify({"items": items, "missing": missing, "requested": len(keys)})
@@ -0,0 +1,109 @@
+"""Registration round (lottery allocation) API endpoints."""
+
+from __future__ import annotations
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import Course, RegistrationRound, TermDict
+from ..repositories.student_repository import StudentRepository
+from ..services import (
+    OfferingFullError,
+    RoundClosedError,
+    allocate_round,
+    create_round,
+    round_summary,
+    student_requests,
+    submit_requests,
+)
+
+bp = Blueprint("registration_api", __name__)
+
+
+def _load_round(round_id: int) -> RegistrationRound | None:
+    return db.session.get(RegistrationRound, round_id)
+
+
+@bp.post("/rounds")
+def open_round():
+    # 功能：开启某学年学期的抽签选课轮次。
+    payload = request.get_json(silent=True) or {}
+    try:
+        year = int(payload["year"])
+        max_courses = int(payload.get("max_courses", 5))
+        seed = int(payload["seed"]) if payload.get("seed") is not None else None
+    except KeyError:
+        return jsonify({"error": "Missing fields: year"}), 400
+    except (TypeError, ValueError):
+        return jsonify({"error": "year, max_courses and seed must be integers"}), 400
+    term = payload.get("term")
+    if not term or db.session.get(TermDict, term) is None:
+        return jsonify({"error": "Term not found"}), 404
+    if max_courses < 1:
+        return jsonify({"error": "max_courses must be positive"}), 400
+    registration_round = create_round(year, term, seed=seed, max_courses=max_courses)
+    return jsonify(round_summary(registration_round)), 201
+
+
+@bp.get("/rounds/<int:round_id>")
+def retrieve_round(round_id: int):
+    registration_round = _load_round(round_id)
+    if registration_round is None:
+        return jsonify({"error": "Round not found"}), 404
+    return jsonify(round_summary(registration_round))
+
+
+@bp.get("/rounds/<int:round_id>/requests/<string:sno>")
+def retrieve_requests(round_id: int, sno: str):
+    # 功能：返回学生本轮提交的志愿列表，分配完成后附带每条志愿的结果。
+    if _load_round(round_id) is None:
+        return jsonify({"error": "Round not found"}), 404
+    return jsonify({"student_id": sno, "items": student_requests(round_id, sno)})
+
+
+@bp.put("/rounds/<int:round_id>/requests/<string:sno>")
+def replace_requests(round_id: int, sno: str):
+    # 功能：整体替换学生的志愿列表（数组顺序即志愿顺序）。
+    registration_round = _load_round(round_id)
+    if registration_round is None:
+        return jsonify({"error": "Round not found"}), 404
+    if StudentRepository.get(sno) is None:
+        return jsonify({"error": "Student not found"}), 404
+
+    payload = request.get_json(silent=True) or {}
+    courses = payload.get("courses")
+    if not isinstance(courses, list) or not all(isinstance(cno, str) and cno.strip() for cno in courses):
+        return jsonify({"error": "courses must be a list of course ids"}), 400
+    cnos = [cno.strip() for cno in courses]
+    limit = current_app.config.get("LOTTERY_MAX_REQUESTS", 10)
+    if len(cnos) > limit:
+        return jsonify({"error": f"At most {limit} requests per student"}), 400
+    if len(set(cnos)) != len(cnos):
+        return jsonify({"error": "Duplicate course in requests"}), 400
+    known = set(db.session.scalars(select(Course.cno).where(Course.cno.in_(cnos)))) if cnos else set()
+    unknown = [cno for cno in cnos if cno not in known]
+    if unknown:
+        return jsonify({"error": f"Course not found: {', '.join(unknown)}"}), 404
+
+    try:
+        submit_requests(registration_round, sno, cnos)
+    except RoundClosedError as exc:
+        return jsonify({"error": str(exc)}), 409
+    except IntegrityError as exc:
+        return jsonify({"error": "Failed to save requests", "details": str(exc.orig)}), 400
+    return jsonify({"student_id": sno, "items": student_requests(round_id, sno)})
+
+
+@bp.post("/rounds/<int:round_id>/allocate")
+def allocate(round_id: int):
+    # 功能：关闭轮次并一次性分配全部名额；dry_run 只返回模拟结果。
+    payload = request.get_json(silent=True) or {}
+    try:
+        report = allocate_round(round_id, dry_run=bool(payload.get("dry_run")))
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
+    except (RoundClosedError, OfferingFullError) as exc:
+        return jsonify({"error": str(exc)}), 409
+    return jsonify(report)
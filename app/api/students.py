@@ -14,10 +14,13 @@ from ..constants import (
     ENTITY_PK_EMPTY_MSG,
     REFERENTIAL_DEPARTMENT_MSG,
 )
+from ..caching import swr_cached
 from ..extensions import db
-from ..models import Department, Student
+from ..models import Department, Enrollment, Student, Teaching, TeachingSlot
 from ..repositories.student_repository import StudentRepository
-from ..services import format_integrity_violation, validate_student_enroll_year
+from ..services import format_integrity_violation, student_timetable, validate_student_enroll_year
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import lookup_ids_from_body, lookup_response, parse_csv_arg, sparse_options
 
 bp = Blueprint("students_api", __name__)
 
@@ -51,8 +54,13 @@ def _parse_birth_date(value: Any) -> Any:
 
 
 @bp.get("/")
+@conditional_get(Student, Department)
 def list_students():
     # 功能：按条件分页检索学生列表并返回总数。
+    raw_ids = parse_csv_arg("ids")
+    if raw_ids is not None:
+        return lookup_response(raw_ids, StudentRepository.get_rows)
+
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
     department = request.args.get("department")
@@ -63,18 +71,24 @@ def list_students():
 
     enroll_year_int = int(enroll_year) if enroll_year else None
 
-    students, total = StudentRepository.list(
-        department=department,
-        enroll_year=enroll_year_int,
-        student_id=student_id,
-        name=name_filter,
-        keyword=keyword,
-        page=page,
-        per_page=per_page,
-    )
+    fields, expand = sparse_options()
+    try:
+        items, total = StudentRepository.list_rows(
+            department=department,
+            enroll_year=enroll_year_int,
+            student_id=student_id,
+            name=name_filter,
+            keyword=keyword,
+            page=page,
+            per_page=per_page,
+            fields=fields,
+            expand=expand,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     return jsonify(
         {
-            "items": [_serialize_student(student) for student in students],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
@@ -138,13 +152,40 @@ def create_student():
     return jsonify(_serialize_student(student)), 201
 
 
+@bp.post("/lookup")
+def lookup_students():
+    # 功能：按学号列表批量读取学生，返回以学号为键的结果与缺失学号。
+    return lookup_response(lookup_ids_from_body(), StudentRepository.get_rows)
+
+
 @bp.get("/<string:sno>")
+@conditional_get(Student, Department)
 def retrieve_student(sno: str):
     # 功能：按学号获取学生详情，找不到时返回 404。
-    student = StudentRepository.get(sno)
+    fields, expand = sparse_options()
+    try:
+        student = StudentRepository.get_row(sno, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if not student:
         return jsonify({"error": "Student not found"}), 404
-    return jsonify(_serialize_student(student))
+    return jsonify(student)
+
+
+@bp.get("/<string:sno>/timetable")
+@conditional_get(Enrollment, Teaching, TeachingSlot)
+def retrieve_timetable(sno: str):
+    # 功能：返回学生在指定学年学期的每周上课节次。
+    if not StudentRepository.get(sno):
+        return jsonify({"error": "Student not found"}), 404
+    term = request.args.get("term")
+    try:
+        year = int(request.args.get("year", ""))
+    except ValueError:
+        return jsonify({"error": "year must be an integer"}), 400
+    if not term:
+        return jsonify({"error": "term is required"}), 400
+    return jsonify(student_timetable(sno, year, term))
 
 
 @bp.put("/<string:sno>")
@@ -224,6 +265,8 @@ def delete_student(sno: str):
 
 
 @bp.get("/meta")
+@conditional_get(Student, Department, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Student, Department))
 def student_meta():
     """Return dropdown data and aggregated statistics for the student module."""
     departments = (
@@ -8,6 +8,7 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
+from ..caching import swr_cached
 from ..constants import (
     ENTITY_PK_DUP_MSG,
     ENTITY_PK_EMPTY_MSG,
@@ -15,9 +16,16 @@ from ..constants import (
     TEACHER_TITLES,
 )
 from ..extensions import db
-from ..models import Department, Teacher
+from ..models import Course, Department, Enrollment, Teacher, TeacherWorkload, Teaching
 from ..repositories.teacher_repository import TeacherRepository
-from ..services import describe_teacher_teaching_reference, format_integrity_violation
+from ..services import (
+    describe_teacher_teaching_reference,
+    format_integrity_violation,
+    teacher_workload,
+    workload_ranking,
+)
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import lookup_ids_from_body, lookup_response, parse_csv_arg, sparse_options
 
 bp = Blueprint("teachers_api", __name__)
 
@@ -37,7 +45,12 @@ def _serialize_teacher(teacher: Teacher) -> Dict[str, Any]:
 
 
 @bp.get("/")
+@conditional_get(Teacher, Department)
 def list_teachers():
+    raw_ids = parse_csv_arg("ids")
+    if raw_ids is not None:
+        return lookup_response(raw_ids, TeacherRepository.get_rows)
+
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
     department = request.args.get("department")
@@ -47,19 +60,25 @@ def list_teachers():
     email_filter = request.args.get("email")
     phone_filter = request.args.get("phone")
 
-    teachers, total = TeacherRepository.list(
-        department=department,
-        title=title,
-        name=name_filter,
-        email=email_filter,
-        phone=phone_filter,
-        keyword=keyword,
-        page=page,
-        per_page=per_page,
-    )
+    fields, expand = sparse_options()
+    try:
+        items, total = TeacherRepository.list_rows(
+            department=department,
+            title=title,
+            name=name_filter,
+            email=email_filter,
+            phone=phone_filter,
+            keyword=keyword,
+            page=page,
+            per_page=per_page,
+            fields=fields,
+            expand=expand,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     return jsonify(
         {
-            "items": [_serialize_teacher(teacher) for teacher in teachers],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
@@ -104,12 +123,65 @@ def create_teacher():
     return jsonify(_serialize_teacher(teacher)), 201
 
 
+@bp.post("/lookup")
+def lookup_teachers():
+    # 功能：按工号列表批量读取教师，返回以工号为键的结果与缺失工号。
+    return lookup_response(lookup_ids_from_body(), TeacherRepository.get_rows)
+
+
 @bp.get("/<string:tno>")
+@conditional_get(Teacher, Department)
 def retrieve_teacher(tno: str):
-    teacher = TeacherRepository.get(tno)
+    fields, expand = sparse_options()
+    try:
+        teacher = TeacherRepository.get_row(tno, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if not teacher:
         return jsonify({"error": "Teacher not found"}), 404
-    return jsonify(_serialize_teacher(teacher))
+    return jsonify(teacher)
+
+
+def _term_args():
+    # 功能：解析可选的 year/term 查询参数，year 非整数时抛出 ValueError。
+    year_raw = request.args.get("year")
+    year = int(year_raw) if year_raw else None
+    return year, request.args.get("term") or None
+
+
+@bp.get("/<string:tno>/workload")
+@conditional_get(TeacherWorkload, Teaching, Course, Enrollment)
+def retrieve_workload(tno: str):
+    # 功能：从工作量汇总表返回教师各学期的授课门数、学分、学时与选课人数及合计。
+    if not TeacherRepository.get(tno):
+        return jsonify({"error": "Teacher not found"}), 404
+    try:
+        year, term = _term_args()
+    except ValueError:
+        return jsonify({"error": "year must be an integer"}), 400
+    return jsonify(teacher_workload(tno, year=year, term=term))
+
+
+@bp.get("/workload/ranking")
+@conditional_get(TeacherWorkload, Teaching, Course, Enrollment, Teacher, Department)
+def workload_ranking_view():
+    # 功能：按院系汇总工作量排名并列出教师排名，可用 department 限定教师排名的院系。
+    try:
+        year, term = _term_args()
+        limit = max(min(int(request.args.get("limit", 20)), 100), 1)
+    except ValueError:
+        return jsonify({"error": "year and limit must be integers"}), 400
+    try:
+        ranking = workload_ranking(
+            year=year,
+            term=term,
+            metric=request.args.get("metric", "contact_hours"),
+            dno=request.args.get("department") or None,
+            limit=limit,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(ranking)
 
 
 @bp.put("/<string:tno>")
@@ -161,6 +233,8 @@ def delete_teacher(tno: str):
 
 
 @bp.get("/meta")
+@conditional_get(Teacher, Department, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Teacher, Department))
 def teacher_meta():
     """Return dropdown options and aggregated stats."""
     departments = (
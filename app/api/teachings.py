@@ -3,15 +3,31 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
+from ..caching import swr_cached
 from ..extensions import db
-from ..models import Classroom, Course, Teacher, Teaching, TermDict
-from ..repositories.teaching_repository import TeachingRepository
+from ..models import Classroom, Course, Enrollment, Teacher, Teaching, TeachingSlot, TermDict
+from ..repositories.teaching_repository import TOTAL_MODES, TeachingRepository
+from ..services import (
+    RoomConflictError,
+    check_room_booking,
+    remaining_seats,
+    replace_teaching_slots,
+    teaching_slots,
+)
+from .http_cache import SHORT_LIVED, conditional_get
+from .query_options import (
+    MAX_LOOKUP_IDS,
+    lookup_ids_from_body,
+    lookup_response,
+    parse_csv_arg,
+    sparse_options,
+)
 
 bp = Blueprint("teachings_api", __name__)
 
@@ -25,6 +41,13 @@ def _parse_date(value: Optional[str]) -> Optional[datetime.date]:
         raise ValueError("Date must be in YYYY-MM-DD format")
 
 
+def _parse_teach_id(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid teach_id: {value!r}")
+
+
 def _serialize_teaching(teaching: Teaching) -> Dict[str, Any]:
     course = teaching.course
     teacher = teaching.teacher
@@ -46,7 +69,16 @@ def _serialize_teaching(teaching: Teaching) -> Dict[str, Any]:
 
 
 @bp.get("/")
+@conditional_get(Teaching, Course, Teacher, Classroom)
 def list_teachings():
+    raw_ids = parse_csv_arg("ids")
+    if raw_ids is not None:
+        return lookup_response(
+            raw_ids,
+            TeachingRepository.get_rows,
+            parse_key=_parse_teach_id,
+        )
+
     page = max(int(request.args.get("page", 1)), 1)
     per_page = max(min(int(request.args.get("per_page", 20)), 100), 1)
     course_id = request.args.get("course")
@@ -59,19 +91,29 @@ def list_teachings():
             year = int(year_raw)
         except ValueError:
             return jsonify({"error": "year must be an integer"}), 400
+    total_mode = (request.args.get("total") or "window").lower()
+    if total_mode not in TOTAL_MODES:
+        return jsonify({"error": f"total must be one of {', '.join(TOTAL_MODES)}"}), 400
 
-    teachings, total = TeachingRepository.list(
-        course_id=course_id,
-        teacher_id=teacher_id,
-        term=term,
-        year=year,
-        page=page,
-        per_page=per_page,
-    )
+    fields, expand = sparse_options()
+    try:
+        items, total = TeachingRepository.list_rows(
+            course_id=course_id,
+            teacher_id=teacher_id,
+            term=term,
+            year=year,
+            page=page,
+            per_page=per_page,
+            total_mode=total_mode,
+            fields=fields,
+            expand=expand,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify(
         {
-            "items": [_serialize_teaching(teaching) for teaching in teachings],
+            "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
@@ -106,6 +148,23 @@ def _validate_foreign_keys(payload: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+def _check_booking(
+    room_id: Optional[str],
+    start_date: Optional[datetime.date],
+    end_date: Optional[datetime.date],
+    *,
+    teach_id: Optional[int] = None,
+):
+    # 功能：用教室区间索引预检起止日期，与同一教室的其他授课安排重叠时返回 409；提交时还会加锁复核。
+    if start_date and end_date and end_date < start_date:
+        return jsonify({"error": "end_date must not be before start_date"}), 400
+    try:
+        check_room_booking(room_id, start_date, end_date, exclude=teach_id)
+    except RoomConflictError as exc:
+        return jsonify({"error": str(exc), "conflicts": exc.conflicts}), 409
+    return None
+
+
 def _teaching_payload_from_request() -> Dict[str, Any]:
     payload = request.get_json(silent=True) or {}
     required = {"course_id", "teacher_id", "year", "term"}
@@ -153,9 +212,14 @@ def create_teaching():
     )
     if fk_error:
         return jsonify({"error": fk_error}), 404
+    booking_error = _check_booking(data.get("room_id"), data.get("start_date"), data.get("end_date"))
+    if booking_error:
+        return booking_error
 
     try:
         teaching = TeachingRepository.create(data)
+    except RoomConflictError as exc:
+        return jsonify({"error": str(exc), "conflicts": exc.conflicts}), 409
     except IntegrityError as exc:
         return jsonify({"error": "Failed to create teaching", "details": str(exc.orig)}), 400
 
@@ -164,12 +228,65 @@ def create_teaching():
     return jsonify(_serialize_teaching(teaching)), 201
 
 
+@bp.post("/lookup")
+def lookup_teachings():
+    # 功能：按授课编号列表批量读取授课安排。
+    return lookup_response(
+        lookup_ids_from_body(),
+        TeachingRepository.get_rows,
+        parse_key=_parse_teach_id,
+    )
+
+
+def _parse_offering(value: str) -> Tuple[str, int, str]:
+    # 功能：解析 "课程号:学年:学期" 形式的开课标识。
+    parts = [part.strip() for part in value.split(":")]
+    if len(parts) != 3 or not parts[0] or not parts[2] or not parts[1].isdigit():
+        raise ValueError(f"Invalid offering: {value!r} (expected course_id:year:term)")
+    return parts[0], int(parts[1]), parts[2]
+
+
+@bp.get("/seats")
+@conditional_get(Teaching, Enrollment)
+def offering_seats():
+    """Capacity and remaining seats for many offerings at once.
+
+    Pass ``?offerings=C0001:2025:2025FAL,...`` for specific offerings, or
+    ``?year=&term=`` for every offering of a term.
+    """
+    # 功能：批量返回开课容量、已占与剩余名额，读取名额计数表而非逐门统计选课记录。
+    raw = parse_csv_arg("offerings")
+    if raw is not None:
+        if len(raw) > MAX_LOOKUP_IDS:
+            return jsonify({"error": f"At most {MAX_LOOKUP_IDS} offerings per request"}), 400
+        try:
+            keys = [_parse_offering(value) for value in raw]
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify({"items": remaining_seats(keys)})
+
+    year = request.args.get("year")
+    term = request.args.get("term")
+    if not year or not term:
+        return jsonify({"error": "Provide offerings, or both year and term"}), 400
+    try:
+        year_int = int(year)
+    except ValueError:
+        return jsonify({"error": "year must be an integer"}), 400
+    return jsonify({"items": remaining_seats(year=year_int, term=term)})
+
+
 @bp.get("/<int:teach_id>")
+@conditional_get(Teaching, Course, Teacher, Classroom)
 def retrieve_teaching(teach_id: int):
-    teaching = TeachingRepository.get(teach_id)
+    fields, expand = sparse_options()
+    try:
+        teaching = TeachingRepository.get_row(teach_id, fields=fields, expand=expand)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if not teaching:
         return jsonify({"error": "Teaching not found"}), 404
-    return jsonify(_serialize_teaching(teaching))
+    return jsonify(teaching)
 
 
 @bp.put("/<int:teach_id>")
@@ -221,8 +338,19 @@ def update_teaching(teach_id: int):
             except ValueError as exc:
                 return jsonify({"error": str(exc)}), 400
 
+    booking_error = _check_booking(
+        update_data.get("room_id", teaching.room_id),
+        update_data.get("start_date", teaching.start_date),
+        update_data.get("end_date", teaching.end_date),
+        teach_id=teach_id,
+    )
+    if booking_error:
+        return booking_error
+
     try:
         teaching = TeachingRepository.update(teaching, update_data)
+    except RoomConflictError as exc:
+        return jsonify({"error": str(exc), "conflicts": exc.conflicts}), 409
     except IntegrityError as exc:
         return jsonify({"error": "Failed to update teaching", "details": str(exc.orig)}), 400
 
@@ -230,6 +358,33 @@ def update_teaching(teach_id: int):
     return jsonify(_serialize_teaching(teaching))
 
 
+@bp.get("/<int:teach_id>/slots")
+@conditional_get(Teaching, TeachingSlot)
+def retrieve_slots(teach_id: int):
+    # 功能：返回授课安排的每周上课节次。
+    if not TeachingRepository.get(teach_id):
+        return jsonify({"error": "Teaching not found"}), 404
+    return jsonify({"teach_id": teach_id, "slots": teaching_slots(teach_id)})
+
+
+@bp.put("/<int:teach_id>/slots")
+def replace_slots(teach_id: int):
+    # 功能：整体替换授课安排的每周上课节次，body 为 {"slots": [{"weekday": 1, "period": 3}, ...]}。
+    if not TeachingRepository.get(teach_id):
+        return jsonify({"error": "Teaching not found"}), 404
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("slots")
+    if not isinstance(items, list):
+        return jsonify({"error": "slots must be a list"}), 400
+    try:
+        slots = [(int(item["weekday"]), int(item["period"])) for item in items]
+        saved = replace_teaching_slots(teach_id, slots)
+    except (TypeError, KeyError, ValueError) as exc:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid slot: {exc}"}), 400
+    return jsonify({"teach_id": teach_id, "slots": saved})
+
+
 @bp.delete("/<int:teach_id>")
 def delete_teaching(teach_id: int):
     teaching = TeachingRepository.get(teach_id)
@@ -240,6 +395,8 @@ def delete_teaching(teach_id: int):
 
 
 @bp.get("/meta")
+@conditional_get(Teaching, Course, Teacher, Classroom, TermDict, cache_control=SHORT_LIVED)
+@swr_cached(depends_on=(Teaching, Course, Teacher, Classroom, TermDict))
 def teaching_meta():
     """Return dropdown data and aggregated stats."""
     courses = (
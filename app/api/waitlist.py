@@ -0,0 +1,81 @@
+"""Waitlist API endpoints for full course offerings."""
+
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy.exc import IntegrityError
+
+from ..constants import ENTITY_PK_DUP_MSG, ENTITY_PK_EMPTY_MSG, REFERENTIAL_STUDENT_COURSE_MSG
+from ..extensions import db
+from ..models import TermDict
+from ..repositories.course_repository import CourseRepository
+from ..repositories.enrollment_repository import EnrollmentRepository
+from ..repositories.student_repository import StudentRepository
+from ..services import join_waitlist, leave_waitlist, remaining_seats, waitlist_position
+from ..services.seats import SEAT_HOLDING_STATUSES
+
+bp = Blueprint("waitlist_api", __name__)
+
+
+@bp.post("/")
+def join():
+    # 功能：校验学生、课程与先修课后加入满员开课的候补队列，返回排队名次。
+    payload = request.get_json(silent=True) or {}
+    required = {"student_id", "course_id", "year", "term"}
+    missing = [field for field in required if field not in payload]
+    if missing:
+        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+
+    sno = str(payload["student_id"]).strip()
+    cno = str(payload["course_id"]).strip()
+    if not sno or not cno:
+        return jsonify({"error": ENTITY_PK_EMPTY_MSG}), 400
+    try:
+        year = int(payload["year"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "year must be an integer"}), 400
+    term = payload["term"]
+    if not term or db.session.get(TermDict, term) is None:
+        return jsonify({"error": "Term not found"}), 404
+
+    student = StudentRepository.get(sno)
+    course = CourseRepository.get(cno)
+    if not student or not course:
+        return jsonify({"error": REFERENTIAL_STUDENT_COURSE_MSG}), 400
+
+    enrollment = EnrollmentRepository.get(sno, cno)
+    if enrollment is not None and enrollment.status in SEAT_HOLDING_STATUSES:
+        return jsonify({"error": ENTITY_PK_DUP_MSG}), 400
+    if not EnrollmentRepository.prerequisite_satisfied(sno, course):
+        return jsonify({"error": "Prerequisite not satisfied"}), 400
+
+    existing = waitlist_position(sno, cno)
+    if existing is not None:
+        return jsonify({"error": "Already on the waitlist", **existing}), 409
+
+    seats = remaining_seats([(cno, year, term)])[0]
+    if seats["remaining"] is None or seats["remaining"] > 0:
+        return jsonify({"error": "Seats are available; enroll directly", **seats}), 409
+
+    try:
+        entry = join_waitlist(sno, cno, year, term)
+    except IntegrityError as exc:
+        return jsonify({"error": "Failed to join waitlist", "details": str(exc.orig)}), 409
+    return jsonify(entry), 201
+
+
+@bp.get("/<string:sno>/<string:cno>")
+def position(sno: str, cno: str):
+    # 功能：返回学生在该课程候补队列中的名次与队列长度。
+    entry = waitlist_position(sno, cno)
+    if entry is None:
+        return jsonify({"error": "Not on the waitlist"}), 404
+    return jsonify(entry)
+
+
+@bp.delete("/<string:sno>/<string:cno>")
+def leave(sno: str, cno: str):
+    # 功能：学生主动退出候补队列。
+    if not leave_waitlist(sno, cno):
+        return jsonify({"error": "Not on the waitlist"}), 404
+    return jsonify({"status": "deleted"})
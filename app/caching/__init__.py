@@ -0,0 +1,27 @@
+"""Request coalescing and caching helpers shared by the API and HTML routes."""
+
+from .fragments import FragmentCacheExtension, deferred, init_fragment_cache
+from .single_flight import FileSingleFlight, SingleFlight, get_single_flight
+from .swr import (
+    MemoryLRUBackend,
+    SQLiteBackend,
+    StaleWhileRevalidateCache,
+    get_swr_cache,
+    init_swr_cache,
+    swr_cached,
+)
+
+__all__ = [
+    "FileSingleFlight",
+    "FragmentCacheExtension",
+    "MemoryLRUBackend",
+    "SQLiteBackend",
+    "StaleWhileRevalidateCache",
+    "deferred",
+    "init_fragment_cache",
+    "SingleFlight",
+    "get_single_flight",
+    "get_swr_cache",
+    "init_swr_cache",
+    "swr_cached",
+]
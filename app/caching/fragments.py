@@ -0,0 +1,100 @@
+"""Jinja ``{% cache %}`` fragment caching keyed on table write versions."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from flask import Flask, current_app, g
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from .. import models
+from ..services.table_versions import table_version_token
+from .single_flight import get_single_flight
+from .swr import CacheEntry, get_swr_cache
+
+
+def deferred(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a loader so a template can call it repeatedly but it runs at most once.
+
+    Views pass loaders instead of query results so that a cached fragment skips
+    the queries entirely; only a cache miss invokes the loader.
+    """
+    result: List[Any] = []
+
+    def load() -> Any:
+        if not result:
+            result.append(fn())
+        return result[0]
+
+    return load
+
+
+def _resolve_models(names: Sequence[str]) -> List[Any]:
+    resolved = []
+    for name in names:
+        model = getattr(models, name, None)
+        if model is None or not hasattr(model, "__table__"):
+            raise LookupError(f"Unknown model in cache tag: {name}")
+        resolved.append(model)
+    return resolved
+
+
+def _version_token(names: Tuple[str, ...]) -> str:
+    # 同一请求内多个片段依赖相同的表时只查询一次版本号
+    tokens: Dict[Tuple[str, ...], str] = g.setdefault("_fragment_version_tokens", {})
+    if names not in tokens:
+        tokens[names] = table_version_token(_resolve_models(names)) if names else ""
+    return tokens[names]
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache key, ttl, "Model", ... %}…{% endcache %}``.
+
+    The rendered body is stored in the application's cache backend (the same
+    store as the stale-while-revalidate cache) under ``key`` plus the write
+    versions of the named models. Any write through the ORM session bumps
+    those versions, so the next render misses and rebuilds the fragment; the
+    old entry simply ages out. ``ttl`` (seconds) bounds how long an entry is
+    reused when no write happens.
+    """
+
+    tags = {"cache"}
+
+    def parse(self, parser: Any) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        if len(args) < 2:
+            parser.fail("cache tag expects at least a key and a TTL", lineno)
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, args: List[Any], caller: Callable[[], str]) -> Markup:
+        # 功能：命中且未过期时直接输出缓存的 HTML，否则渲染片段并写回缓存。
+        key, ttl, *tables = args
+        if not current_app.config.get("FRAGMENT_CACHE_ENABLED", True):
+            return Markup(caller())
+        cache_key = f"fragment:{key}:{_version_token(tuple(tables))}"
+        backend = get_swr_cache().backend
+        entry = backend.get(cache_key)
+        if entry is not None and time.time() < entry.hard_expires_at:
+            return Markup(entry.value)
+
+        def render() -> str:
+            html = str(caller())
+            now = time.time()
+            backend.set(cache_key, CacheEntry(html, now, now + float(ttl), now + float(ttl)))
+            return html
+
+        return Markup(get_single_flight().do(cache_key, render))
+
+
+def init_fragment_cache(app: Flask) -> None:
+    """Enable the ``{% cache %}`` tag in the application's templates."""
+    # 功能：注册 Jinja 扩展；需在 init_swr_cache 之后调用以复用同一缓存后端。
+    app.jinja_env.add_extension(FragmentCacheExtension)
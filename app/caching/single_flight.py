@@ -0,0 +1,158 @@
+"""Single-flight execution: concurrent identical calls share one computation."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app, request
+
+try:  # fcntl 仅在 POSIX 平台可用，Windows 下退化为进程内单飞
+    import fcntl
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None
+
+# 视图结果在等待者之间共享时使用的可序列化形式：(body, status, headers)
+SharedResponse = Tuple[bytes, int, List[Tuple[str, str]]]
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Per-process single-flight group keyed by arbitrary strings.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running block and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        # 功能：同一 key 同时只执行一次 fn，其余调用等待并复用首个调用的结果。
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class FileSingleFlight(SingleFlight):
+    """Single-flight shared by several worker processes through ``flock`` files.
+
+    Inside a process the in-memory group is used first, so only one thread per
+    worker reaches the file lock. The worker that holds the lock computes and
+    writes the pickled result next to it; workers that were waiting read that
+    result instead of recomputing when it finished after they started waiting.
+    """
+
+    def __init__(self, lock_dir: os.PathLike | str) -> None:
+        super().__init__()
+        self.lock_dir = Path(lock_dir)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        if fcntl is None:
+            return super().do(key, fn)
+        return super().do(key, lambda: self._do_locked(key, fn))
+
+    def _do_locked(self, key: str, fn: Callable[[], Any]) -> Any:
+        # 功能：跨进程加文件锁；拿到锁时若已有本次等待期间产生的结果则直接读取。
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        lock_path = self.lock_dir / f"{digest}.lock"
+        result_path = self.lock_dir / f"{digest}.result"
+        waiting_since = time.time()
+
+        with open(lock_path, "a+b") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                shared = self._read_result(result_path, waiting_since)
+                if shared is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    return shared[1]
+            try:
+                result = fn()
+                self._write_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_result(path: Path, not_before: float) -> Optional[Tuple[float, Any]]:
+        try:
+            with open(path, "rb") as handle:
+                finished_at, result = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if finished_at < not_before:
+            return None
+        return finished_at, result
+
+    @staticmethod
+    def _write_result(path: Path, result: Any) -> None:
+        # 先写临时文件再原子替换，避免其他进程读到半截结果
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".result-")
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump((time.time(), result), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+
+
+_groups: Dict[Tuple[str, str], SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the group configured by ``SINGLE_FLIGHT_BACKEND`` for the current app."""
+    backend = current_app.config.get("SINGLE_FLIGHT_BACKEND", "process")
+    lock_dir = str(current_app.config.get("SINGLE_FLIGHT_LOCK_DIR", ""))
+    with _groups_lock:
+        group = _groups.get((backend, lock_dir))
+        if group is None:
+            if backend == "file":
+                group = FileSingleFlight(lock_dir)
+            elif backend == "process":
+                group = SingleFlight()
+            else:
+                raise ValueError("SINGLE_FLIGHT_BACKEND must be 'process' or 'file'")
+            _groups[(backend, lock_dir)] = group
+    return group
+
+
+def request_key(view_kwargs: Dict[str, Any]) -> str:
+    """Normalize the current request into ``endpoint?sorted-args`` form."""
+    args = sorted((key, value) for key, values in request.args.lists() for value in values)
+    parts = [f"{key}={value}" for key, value in args]
+    parts.extend(f"{key}={value}" for key, value in sorted(view_kwargs.items()))
+    return f"{request.endpoint}?{'&'.join(parts)}"
@@ -0,0 +1,402 @@
+"""Stale-while-revalidate cache with soft/hard TTLs and pluggable backends."""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, make_response, request
+
+from .single_flight import SharedResponse, get_single_flight, request_key
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with the two deadlines that drive revalidation."""
+
+    value: Any
+    created_at: float
+    soft_expires_at: float
+    hard_expires_at: float
+
+
+@dataclass
+class EntryStats:
+    """Per-key counters kept by the owning process."""
+
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    last_compute_ms: Optional[float] = None
+    last_error: Optional[str] = field(default=None)
+
+
+class MemoryLRUBackend:
+    """In-process store bounded to ``max_entries`` with least-recently-used eviction."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """File-backed store shared by all workers on one host.
+
+    Values are pickled into a single SQLite table in WAL mode; each call opens
+    a short-lived connection so the backend is safe across threads and forks.
+    """
+
+    def __init__(self, path: Path | str, max_entries: int = 1024) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS swr_cache ("
+                " cache_key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " soft_expires_at REAL NOT NULL,"
+                " hard_expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at, soft_expires_at, hard_expires_at"
+                " FROM swr_cache WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(pickle.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        blob = pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO swr_cache"
+                " (cache_key, value, created_at, soft_expires_at, hard_expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, entry.created_at, entry.soft_expires_at, entry.hard_expires_at),
+            )
+            # 超出容量时清理最早过期的条目
+            conn.execute(
+                "DELETE FROM swr_cache WHERE cache_key IN ("
+                " SELECT cache_key FROM swr_cache ORDER BY hard_expires_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM swr_cache WHERE cache_key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM swr_cache")
+
+
+class StaleWhileRevalidateCache:
+    """Serve cached values, refreshing them in the background once past the soft TTL.
+
+    * age < soft TTL: fresh hit, returned as is.
+    * soft TTL <= age < hard TTL: stale hit, returned immediately while one
+      background refresh per key recomputes the value.
+    * otherwise: miss, computed synchronously through the single-flight group.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        backend: Any,
+        *,
+        soft_ttl: float = 30,
+        hard_ttl: float = 600,
+        refresh_workers: int = 2,
+    ) -> None:
+        self.app = app
+        self.backend = backend
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="swr-refresh"
+        )
+        self._refreshing: set[str] = set()
+        self._stats: Dict[str, EntryStats] = {}
+        self._keys_by_table: Dict[str, set[str]] = {}
+        # 失效计数：计算开始后条目被失效过，结果就不再写回，免得旧数据带着新的软过期时间复活
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _entry_stats(self, key: str) -> EntryStats:
+        with self._lock:
+            return self._stats.setdefault(key, EntryStats())
+
+    def _store(
+        self, key: str, fn: Callable[[], Any], soft_ttl: float, hard_ttl: float
+    ) -> Any:
+        generation = self._generation(key)
+        started = time.perf_counter()
+        value = fn()
+        now = time.time()
+        self._entry_stats(key).last_compute_ms = (time.perf_counter() - started) * 1000
+        if value is not None:
+            # 比较与写回在同一把锁内完成，失效不会夹在两者之间
+            with self._lock:
+                if (self._epoch, self._generations.get(key, 0)) == generation:
+                    self.backend.set(key, CacheEntry(value, now, now + soft_ttl, now + hard_ttl))
+        return value
+
+    def _generation(self, key: str) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def _bump(self, keys: Iterable[str]) -> None:
+        # 调用方需持有 self._lock
+        for key in keys:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get_or_compute(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        *,
+        refresh: Optional[Callable[[], Any]] = None,
+        soft_ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None,
+        tables: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached value for ``key``; ``fn`` computing ``None`` is not stored.
+
+        ``refresh`` is the callable used by the background thread; it defaults
+        to ``fn`` and must set up whatever context ``fn`` relies on. ``tables``
+        names the tables the value is derived from; a change to any of them
+        reported through :meth:`on_changes` drops the entry.
+        """
+        # 功能：按软/硬过期时间决定直接返回、返回旧值并后台刷新或同步计算。
+        soft = self.soft_ttl if soft_ttl is None else soft_ttl
+        hard = self.hard_ttl if hard_ttl is None else hard_ttl
+        stats = self._entry_stats(key)
+        if tables:
+            with self._lock:
+                for table in tables:
+                    self._keys_by_table.setdefault(table, set()).add(key)
+        entry = self.backend.get(key)
+        now = time.time()
+        if entry is not None and now < entry.soft_expires_at:
+            stats.fresh_hits += 1
+            return entry.value
+        if entry is not None and now < entry.hard_expires_at:
+            stats.stale_hits += 1
+            self._schedule_refresh(key, refresh or fn, soft, hard)
+            return entry.value
+
+        stats.misses += 1
+        return get_single_flight().do(
+            f"swr:{key}", lambda: self._store(key, fn, soft, hard)
+        )
+
+    def _schedule_refresh(
+        self, key: str, fn: Callable[[], Any], soft_ttl: float, hard_ttl: float
+    ) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, fn, soft_ttl, hard_ttl)
+
+    def _refresh(self, key: str, fn: Callable[[], Any], soft_ttl: float, hard_ttl: float) -> None:
+        # 功能：后台线程内重新计算并写回缓存，失败时保留旧值并记录错误。
+        stats = self._entry_stats(key)
+        try:
+            self._store(key, fn, soft_ttl, hard_ttl)
+            stats.refreshes += 1
+        except Exception as exc:  # noqa: BLE001 - keep serving the stale value
+            stats.refresh_errors += 1
+            stats.last_error = str(exc)
+            self.app.logger.exception("Background refresh of %s failed", key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop ``key`` (or everything); computations already running will not store their result."""
+        with self._lock:
+            if key is None:
+                self._epoch += 1
+            else:
+                self._bump([key])
+        if key is None:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop every entry registered as depending on one of ``tables``.
+
+        A refresh or miss that started before the call still returns its value
+        to its caller but does not write it back to the cache.
+        """
+        with self._lock:
+            keys = set()
+            for table in tables:
+                keys |= self._keys_by_table.pop(table, set())
+            self._bump(keys)
+        for key in keys:
+            self.backend.delete(key)
+        return len(keys)
+
+    def on_changes(self, changes: List[Any]) -> None:
+        """Change-bus subscriber: invalidate entries built from the changed tables."""
+        # 功能：其他 worker（或本进程）写入后，按表删除本进程可见的缓存项，使下一次请求重新计算。
+        self.invalidate_tables({change.table for change in changes})
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-key counters plus the current age of each cached entry."""
+        now = time.time()
+        with self._lock:
+            snapshot = {key: dict(vars(stats)) for key, stats in self._stats.items()}
+        for key, item in snapshot.items():
+            entry = self.backend.get(key)
+            item["cached"] = entry is not None
+            item["age_seconds"] = round(now - entry.created_at, 3) if entry else None
+            item["state"] = _entry_state(entry, now)
+        return snapshot
+
+
+def _entry_state(entry: Optional[CacheEntry], now: float) -> str:
+    if entry is None:
+        return "missing"
+    if now < entry.soft_expires_at:
+        return "fresh"
+    if now < entry.hard_expires_at:
+        return "stale"
+    return "expired"
+
+
+def build_backend(app: Flask) -> Any:
+    backend = app.config.get("SWR_CACHE_BACKEND", "memory")
+    max_entries = app.config.get("SWR_CACHE_MAX_ENTRIES", 256)
+    if backend == "memory":
+        return MemoryLRUBackend(max_entries)
+    if backend == "sqlite":
+        return SQLiteBackend(app.config["SWR_CACHE_PATH"], max_entries)
+    raise ValueError("SWR_CACHE_BACKEND must be 'memory' or 'sqlite'")
+
+
+def init_swr_cache(app: Flask) -> StaleWhileRevalidateCache:
+    """Create the application's cache from ``SWR_*`` settings."""
+    # 功能：按配置创建缓存实例并挂到 app.extensions 上。
+    cache = StaleWhileRevalidateCache(
+        app,
+        build_backend(app),
+        soft_ttl=app.config.get("SWR_SOFT_TTL", 30),
+        hard_ttl=app.config.get("SWR_HARD_TTL", 600),
+        refresh_workers=app.config.get("SWR_REFRESH_WORKERS", 2),
+    )
+    app.extensions["swr_cache"] = cache
+    bus = app.extensions.get("change_bus")
+    if bus is not None:
+        # 写入通过变更总线广播到每个 worker，按依赖的表失效缓存项
+        bus.subscribe(cache.on_changes)
+    return cache
+
+
+def get_swr_cache() -> StaleWhileRevalidateCache:
+    return current_app.extensions["swr_cache"]
+
+
+def swr_cached(
+    soft_ttl: Optional[float] = None,
+    hard_ttl: Optional[float] = None,
+    *,
+    depends_on: Iterable[Any] = (),
+) -> Callable[[Callable], Callable]:
+    """Cache a GET view's successful responses with stale-while-revalidate semantics.
+
+    Cached responses carry a content ETag, so ``conditional_get`` answers
+    repeat requests with 304 even while the entry is stale. Writes to any of
+    the ``depends_on`` models drop the cached responses in every worker.
+    """
+    tables = tuple(model.__table__.name for model in depends_on)
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any):
+            # 非 200 响应不进入缓存，原样返回给本次请求
+            uncached: List[Response] = []
+
+            def compute() -> Optional[SharedResponse]:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    uncached.append(response)
+                    return None
+                body = response.get_data()
+                headers = [(k, v) for k, v in response.headers.items() if k != "ETag"]
+                headers.append(("ETag", f'"{hashlib.sha1(body).hexdigest()}"'))
+                return body, response.status_code, headers
+
+            app = current_app._get_current_object()  # pylint: disable=protected-access
+            path, query_string = request.path, request.query_string
+
+            def refresh() -> Optional[SharedResponse]:
+                # 后台线程没有请求上下文，按原路径与参数重建一个
+                with app.test_request_context(path, query_string=query_string):
+                    return compute()
+
+            cached = get_swr_cache().get_or_compute(
+                request_key(kwargs),
+                compute,
+                refresh=refresh,
+                soft_ttl=soft_ttl,
+                hard_ttl=hard_ttl,
+                tables=tables,
+            )
+            if cached is None:
+                return uncached[0] if uncached else view(*args, **kwargs)
+            body, status, headers = cached
+            return current_app.response_class(body, status=status, headers=headers)
+
+        return wrapper
+
+    return decorator
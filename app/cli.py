@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
 import click
 from flask import Flask
 from flask.cli import with_appcontext
+from sqlalchemy import delete
 
 from .db_init import load_schema
-from .services import populate_sample_data
+from .services import (
+    OfferingFullError,
+    RoundClosedError,
+    allocate_round,
+    assign_rooms,
+    get_waitlist_promoter,
+    populate_sample_data,
+    rebuild_workload,
+    reconcile_seats,
+)
+from .services.benchmark import benchmark_teaching_list
 from .extensions import db
+from .models import ChangeOutbox, EnrollmentEvent
 
 
 def register_cli_commands(app: Flask) -> None:
@@ -38,3 +52,124 @@ def register_cli_commands(app: Flask) -> None:
         # 功能：执行简单查询检测数据库/凭据是否可用。
         db.session.execute(db.text("SELECT 1"))
         click.echo("Database connection OK.")
+
+    @app.cli.command("bench-teachings")
+    @click.option("--iterations", default=50, show_default=True, type=int)
+    @click.option("--per-page", default=20, show_default=True, type=int)
+    @with_appcontext
+    def bench_teachings_command(iterations: int, per_page: int) -> None:
+        """Benchmark the teaching list read paths against the current database."""
+        # 功能：对比 ORM+selectinload 与单条联结投影两种授课列表读取方式。
+        results = benchmark_teaching_list(iterations=iterations, per_page=per_page)
+        click.echo(f"{'path':<20}{'mean ms':>10}{'median ms':>12}{'min ms':>10}{'stmts':>8}")
+        for name, stats in results.items():
+            click.echo(
+                f"{name:<20}{stats['mean_ms']:>10.3f}{stats['median_ms']:>12.3f}"
+                f"{stats['min_ms']:>10.3f}{stats['statements']:>8.1f}"
+            )
+
+    @app.cli.command("prune-outbox")
+    @click.option("--days", default=None, type=int, help="Keep rows newer than this many days.")
+    @with_appcontext
+    def prune_outbox_command(days: int | None) -> None:
+        """Delete old rows from the change and enrollment-event outboxes."""
+        # 功能：按保留天数清理已被各 worker 消费过的发件箱记录。
+        keep_days = app.config.get("OUTBOX_RETENTION_DAYS", 7) if days is None else days
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+        removed_changes = db.session.execute(
+            delete(ChangeOutbox).where(ChangeOutbox.created_at < cutoff)
+        ).rowcount
+        removed_events = db.session.execute(
+            delete(EnrollmentEvent).where(EnrollmentEvent.created_at < cutoff)
+        ).rowcount
+        db.session.commit()
+        click.echo(
+            f"Removed {removed_changes} change(s) and {removed_events} enrollment event(s) "
+            f"older than {keep_days} day(s)."
+        )
+
+    @app.cli.command("reconcile-seats")
+    @click.option("--year", default=None, type=int, help="Only offerings of this year.")
+    @click.option("--term", default=None, help="Only offerings of this term code.")
+    @click.option("--dry-run", is_flag=True, help="Report drift without writing.")
+    @with_appcontext
+    def reconcile_seats_command(year: int | None, term: str | None, dry_run: bool) -> None:
+        """Recompute per-offering seat counters from Teaching and SC."""
+        # 功能：按授课容量与选课记录重建名额计数表，输出修正的行数。
+        report = reconcile_seats(year=year, term=term, dry_run=dry_run)
+        prefix = "Would fix" if dry_run else "Fixed"
+        click.echo(
+            f"{prefix}: {report['inserted']} inserted, {report['updated']} updated, "
+            f"{report['deleted']} deleted; {report['over_capacity']} offering(s) over capacity."
+        )
+
+    @app.cli.command("rebuild-workload")
+    @click.option("--year", default=None, type=int, help="Only terms of this year.")
+    @click.option("--term", default=None, help="Only this term code.")
+    @click.option("--dry-run", is_flag=True, help="Report drift without writing.")
+    @with_appcontext
+    def rebuild_workload_command(year: int | None, term: str | None, dry_run: bool) -> None:
+        """Recompute teacher workload totals from Teaching, Course and SC."""
+        # 功能：按授课安排、课程学分学时与选课记录重建教师工作量汇总表，输出修正的行数。
+        report = rebuild_workload(year=year, term=term, dry_run=dry_run)
+        prefix = "Would fix" if dry_run else "Fixed"
+        click.echo(
+            f"{prefix}: {report['inserted']} inserted, {report['updated']} updated, "
+            f"{report['deleted']} deleted."
+        )
+
+    @app.cli.command("promote-waitlist")
+    @with_appcontext
+    def promote_waitlist_command() -> None:
+        """Promote waitlisted students into every offering with free seats."""
+        # 功能：手动执行一次候补递补扫描，输出各开课递补的学生数。
+        results = get_waitlist_promoter().sweep()
+        for (cno, year, term), snos in results.items():
+            click.echo(f"{cno} {year} {term}: promoted {len(snos)} student(s)")
+        click.echo(f"Promoted {sum(len(snos) for snos in results.values())} student(s) in total.")
+
+    @app.cli.command("allocate-round")
+    @click.argument("round_id", type=int)
+    @click.option("--dry-run", is_flag=True, help="Compute and report without writing.")
+    @with_appcontext
+    def allocate_round_command(round_id: int, dry_run: bool) -> None:
+        """Run the lottery allocation of a registration round."""
+        # 功能：执行抽签分配并输出各类结果的数量与耗时。
+        started = datetime.utcnow()
+        try:
+            report = allocate_round(round_id, dry_run=dry_run)
+        except (LookupError, RoundClosedError, OfferingFullError) as exc:
+            raise click.ClickException(str(exc)) from exc
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        click.echo(
+            f"Round {round_id}: {report['students']} student(s), {report['requests']} request(s)"
+            f"{' (dry run)' if dry_run else ''} in {elapsed:.2f}s"
+        )
+        for outcome, count in report["outcomes"].items():
+            click.echo(f"  {outcome:<12}{count:>10}")
+
+    @app.cli.command("assign-rooms")
+    @click.option("--year", required=True, type=int, help="Year of the teachings to place.")
+    @click.option("--term", required=True, help="Term code of the teachings to place.")
+    @click.option("--improve", is_flag=True, help="Run the local-search pass for unplaced teachings.")
+    @click.option("--dry-run", is_flag=True, help="Print the planned assignments without writing.")
+    @with_appcontext
+    def assign_rooms_command(year: int, term: str, improve: bool, dry_run: bool) -> None:
+        """Assign classrooms to the term's teachings that have no room."""
+        # 功能：为指定学期未分配教室的授课安排自动排教室，dry-run 时逐条列出计划分配结果。
+        started = datetime.utcnow()
+        report = assign_rooms(year, term, improve=improve, dry_run=dry_run)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        if dry_run:
+            for item in report["assignments"]:
+                click.echo(f"  teaching {item['teach_id']:>8} ({item['capacity']:>4}) -> {item['room_id']}")
+        unassigned = report["unassigned"]
+        click.echo(
+            f"{'Would assign' if dry_run else 'Assigned'} {report['assigned']} of "
+            f"{report['candidates']} teaching(s) in {elapsed:.2f}s; {report['relocated']} relocated, "
+            f"{report['wasted_seats']} seat(s) unused."
+        )
+        click.echo(
+            f"Unassigned: {unassigned['no_free_room']} without a free room, "
+            f"{unassigned['too_large']} larger than every classroom, {unassigned['no_dates']} without dates."
+        )
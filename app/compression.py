@@ -0,0 +1,129 @@
+"""Negotiated gzip/brotli response compression."""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+try:  # brotli 为可选依赖，未安装时只协商 gzip
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return the content codings this process can produce, in preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _negotiate() -> Optional[str]:
+    # 功能：依据 Accept-Encoding 的 q 值挑选编码，质量相同时优先 br。
+    accepted = request.accept_encodings
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streams stay live."""
+
+    def __init__(self, encoding: str, level: int, br_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=br_quality)
+        else:
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def _compress_stream(
+    chunks: Iterable[bytes | str], compressor: _StreamCompressor, charset: str
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(charset)
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _should_skip(app: Flask, response: Response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return True
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return True
+    # SSE 等长连接需要逐条送达，不做压缩
+    if response.mimetype == "text/event-stream":
+        return True
+    mimetypes = app.config.get("COMPRESS_MIMETYPES", COMPRESSIBLE_MIMETYPES)
+    return response.mimetype not in mimetypes
+
+
+def _tag_representation(response: Response, encoding: str) -> None:
+    # 压缩后的字节与原始表示不同，强 ETag 需附加编码后缀
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def compress_response(app: Flask, response: Response) -> Response:
+    """Compress ``response`` in place when the client and payload allow it."""
+    # 功能：按协商结果压缩响应；流式响应逐块压缩，普通响应低于阈值时保持原样。
+    if not app.config.get("COMPRESS_ENABLED", True) or _should_skip(app, response):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _negotiate()
+    if encoding is None:
+        return response
+
+    level = app.config.get("COMPRESS_LEVEL", 6)
+    br_quality = app.config.get("COMPRESS_BR_QUALITY", 4)
+    if response.is_streamed:
+        compressor = _StreamCompressor(encoding, level, br_quality)
+        response.response = _compress_stream(response.response, compressor, "utf-8")
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+        if encoding == "br":
+            response.set_data(brotli.compress(data, quality=br_quality))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=level))
+    response.headers["Content-Encoding"] = encoding
+    _tag_representation(response, encoding)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Register the compression ``after_request`` hook."""
+    # 功能：在应用上注册响应压缩钩子。
+
+    @app.after_request
+    def _compress(response: Response) -> Response:
+        return compress_response(app, response)
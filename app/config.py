@@ -38,3 +38,79 @@ class Config:
         "FRONTEND_ORIGINS",
         "http://localhost:3000,http://localhost:4173",
     )
+
+    # /api/v1/batch 单次允许的子请求数量与并行读取的线程数
+    BATCH_MAX_REQUESTS: int = int(os.environ.get("BATCH_MAX_REQUESTS", "25"))
+    BATCH_MAX_WORKERS: int = int(os.environ.get("BATCH_MAX_WORKERS", "4"))
+
+    # JSON 序列化后端：auto（优先 orjson）/ orjson / stdlib
+    JSON_BACKEND: str = os.environ.get("JSON_BACKEND", "auto")
+
+    # 响应压缩：按 Accept-Encoding 协商 br/gzip，小于阈值（字节）的响应不压缩
+    COMPRESS_ENABLED: bool = os.environ.get("COMPRESS_ENABLED", "1") not in ("0", "false", "False")
+    COMPRESS_MIN_SIZE: int = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL: int = int(os.environ.get("COMPRESS_LEVEL", "6"))
+    COMPRESS_BR_QUALITY: int = int(os.environ.get("COMPRESS_BR_QUALITY", "4"))
+
+    # 单飞合并：process 为进程内锁；file 通过实例目录下的文件锁在多个 worker 间共享结果
+    SINGLE_FLIGHT_BACKEND: str = os.environ.get("SINGLE_FLIGHT_BACKEND", "process")
+    SINGLE_FLIGHT_LOCK_DIR: Path = Path(
+        os.environ.get("SINGLE_FLIGHT_LOCK_DIR", str(INSTANCE_DIR / "singleflight"))
+    )
+
+    # 统计/元数据缓存：超过软过期返回旧值并后台刷新，超过硬过期同步重算
+    SWR_CACHE_BACKEND: str = os.environ.get("SWR_CACHE_BACKEND", "memory")
+    SWR_CACHE_PATH: Path = Path(
+        os.environ.get("SWR_CACHE_PATH", str(INSTANCE_DIR / "swr_cache.sqlite3"))
+    )
+    SWR_CACHE_MAX_ENTRIES: int = int(os.environ.get("SWR_CACHE_MAX_ENTRIES", "256"))
+    SWR_SOFT_TTL: float = float(os.environ.get("SWR_SOFT_TTL", "30"))
+    SWR_HARD_TTL: float = float(os.environ.get("SWR_HARD_TTL", "600"))
+    SWR_REFRESH_WORKERS: int = int(os.environ.get("SWR_REFRESH_WORKERS", "2"))
+
+    # 并行统计查询：进程共享的线程池大小（<=1 时顺序执行；池忙时由请求线程就地执行），
+    # 以及单条查询从开始执行起算的超时时间（秒，超时的查询不会被取消）
+    FANOUT_MAX_WORKERS: int = int(os.environ.get("FANOUT_MAX_WORKERS", "4"))
+    FANOUT_TIMEOUT: float = float(os.environ.get("FANOUT_TIMEOUT", "10"))
+
+    # 服务端渲染管理页：默认/最大每页条数，以及下拉联想每次返回的候选数量
+    HTML_PAGE_SIZE: int = int(os.environ.get("HTML_PAGE_SIZE", "50"))
+    HTML_MAX_PAGE_SIZE: int = int(os.environ.get("HTML_MAX_PAGE_SIZE", "200"))
+    TYPEAHEAD_LIMIT: int = int(os.environ.get("TYPEAHEAD_LIMIT", "20"))
+
+    # 模板片段缓存 {% cache key, ttl, "Model" %}：按表版本号失效，设为 0 可整体关闭
+    FRAGMENT_CACHE_ENABLED: bool = os.environ.get("FRAGMENT_CACHE_ENABLED", "1") not in ("0", "false", "False")
+
+    # CRUD 操作日志：内存缓冲后由后台线程按批写入并汇总到小时粒度，供仪表盘热力图读取
+    AUDIT_LOG_ENABLED: bool = os.environ.get("AUDIT_LOG_ENABLED", "1") not in ("0", "false", "False")
+    AUDIT_LOG_FLUSH_INTERVAL: float = float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL", "5"))
+    AUDIT_LOG_BATCH_SIZE: int = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", "500"))
+    AUDIT_LOG_MAX_BUFFER: int = int(os.environ.get("AUDIT_LOG_MAX_BUFFER", "50000"))
+    # 热力图统计最近多少天的汇总
+    AUDIT_HEATMAP_DAYS: int = int(os.environ.get("AUDIT_HEATMAP_DAYS", "30"))
+    # 热力图接口的浏览器缓存时间（秒）：读取也会记日志，汇总几乎每次请求都变，不走 ETag
+    AUDIT_HEATMAP_MAX_AGE: int = int(os.environ.get("AUDIT_HEATMAP_MAX_AGE", "15"))
+
+    # 选课事件 SSE 推送：每个 worker 缓冲的事件条数、
+    # 心跳间隔（秒）、单条连接最长保持时间（秒，到期后由浏览器带 Last-Event-ID 重连）
+    ENROLLMENT_STREAM_BUFFER: int = int(os.environ.get("ENROLLMENT_STREAM_BUFFER", "256"))
+    ENROLLMENT_STREAM_HEARTBEAT: float = float(os.environ.get("ENROLLMENT_STREAM_HEARTBEAT", "15"))
+    ENROLLMENT_STREAM_MAX_SECONDS: float = float(os.environ.get("ENROLLMENT_STREAM_MAX_SECONDS", "300"))
+    ENROLLMENT_STREAM_RETRY_MS: int = int(os.environ.get("ENROLLMENT_STREAM_RETRY_MS", "3000"))
+
+    # 变更总线：每个 worker 轮询发件箱的间隔（秒）、单次读取条数、
+    # 为补上乱序提交的记录而回看的条数，以及 prune-outbox 默认保留天数
+    CHANGE_BUS_POLL_INTERVAL: float = float(os.environ.get("CHANGE_BUS_POLL_INTERVAL", "1"))
+    CHANGE_BUS_BATCH_SIZE: int = int(os.environ.get("CHANGE_BUS_BATCH_SIZE", "500"))
+    CHANGE_BUS_LOOKBACK: int = int(os.environ.get("CHANGE_BUS_LOOKBACK", "100"))
+    OUTBOX_RETENTION_DAYS: int = int(os.environ.get("OUTBOX_RETENTION_DAYS", "7"))
+
+    # 候补递补：每次从队首取出校验的人数上限，以及兜底扫描全部候补队列的间隔（秒）
+    WAITLIST_PROMOTION_BATCH: int = int(os.environ.get("WAITLIST_PROMOTION_BATCH", "50"))
+    WAITLIST_SWEEP_INTERVAL: float = float(os.environ.get("WAITLIST_SWEEP_INTERVAL", "60"))
+
+    # 抽签选课：每名学生每轮最多提交的志愿数
+    LOTTERY_MAX_REQUESTS: int = int(os.environ.get("LOTTERY_MAX_REQUESTS", "10"))
+
+    # 教室利用率分析：座位利用率或日期利用率低于该比例的教室列为低利用教室
+    CLASSROOM_UNDERUSED_THRESHOLD: float = float(os.environ.get("CLASSROOM_UNDERUSED_THRESHOLD", "0.3"))
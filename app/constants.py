@@ -22,3 +22,10 @@ REFERENTIAL_COURSE_MSG = "不符合参照表完整性，不存在该课程"
 REFERENTIAL_TEACHER_MSG = "不符合参照表完整性，不存在该教师"
 REFERENTIAL_CLASSROOM_MSG = "不符合参照表完整性，不存在该教室"
 REFERENTIAL_TERM_MSG = "不符合参照表完整性，不存在该学期"
+
+# 选课名额提示
+OFFERING_FULL_MSG = "该课程本学期名额已满"
+TIMETABLE_CLASH_MSG = "该课程与本学期已选课程上课时间冲突"
+
+# 教室预订提示
+ROOM_BOOKING_CONFLICT_MSG = "该教室在所选日期内已被其他授课安排占用"
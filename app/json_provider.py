@@ -0,0 +1,85 @@
+"""JSON provider with native ``Decimal``/``date`` handling and optional orjson backend."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:  # orjson 为可选依赖，未安装时回退到标准库 json
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON_BACKENDS = ("auto", "orjson", "stdlib")
+
+
+def _json_default(value: Any) -> Any:
+    # 功能：序列化 Decimal 与日期时间，其余类型交给 Flask 默认规则处理。
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serialize API payloads with orjson when available, stdlib ``json`` otherwise.
+
+    ``Decimal`` values become floats and dates/datetimes ISO-8601 strings, the
+    same representation the API serializers already produce by hand.
+    """
+
+    default = staticmethod(_json_default)
+
+    def __init__(self, app: Flask, backend: str = "auto") -> None:
+        super().__init__(app)
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of {', '.join(JSON_BACKENDS)}")
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_BACKEND=orjson but the orjson package is not installed")
+        self.use_orjson = orjson is not None and backend != "stdlib"
+
+    def _orjson_options(self, *, pretty: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=_json_default, option=self._orjson_options()).decode()
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # 功能：orjson 直接产出 bytes，省去 str 编码再解码的往返。
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(
+            obj,
+            default=_json_default,
+            option=self._orjson_options(pretty=pretty) | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app: Flask) -> None:
+    """Install :class:`FastJSONProvider` according to ``JSON_BACKEND``."""
+    # 功能：按配置替换应用的 JSON 序列化实现。
+    app.json = FastJSONProvider(app, backend=app.config.get("JSON_BACKEND", "auto"))
@@ -6,7 +6,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .extensions import db
@@ -328,3 +328,323 @@ class CourseAggDaily(db.Model):
 
     def __repr__(self) -> str:  # pragma: no cover - repr helper
         return f"<CourseAggDaily {self.stat_date} {self.cno}>"
+
+
+class TableVersion(db.Model):
+    __tablename__ = "TableVersion"
+
+    table_name: Mapped[str] = mapped_column("TableName", db.String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(
+        "Version", db.BigInteger().with_variant(db.Integer(), "sqlite"), nullable=False, default=0
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        "UpdatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<TableVersion {self.table_name}={self.version}>"
+
+
+class OperationLog(db.Model):
+    __tablename__ = "OperationLog"
+
+    log_id: Mapped[int] = mapped_column(
+        "LogID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    table_name: Mapped[str] = mapped_column("TableName", db.String(64), nullable=False)
+    operation: Mapped[str] = mapped_column("Operation", db.String(10), nullable=False)
+    record_key: Mapped[Optional[str]] = mapped_column("RecordKey", db.String(100))
+    occurred_at: Mapped[datetime] = mapped_column(
+        "OccurredAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "Operation IN ('create','read','update','delete')", name="ck_operationlog_op"
+        ),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<OperationLog {self.operation} {self.table_name} {self.record_key}>"
+
+
+class OperationRollup(db.Model):
+    __tablename__ = "OperationRollup"
+
+    table_name: Mapped[str] = mapped_column("TableName", db.String(64), primary_key=True)
+    operation: Mapped[str] = mapped_column("Operation", db.String(10), primary_key=True)
+    hour_start: Mapped[datetime] = mapped_column("HourStart", db.DateTime, primary_key=True)
+    count: Mapped[int] = mapped_column(
+        "Count", db.BigInteger().with_variant(db.Integer(), "sqlite"), nullable=False, default=0
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        "UpdatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<OperationRollup {self.table_name} {self.operation} {self.hour_start}>"
+
+
+class EnrollmentEvent(db.Model):
+    __tablename__ = "EnrollmentEvent"
+
+    event_id: Mapped[int] = mapped_column(
+        "EventID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    kind: Mapped[str] = mapped_column("Kind", db.String(10), nullable=False)
+    sno: Mapped[str] = mapped_column("Sno", db.String(12), nullable=False)
+    cno: Mapped[str] = mapped_column("Cno", db.String(10), nullable=False)
+    status: Mapped[Optional[str]] = mapped_column("Status", db.String(10))
+    grade: Mapped[Optional[Decimal]] = mapped_column("Grade", db.Numeric(5, 2))
+    enroll_date: Mapped[Optional[datetime]] = mapped_column("EnrollDate", db.DateTime)
+    created_at: Mapped[datetime] = mapped_column(
+        "CreatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "Kind IN ('created','updated','dropped','deleted')", name="ck_enrollmentevent_kind"
+        ),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<EnrollmentEvent {self.event_id} {self.kind} {self.sno}-{self.cno}>"
+
+
+class ChangeOutbox(db.Model):
+    __tablename__ = "ChangeOutbox"
+
+    change_id: Mapped[int] = mapped_column(
+        "ChangeID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    table_name: Mapped[str] = mapped_column("TableName", db.String(64), nullable=False)
+    record_key: Mapped[Optional[str]] = mapped_column("RecordKey", db.String(100))
+    operation: Mapped[str] = mapped_column("Operation", db.String(10), nullable=False)
+    version: Mapped[int] = mapped_column(
+        "Version", db.BigInteger().with_variant(db.Integer(), "sqlite"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        "CreatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "Operation IN ('create','update','delete')", name="ck_changeoutbox_op"
+        ),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<ChangeOutbox {self.change_id} {self.operation} {self.table_name} {self.record_key}>"
+
+
+class OfferingSeat(db.Model):
+    __tablename__ = "OfferingSeat"
+
+    cno: Mapped[str] = mapped_column("Cno", db.String(10), primary_key=True)
+    year_taken: Mapped[int] = mapped_column("YearTaken", db.Integer, primary_key=True)
+    term: Mapped[str] = mapped_column("Term", db.String(10), primary_key=True)
+    capacity: Mapped[int] = mapped_column("Capacity", db.Integer, nullable=False)
+    taken: Mapped[int] = mapped_column("Taken", db.Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        "UpdatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        CheckConstraint("Taken >= 0", name="ck_offeringseat_taken"),
+    )
+
+    @property
+    def remaining(self) -> int:
+        return max(self.capacity - self.taken, 0)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<OfferingSeat {self.cno} {self.year_taken} {self.term} {self.taken}/{self.capacity}>"
+
+
+class Waitlist(db.Model):
+    __tablename__ = "Waitlist"
+    __table_args__ = (
+        UniqueConstraint("Sno", "Cno", name="uq_waitlist_student_course"),
+        Index("idx_waitlist_offering", "Cno", "YearTaken", "Term", "WaitID"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # 自增编号即排队顺序，同一开课内按 WaitID 先进先出
+    wait_id: Mapped[int] = mapped_column(
+        "WaitID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    sno: Mapped[str] = mapped_column(
+        "Sno",
+        db.String(12),
+        ForeignKey("Student.Sno", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+    cno: Mapped[str] = mapped_column(
+        "Cno",
+        db.String(10),
+        ForeignKey("Course.Cno", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+    year_taken: Mapped[int] = mapped_column("YearTaken", db.Integer, nullable=False)
+    term: Mapped[str] = mapped_column(
+        "Term",
+        db.String(10),
+        ForeignKey("TermDict.TermCode", onupdate="CASCADE", ondelete="RESTRICT"),
+        nullable=False,
+    )
+    joined_at: Mapped[datetime] = mapped_column(
+        "JoinedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<Waitlist {self.wait_id} {self.sno}-{self.cno} {self.year_taken} {self.term}>"
+
+
+class RegistrationRound(db.Model):
+    __tablename__ = "RegistrationRound"
+    __table_args__ = (
+        CheckConstraint(
+            "Status IN ('open','allocating','allocated')", name="ck_registrationround_status"
+        ),
+        {"sqlite_autoincrement": True},
+    )
+
+    round_id: Mapped[int] = mapped_column(
+        "RoundID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    year_taken: Mapped[int] = mapped_column("YearTaken", db.Integer, nullable=False)
+    term: Mapped[str] = mapped_column(
+        "Term",
+        db.String(10),
+        ForeignKey("TermDict.TermCode", onupdate="CASCADE", ondelete="RESTRICT"),
+        nullable=False,
+    )
+    # 抽签随机种子，保存下来以便复现同一轮的分配结果
+    seed: Mapped[int] = mapped_column("Seed", db.BigInteger, nullable=False)
+    max_courses: Mapped[int] = mapped_column("MaxCourses", db.SmallInteger, nullable=False, default=5)
+    status: Mapped[str] = mapped_column("Status", db.String(10), nullable=False, default="open")
+    created_at: Mapped[datetime] = mapped_column(
+        "CreatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+    allocated_at: Mapped[Optional[datetime]] = mapped_column("AllocatedAt", db.DateTime)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<RegistrationRound {self.round_id} {self.year_taken} {self.term} {self.status}>"
+
+
+class CourseRequest(db.Model):
+    __tablename__ = "CourseRequest"
+    __table_args__ = (
+        UniqueConstraint("RoundID", "Sno", "Cno", name="uq_courserequest_course"),
+        CheckConstraint("ChoiceRank >= 1", name="ck_courserequest_rank"),
+    )
+
+    round_id: Mapped[int] = mapped_column(
+        "RoundID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        ForeignKey("RegistrationRound.RoundID", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    sno: Mapped[str] = mapped_column(
+        "Sno",
+        db.String(12),
+        ForeignKey("Student.Sno", onupdate="CASCADE", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank: Mapped[int] = mapped_column("ChoiceRank", db.SmallInteger, primary_key=True)
+    cno: Mapped[str] = mapped_column(
+        "Cno",
+        db.String(10),
+        ForeignKey("Course.Cno", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<CourseRequest {self.round_id} {self.sno} #{self.rank} {self.cno}>"
+
+
+class AllocationResult(db.Model):
+    __tablename__ = "AllocationResult"
+
+    round_id: Mapped[int] = mapped_column(
+        "RoundID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        ForeignKey("RegistrationRound.RoundID", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    sno: Mapped[str] = mapped_column("Sno", db.String(12), primary_key=True)
+    # 每个字符对应一条志愿（按志愿顺序）的分配结果，编码见 services.lottery.OUTCOME_CODES
+    outcomes: Mapped[str] = mapped_column("Outcomes", db.String(32), nullable=False)
+    assigned: Mapped[int] = mapped_column("Assigned", db.SmallInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<AllocationResult {self.round_id} {self.sno} {self.outcomes}>"
+
+
+class TeachingSlot(db.Model):
+    __tablename__ = "TeachingSlot"
+    __table_args__ = (
+        CheckConstraint("Weekday BETWEEN 1 AND 7", name="ck_teachingslot_weekday"),
+        CheckConstraint("Period BETWEEN 1 AND 12", name="ck_teachingslot_period"),
+    )
+
+    teach_id: Mapped[int] = mapped_column(
+        "TeachID",
+        db.BigInteger().with_variant(db.Integer(), "sqlite"),
+        ForeignKey("Teaching.TeachID", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # 1 = 周一 … 7 = 周日；Period 为当天第几节
+    weekday: Mapped[int] = mapped_column("Weekday", db.SmallInteger, primary_key=True)
+    period: Mapped[int] = mapped_column("Period", db.SmallInteger, primary_key=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<TeachingSlot {self.teach_id} {self.weekday}-{self.period}>"
+
+
+# 删除授课安排时一并删除其每周节次
+Teaching.slots = relationship("TeachingSlot", cascade="all, delete-orphan")
+
+
+class TeacherWorkload(db.Model):
+    __tablename__ = "TeacherWorkload"
+    __table_args__ = (
+        Index("idx_teacherworkload_term", "YearOffered", "Term"),
+    )
+
+    tno: Mapped[str] = mapped_column(
+        "Tno",
+        db.String(10),
+        ForeignKey("Teacher.Tno", onupdate="CASCADE", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year_offered: Mapped[int] = mapped_column("YearOffered", db.Integer, primary_key=True)
+    term: Mapped[str] = mapped_column("Term", db.String(10), primary_key=True)
+    offerings: Mapped[int] = mapped_column("Offerings", db.Integer, nullable=False, default=0)
+    # 学分与学时按授课安排逐条累加，同一教师同一课程开多个班时重复计入
+    credit_hours: Mapped[int] = mapped_column("CreditHours", db.Integer, nullable=False, default=0)
+    contact_hours: Mapped[int] = mapped_column("ContactHours", db.Integer, nullable=False, default=0)
+    enrolled_students: Mapped[int] = mapped_column(
+        "EnrolledStudents", db.Integer, nullable=False, default=0
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        "UpdatedAt", db.DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<TeacherWorkload {self.tno} {self.year_offered} {self.term} {self.contact_hours}h>"
@@ -0,0 +1,59 @@
+"""Page-number pagination state for the server-rendered management pages."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from flask import current_app, request, url_for
+
+
+@dataclass(frozen=True)
+class PageInfo:
+    """One page of a repository listing, as consumed by ``_pagination.html``."""
+
+    page: int
+    per_page: int
+    total: int
+
+    @property
+    def pages(self) -> int:
+        return max((self.total + self.per_page - 1) // self.per_page, 1)
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.pages
+
+    @property
+    def first_index(self) -> int:
+        return (self.page - 1) * self.per_page + 1 if self.total else 0
+
+    @property
+    def last_index(self) -> int:
+        return min(self.page * self.per_page, self.total)
+
+    def window(self, radius: int = 2) -> List[int]:
+        """Page numbers shown around the current page (clamped when it is past the end)."""
+        current = min(self.page, self.pages)
+        start = max(current - radius, 1)
+        end = min(current + radius, self.pages)
+        return list(range(start, end + 1))
+
+    def url(self, page: int) -> str:
+        # 功能：保留当前筛选参数，只替换页码，生成翻页链接。
+        args = request.args.to_dict()
+        args["page"] = page
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def page_args() -> Tuple[int, int]:
+    """Read ``page``/``per_page`` from the query string, clamped to the configured bounds."""
+    default = current_app.config.get("HTML_PAGE_SIZE", 50)
+    limit = current_app.config.get("HTML_MAX_PAGE_SIZE", 200)
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    per_page = request.args.get("per_page", default, type=int) or default
+    return page, max(min(per_page, limit), 1)
@@ -0,0 +1,26 @@
+"""ORM-free read models: Core projections plus precompiled row converters."""
+
+from .batch import BATCH_PARAM_LIMIT, fetch_by_keys
+from .projection import Expansion, Field, Join, Projection, RowConverter
+from .resources import (
+    COURSE_PROJECTION,
+    ENROLLMENT_PROJECTION,
+    STUDENT_PROJECTION,
+    TEACHER_PROJECTION,
+    TEACHING_PROJECTION,
+)
+
+__all__ = [
+    "BATCH_PARAM_LIMIT",
+    "fetch_by_keys",
+    "Expansion",
+    "Field",
+    "Join",
+    "Projection",
+    "RowConverter",
+    "COURSE_PROJECTION",
+    "ENROLLMENT_PROJECTION",
+    "STUDENT_PROJECTION",
+    "TEACHER_PROJECTION",
+    "TEACHING_PROJECTION",
+]
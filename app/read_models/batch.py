@@ -0,0 +1,52 @@
+"""Chunked primary-key lookups on top of the resource projections."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from .projection import Projection
+
+# 单条 IN 语句内绑定参数的上限；复合主键按列数折算每批键数量
+BATCH_PARAM_LIMIT = 900
+
+
+def fetch_by_keys(
+    session: Session,
+    projection: Projection,
+    key_columns: Sequence[ColumnElement],
+    keys: Sequence[Hashable],
+    *,
+    fields: Optional[Sequence[str]] = None,
+    expand: Optional[Sequence[str]] = None,
+) -> Dict[Hashable, Dict[str, Any]]:
+    """Load many rows by primary key using chunked ``IN`` queries.
+
+    Single-column keys are passed as scalars, composite keys as tuples in the
+    same order as ``key_columns``. The result maps each found key to its row.
+    """
+    # 功能：按主键批量读取记录，主键列额外附加在投影末尾以便在裁剪字段后仍能回填键。
+    if not keys:
+        return {}
+    width = len(key_columns)
+    stmt = projection.select(fields, expand).add_columns(
+        *(column.label(f"lookup_key_{index}") for index, column in enumerate(key_columns))
+    )
+    convert = projection.converter(fields, expand)
+    chunk_size = max(1, BATCH_PARAM_LIMIT // width)
+
+    found: Dict[Hashable, Dict[str, Any]] = {}
+    for start in range(0, len(keys), chunk_size):
+        chunk = list(keys[start : start + chunk_size])
+        if width == 1:
+            condition = key_columns[0].in_(chunk)
+        else:
+            condition = tuple_(*key_columns).in_(chunk)
+        for row in session.execute(stmt.where(condition)):
+            key_values: Tuple[Any, ...] = tuple(row[-width:])
+            key = key_values[0] if width == 1 else key_values
+            found[key] = convert(row[:-width])
+    return found
@@ -0,0 +1,182 @@
+"""Column projections that map Core rows straight to API dictionaries."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.sql import ColumnElement
+
+RowConverter = Callable[[Sequence[Any]], Dict[str, Any]]
+
+
+def iso_format(value: Any) -> str:
+    """Format date/datetime values the same way the ORM serializers do."""
+    return value.isoformat()
+
+
+def decimal_to_float(value: Decimal) -> float:
+    """Convert ``Numeric`` columns (e.g. grades) into JSON floats."""
+    return float(value)
+
+
+@dataclass(frozen=True, eq=False)
+class Field:
+    """A public JSON key backed by one SQL column expression."""
+
+    name: str
+    column: ColumnElement
+    convert: Optional[Callable[[Any], Any]] = None
+    join: Optional[str] = None
+
+
+@dataclass(frozen=True, eq=False)
+class Join:
+    """An outer join a projection adds only when one of its fields needs it."""
+
+    target: Any
+    onclause: ColumnElement
+
+
+@dataclass(frozen=True, eq=False)
+class Expansion:
+    """A related record embedded as a nested object via one outer join.
+
+    When an expansion shares its name with a scalar field (e.g. ``department``)
+    the nested object replaces the foreign-key value in the payload.
+    """
+
+    join: str
+    fields: Tuple[Field, ...]
+
+
+class Projection:
+    """Describe the columns of one resource and build selects/converters for it."""
+
+    def __init__(
+        self,
+        base: Any,
+        fields: Iterable[Field],
+        *,
+        joins: Optional[Mapping[str, Join]] = None,
+        expansions: Optional[Mapping[str, Expansion]] = None,
+    ) -> None:
+        self.base = base
+        self.fields: Tuple[Field, ...] = tuple(fields)
+        self.joins: Dict[str, Join] = dict(joins or {})
+        self.expansions: Dict[str, Expansion] = dict(expansions or {})
+        self._by_name: Dict[str, Field] = {field.name: field for field in self.fields}
+
+    @property
+    def field_names(self) -> Tuple[str, ...]:
+        return tuple(field.name for field in self.fields)
+
+    def resolve(self, names: Optional[Iterable[str]] = None) -> Tuple[Field, ...]:
+        # 功能：按请求的字段名挑选投影列，未指定时返回全部字段。
+        if names is None:
+            return self.fields
+        wanted = set(names)
+        unknown = wanted - self._by_name.keys()
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(field for field in self.fields if field.name in wanted)
+
+    def resolve_expansions(self, expand: Optional[Iterable[str]] = None) -> Tuple[Tuple[str, Expansion], ...]:
+        # 功能：校验 expand 参数并按声明顺序返回需要内嵌的关联对象。
+        if not expand:
+            return ()
+        wanted = set(expand)
+        unknown = wanted - self.expansions.keys()
+        if unknown:
+            raise ValueError(f"Unknown expansions: {', '.join(sorted(unknown))}")
+        return tuple((name, exp) for name, exp in self.expansions.items() if name in wanted)
+
+    def select(
+        self,
+        names: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+    ) -> Select:
+        # 功能：生成只包含所需列的 Core select，并按需追加外连接。
+        fields = self.resolve(names)
+        expansions = self.resolve_expansions(expand)
+        columns = [field.column.label(field.name) for field in fields]
+        required_joins = [field.join for field in fields if field.join]
+        for exp_name, expansion in expansions:
+            columns.extend(
+                field.column.label(f"{exp_name}__{field.name}") for field in expansion.fields
+            )
+            required_joins.append(expansion.join)
+
+        stmt = select(*columns).select_from(self.base)
+        applied: List[str] = []
+        for join_name in required_joins:
+            if join_name not in applied:
+                join = self.joins[join_name]
+                stmt = stmt.outerjoin(join.target, join.onclause)
+                applied.append(join_name)
+        return stmt
+
+    def converter(
+        self,
+        names: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+    ) -> RowConverter:
+        """Return the cached row converter for the requested field subset."""
+        fields = self.resolve(names)
+        groups = tuple((name, exp.fields) for name, exp in self.resolve_expansions(expand))
+        return _compile_converter(fields, groups)
+
+    def rows(
+        self,
+        result: Iterable[Sequence[Any]],
+        names: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        # 功能：将查询结果逐行转换为可直接 jsonify 的字典列表。
+        convert = self.converter(names, expand)
+        return [convert(row) for row in result]
+
+
+@lru_cache(maxsize=256)
+def _compile_converter(
+    fields: Tuple[Field, ...],
+    groups: Tuple[Tuple[str, Tuple[Field, ...]], ...] = (),
+) -> RowConverter:
+    # 功能：预先计算键名、需转换的列下标与内嵌对象切片，逐行转换时只做必要的格式化。
+    keys = tuple(field.name for field in fields)
+    flat_fields = list(fields)
+    slices: List[Tuple[str, int, int, Tuple[str, ...]]] = []
+    for group_name, group_fields in groups:
+        start = len(flat_fields)
+        flat_fields.extend(group_fields)
+        slices.append((group_name, start, len(flat_fields), tuple(f.name for f in group_fields)))
+    conversions = tuple(
+        (index, field.convert) for index, field in enumerate(flat_fields) if field.convert is not None
+    )
+    width = len(keys)
+
+    if not conversions and not slices:
+        def convert_plain(row: Sequence[Any]) -> Dict[str, Any]:
+            return dict(zip(keys, row))
+
+        return convert_plain
+
+    def convert(row: Sequence[Any]) -> Dict[str, Any]:
+        values = list(row)
+        for index, func in conversions:
+            value = values[index]
+            if value is not None:
+                values[index] = func(value)
+        payload = dict(zip(keys, values[:width]))
+        for group_name, start, end, group_keys in slices:
+            nested = values[start:end]
+            # 外连接未命中时整组为 NULL，输出 None 而不是全空对象
+            payload[group_name] = (
+                dict(zip(group_keys, nested)) if any(v is not None for v in nested) else None
+            )
+        return payload
+
+    return convert
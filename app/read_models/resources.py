@@ -0,0 +1,186 @@
+"""Per-resource projections used by the ``/api/v1`` read endpoints."""
+
+from __future__ import annotations
+
+from sqlalchemy.orm import aliased
+
+from ..models import Classroom, Course, Department, Enrollment, Student, Teacher, Teaching
+from .projection import Expansion, Field, Join, Projection, decimal_to_float, iso_format
+
+# 展开用的关联表使用别名，避免与关键字筛选中的联结重复
+_DepartmentRef = aliased(Department, name="department_ref")
+_PrerequisiteRef = aliased(Course, name="prerequisite_ref")
+_StudentRef = aliased(Student, name="student_ref")
+_CourseRef = aliased(Course, name="course_ref")
+
+
+def _department_expansion() -> Expansion:
+    return Expansion(
+        "department_ref",
+        (Field("dno", _DepartmentRef.dno), Field("dname", _DepartmentRef.dname)),
+    )
+
+
+# 字段顺序与 API 原有的 _serialize_* 输出保持一致
+STUDENT_PROJECTION = Projection(
+    Student,
+    [
+        Field("sno", Student.sno),
+        Field("name", Student.sname),
+        Field("gender", Student.gender),
+        Field("birth_date", Student.birth_date, iso_format),
+        Field("department", Student.dno),
+        Field("enroll_year", Student.enroll_year),
+        Field("email", Student.email),
+        Field("phone", Student.phone),
+        Field("created_at", Student.created_at, iso_format),
+        Field("updated_at", Student.updated_at, iso_format),
+    ],
+    joins={"department_ref": Join(_DepartmentRef, _DepartmentRef.dno == Student.dno)},
+    expansions={"department": _department_expansion()},
+)
+
+COURSE_PROJECTION = Projection(
+    Course,
+    [
+        Field("cno", Course.cno),
+        Field("name", Course.cname),
+        Field("credits", Course.credits),
+        Field("hours", Course.hours),
+        Field("department", Course.dno),
+        Field("prerequisite", Course.prereq_cno),
+        Field("is_active", Course.is_active),
+        Field("created_at", Course.created_at, iso_format),
+        Field("updated_at", Course.updated_at, iso_format),
+    ],
+    joins={
+        "department_ref": Join(_DepartmentRef, _DepartmentRef.dno == Course.dno),
+        "prerequisite_ref": Join(_PrerequisiteRef, _PrerequisiteRef.cno == Course.prereq_cno),
+    },
+    expansions={
+        "department": _department_expansion(),
+        "prerequisite": Expansion(
+            "prerequisite_ref",
+            (
+                Field("cno", _PrerequisiteRef.cno),
+                Field("name", _PrerequisiteRef.cname),
+                Field("credits", _PrerequisiteRef.credits),
+            ),
+        ),
+    },
+)
+
+TEACHER_PROJECTION = Projection(
+    Teacher,
+    [
+        Field("tno", Teacher.tno),
+        Field("name", Teacher.tname),
+        Field("title", Teacher.title),
+        Field("department", Teacher.dno),
+        Field("department_name", Department.dname, join="department"),
+        Field("email", Teacher.email),
+        Field("phone", Teacher.phone),
+        Field("created_at", Teacher.created_at, iso_format),
+        Field("updated_at", Teacher.updated_at, iso_format),
+    ],
+    joins={"department": Join(Department, Department.dno == Teacher.dno)},
+    expansions={
+        "department": Expansion(
+            "department",
+            (Field("dno", Department.dno), Field("dname", Department.dname)),
+        ),
+    },
+)
+
+ENROLLMENT_PROJECTION = Projection(
+    Enrollment,
+    [
+        Field("student_id", Enrollment.sno),
+        Field("course_id", Enrollment.cno),
+        Field("year", Enrollment.year_taken),
+        Field("term", Enrollment.term),
+        Field("grade", Enrollment.grade, decimal_to_float),
+        Field("status", Enrollment.status),
+        Field("enroll_date", Enrollment.enroll_date, iso_format),
+        Field("updated_at", Enrollment.updated_at, iso_format),
+    ],
+    joins={
+        "student_ref": Join(_StudentRef, _StudentRef.sno == Enrollment.sno),
+        "course_ref": Join(_CourseRef, _CourseRef.cno == Enrollment.cno),
+    },
+    expansions={
+        "student": Expansion(
+            "student_ref",
+            (
+                Field("sno", _StudentRef.sno),
+                Field("name", _StudentRef.sname),
+                Field("department", _StudentRef.dno),
+                Field("enroll_year", _StudentRef.enroll_year),
+            ),
+        ),
+        "course": Expansion(
+            "course_ref",
+            (
+                Field("cno", _CourseRef.cno),
+                Field("name", _CourseRef.cname),
+                Field("credits", _CourseRef.credits),
+                Field("hours", _CourseRef.hours),
+            ),
+        ),
+    },
+)
+
+TEACHING_PROJECTION = Projection(
+    Teaching,
+    [
+        Field("teach_id", Teaching.teach_id),
+        Field("course_id", Teaching.cno),
+        Field("course_name", Course.cname, join="course"),
+        Field("teacher_id", Teaching.tno),
+        Field("teacher_name", Teacher.tname, join="teacher"),
+        Field("year", Teaching.year_offered),
+        Field("term", Teaching.term),
+        Field("room_id", Teaching.room_id),
+        Field(
+            "classroom_label",
+            Classroom.building + " " + Classroom.room_no,
+            join="classroom",
+        ),
+        Field("capacity", Teaching.capacity),
+        Field("start_date", Teaching.start_date, iso_format),
+        Field("end_date", Teaching.end_date, iso_format),
+    ],
+    joins={
+        "course": Join(Course, Course.cno == Teaching.cno),
+        "teacher": Join(Teacher, Teacher.tno == Teaching.tno),
+        "classroom": Join(Classroom, Classroom.room_id == Teaching.room_id),
+    },
+    expansions={
+        "course": Expansion(
+            "course",
+            (
+                Field("cno", Course.cno),
+                Field("name", Course.cname),
+                Field("credits", Course.credits),
+                Field("hours", Course.hours),
+            ),
+        ),
+        "teacher": Expansion(
+            "teacher",
+            (
+                Field("tno", Teacher.tno),
+                Field("name", Teacher.tname),
+                Field("title", Teacher.title),
+            ),
+        ),
+        "classroom": Expansion(
+            "classroom",
+            (
+                Field("room_id", Classroom.room_id),
+                Field("building", Classroom.building),
+                Field("room_no", Classroom.room_no),
+                Field("capacity", Classroom.capacity),
+            ),
+        ),
+    },
+)
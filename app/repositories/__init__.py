@@ -1,7 +1,17 @@
 """Repository package exports."""
 
+from .classroom_repository import ClassroomRepository
 from .course_repository import CourseRepository
 from .enrollment_repository import EnrollmentRepository
 from .student_repository import StudentRepository
+from .teacher_repository import TeacherRepository
+from .teaching_repository import TeachingRepository
 
-__all__ = ["CourseRepository", "EnrollmentRepository", "StudentRepository"]
+__all__ = [
+    "ClassroomRepository",
+    "CourseRepository",
+    "EnrollmentRepository",
+    "StudentRepository",
+    "TeacherRepository",
+    "TeachingRepository",
+]
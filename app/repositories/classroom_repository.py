@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
-from ..models import Classroom
+from ..models import Classroom, Teaching
+from ..services.audit_log import record_operation
+
+
+# 教室列表投影的公开字段，顺序与 _serialize_classroom 一致
+CLASSROOM_FIELDS = ("room_id", "building", "room_no", "capacity", "teaching_count")
 
 
 class ClassroomRepository:
@@ -50,6 +55,7 @@ class ClassroomRepository:
         per_page: int = 20,
     ) -> Tuple[List[Classroom], int]:
         # 功能：分页查询教室列表。
+        record_operation(Classroom.__tablename__, "read")
         query = Classroom.query
         query = cls._apply_filters(
             query,
@@ -68,9 +74,79 @@ class ClassroomRepository:
         )
         return items, total
 
+    @staticmethod
+    def _teaching_count_subquery(*, year: Optional[int], term: Optional[str]):
+        # 功能：按教室分组统计授课数量，可限定到指定学年/学期窗口。
+        stmt = select(
+            Teaching.room_id.label("room_id"),
+            func.count(Teaching.teach_id).label("teaching_count"),
+        ).where(Teaching.room_id.is_not(None))
+        if year is not None:
+            stmt = stmt.where(Teaching.year_offered == year)
+        if term:
+            stmt = stmt.where(Teaching.term == term)
+        return stmt.group_by(Teaching.room_id).subquery("teaching_counts")
+
+    @classmethod
+    def list_with_teaching_counts(
+        cls,
+        *,
+        building: Optional[str] = None,
+        room_id: Optional[str] = None,
+        room_no: Optional[str] = None,
+        keyword: Optional[str] = None,
+        teaching_year: Optional[int] = None,
+        teaching_term: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return classroom rows joined to aggregated teaching counts."""
+        # 功能：以列投影 + 分组计数子查询分页返回教室，避免加载 Teaching 实体。
+        record_operation(Classroom.__tablename__, "read")
+        selected = CLASSROOM_FIELDS if fields is None else tuple(f for f in CLASSROOM_FIELDS if f in fields)
+        unknown = set(fields or ()) - set(CLASSROOM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        columns = [getattr(Classroom, name).label(name) for name in selected if name != "teaching_count"]
+        counts = None
+        if "teaching_count" in selected:
+            # 未请求 teaching_count 时完全跳过计数子查询
+            counts = cls._teaching_count_subquery(year=teaching_year, term=teaching_term)
+            columns.append(func.coalesce(counts.c.teaching_count, 0).label("teaching_count"))
+        stmt = select(*columns).select_from(Classroom)
+        if counts is not None:
+            stmt = stmt.outerjoin(counts, counts.c.room_id == Classroom.room_id)
+        stmt = cls._apply_filters(
+            stmt,
+            building=building,
+            room_id=room_id,
+            room_no=room_no,
+            keyword=keyword,
+        )
+
+        total_stmt = cls._apply_filters(
+            select(func.count()).select_from(Classroom),
+            building=building,
+            room_id=room_id,
+            room_no=room_no,
+            keyword=keyword,
+        )
+        total = db.session.scalar(total_stmt) or 0
+
+        rows = db.session.execute(
+            stmt.order_by(Classroom.building, Classroom.room_no)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        ).mappings()
+        items = [dict(row) for row in rows]
+        return items, int(total)
+
     @staticmethod
     def get(room_id: str) -> Optional[Classroom]:
         # 功能：按 room_id 获取教室。
+        record_operation(Classroom.__tablename__, "read", room_id)
         return db.session.get(Classroom, room_id)
 
     @staticmethod
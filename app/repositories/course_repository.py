@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
 from ..models import Course
+from ..read_models import COURSE_PROJECTION, fetch_by_keys
+from ..services.audit_log import record_operation
 
 
 class CourseRepository:
@@ -52,7 +54,10 @@ class CourseRepository:
         per_page: int = 20,
     ) -> Tuple[List[Course], int]:
         # 功能：分页查询课程并返回总记录数。
-        query = Course.query
+        record_operation(Course.__tablename__, "read")
+        query = Course.query.options(
+            selectinload(Course.department), selectinload(Course.prerequisite)
+        )
         query = cls._apply_filters(
             query,
             department=department,
@@ -70,9 +75,75 @@ class CourseRepository:
         )
         return items, total
 
+    @classmethod
+    def list_rows(
+        cls,
+        *,
+        department: Optional[str] = None,
+        active_only: bool = True,
+        course_id: Optional[str] = None,
+        name: Optional[str] = None,
+        keyword: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page as JSON-ready dicts built from a column projection."""
+        # 功能：以列投影分页查询课程，跳过 ORM 实体构建。
+        record_operation(Course.__tablename__, "read")
+        filters = dict(
+            department=department,
+            active_only=active_only,
+            course_id=course_id,
+            name=name,
+            keyword=keyword,
+        )
+        total_stmt = cls._apply_filters(select(func.count()).select_from(Course), **filters)
+        total = db.session.scalar(total_stmt) or 0
+        stmt = cls._apply_filters(COURSE_PROJECTION.select(fields, expand), **filters)
+        result = db.session.execute(
+            stmt.order_by(Course.cno)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return COURSE_PROJECTION.rows(result, fields, expand), int(total)
+
+    @staticmethod
+    def get_row(
+        cno: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # 功能：按课程号以列投影读取单门课程，支持字段裁剪与关联展开。
+        record_operation(Course.__tablename__, "read", cno)
+        stmt = COURSE_PROJECTION.select(fields, expand).where(Course.cno == cno)
+        row = db.session.execute(stmt).first()
+        return COURSE_PROJECTION.converter(fields, expand)(row) if row is not None else None
+
+    @staticmethod
+    def get_rows(
+        cnos: Sequence[str],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        # 功能：按课程号批量读取课程，分批 IN 查询并以课程号为键返回。
+        record_operation(Course.__tablename__, "read")
+        return fetch_by_keys(
+            db.session,
+            COURSE_PROJECTION,
+            [Course.cno],
+            cnos,
+            fields=fields,
+            expand=expand,
+        )
+
     @staticmethod
     def get(cno: str) -> Optional[Course]:
         # 功能：按课程编号加载课程实例。
+        record_operation(Course.__tablename__, "read", cno)
         return db.session.get(Course, cno)
 
     @staticmethod
@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
 from ..models import Course, Enrollment, Student
+from ..read_models import ENROLLMENT_PROJECTION, fetch_by_keys
+from ..services.audit_log import record_operation
+from ..services.seats import OfferingFullError
 
 
 class EnrollmentRepository:
@@ -71,7 +74,10 @@ class EnrollmentRepository:
         per_page: int = 20,
     ) -> Tuple[List[Enrollment], int]:
         # 功能：分页查询选课记录并按时间排序。
-        query = Enrollment.query
+        record_operation(Enrollment.__tablename__, "read")
+        query = Enrollment.query.options(
+            selectinload(Enrollment.student), selectinload(Enrollment.course)
+        )
         query = cls._apply_filters(
             query,
             student_id=student_id,
@@ -90,9 +96,80 @@ class EnrollmentRepository:
         )
         return items, total
 
+    @classmethod
+    def list_rows(
+        cls,
+        *,
+        student_id: Optional[str] = None,
+        course_id: Optional[str] = None,
+        status: Optional[str] = None,
+        year: Optional[int] = None,
+        term: Optional[str] = None,
+        keyword: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page as JSON-ready dicts built from a column projection."""
+        # 功能：以列投影分页查询选课记录并按时间倒序。
+        record_operation(Enrollment.__tablename__, "read")
+        filters = dict(
+            student_id=student_id,
+            course_id=course_id,
+            status=status,
+            year=year,
+            term=term,
+            keyword=keyword,
+        )
+        total_stmt = cls._apply_filters(select(func.count()).select_from(Enrollment), **filters)
+        total = db.session.scalar(total_stmt) or 0
+        stmt = cls._apply_filters(ENROLLMENT_PROJECTION.select(fields, expand), **filters)
+        result = db.session.execute(
+            stmt.order_by(Enrollment.enroll_date.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return ENROLLMENT_PROJECTION.rows(result, fields, expand), int(total)
+
+    @staticmethod
+    def get_row(
+        sno: str,
+        cno: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # 功能：按学生-课程主码以列投影读取选课记录，支持字段裁剪与关联展开。
+        record_operation(Enrollment.__tablename__, "read", (sno, cno))
+        stmt = ENROLLMENT_PROJECTION.select(fields, expand).where(
+            Enrollment.sno == sno, Enrollment.cno == cno
+        )
+        row = db.session.execute(stmt).first()
+        return ENROLLMENT_PROJECTION.converter(fields, expand)(row) if row is not None else None
+
+    @staticmethod
+    def get_rows(
+        keys: Sequence[Tuple[str, str]],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        # 功能：按 (学号, 课程号) 复合主键批量读取选课记录。
+        record_operation(Enrollment.__tablename__, "read")
+        return fetch_by_keys(
+            db.session,
+            ENROLLMENT_PROJECTION,
+            [Enrollment.sno, Enrollment.cno],
+            keys,
+            fields=fields,
+            expand=expand,
+        )
+
     @staticmethod
     def get(sno: str, cno: str) -> Optional[Enrollment]:
         # 功能：获取指定学生-课程组合的唯一选课记录。
+        record_operation(Enrollment.__tablename__, "read", (sno, cno))
         return (
             Enrollment.query.filter(
                 and_(Enrollment.sno == sno, Enrollment.cno == cno)
@@ -131,12 +208,12 @@ class EnrollmentRepository:
 
     @staticmethod
     def create(data: Dict[str, Any]) -> Enrollment:
-        # 功能：创建选课记录并处理潜在数据库异常。
+        # 功能：创建选课记录并处理潜在数据库异常与名额不足。
         enrollment = Enrollment(**data)
         db.session.add(enrollment)
         try:
             db.session.commit()
-        except IntegrityError:
+        except (IntegrityError, OfferingFullError):
             db.session.rollback()
             raise
         return enrollment
@@ -148,7 +225,7 @@ class EnrollmentRepository:
             setattr(enrollment, key, value)
         try:
             db.session.commit()
-        except IntegrityError:
+        except (IntegrityError, OfferingFullError):
             db.session.rollback()
             raise
         return enrollment
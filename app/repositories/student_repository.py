@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
 from ..models import Student
+from ..read_models import STUDENT_PROJECTION, fetch_by_keys
+from ..services.audit_log import record_operation
 
 
 class StudentRepository:
@@ -52,7 +54,8 @@ class StudentRepository:
         per_page: int = 20,
     ) -> Tuple[List[Student], int]:
         # 功能：执行分页学生检索并返回结果集与总数。
-        query = Student.query
+        record_operation(Student.__tablename__, "read")
+        query = Student.query.options(selectinload(Student.department))
         query = cls._apply_filters(
             query,
             department=department,
@@ -70,9 +73,75 @@ class StudentRepository:
         )
         return items, total
 
+    @classmethod
+    def list_rows(
+        cls,
+        *,
+        department: Optional[str] = None,
+        enroll_year: Optional[int] = None,
+        student_id: Optional[str] = None,
+        name: Optional[str] = None,
+        keyword: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page as JSON-ready dicts built from a column projection."""
+        # 功能：以列投影分页检索学生，直接返回可序列化的字典。
+        record_operation(Student.__tablename__, "read")
+        filters = dict(
+            department=department,
+            enroll_year=enroll_year,
+            student_id=student_id,
+            name=name,
+            keyword=keyword,
+        )
+        total_stmt = cls._apply_filters(select(func.count()).select_from(Student), **filters)
+        total = db.session.scalar(total_stmt) or 0
+        stmt = cls._apply_filters(STUDENT_PROJECTION.select(fields, expand), **filters)
+        result = db.session.execute(
+            stmt.order_by(Student.sno)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return STUDENT_PROJECTION.rows(result, fields, expand), int(total)
+
+    @staticmethod
+    def get_row(
+        sno: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # 功能：按学号以列投影读取单个学生，支持字段裁剪与关联展开。
+        record_operation(Student.__tablename__, "read", sno)
+        stmt = STUDENT_PROJECTION.select(fields, expand).where(Student.sno == sno)
+        row = db.session.execute(stmt).first()
+        return STUDENT_PROJECTION.converter(fields, expand)(row) if row is not None else None
+
+    @staticmethod
+    def get_rows(
+        snos: Sequence[str],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        # 功能：按学号批量读取学生，分批 IN 查询并以学号为键返回。
+        record_operation(Student.__tablename__, "read")
+        return fetch_by_keys(
+            db.session,
+            STUDENT_PROJECTION,
+            [Student.sno],
+            snos,
+            fields=fields,
+            expand=expand,
+        )
+
     @staticmethod
     def get(sno: str) -> Optional[Student]:
         # 功能：按学号获取单个学生实例。
+        record_operation(Student.__tablename__, "read", sno)
         return db.session.get(Student, sno)
 
     @staticmethod
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
 from ..models import Teacher
+from ..read_models import TEACHER_PROJECTION, fetch_by_keys
+from ..services.audit_log import record_operation
 
 
 class TeacherRepository:
@@ -58,6 +60,7 @@ class TeacherRepository:
         per_page: int = 20,
     ) -> Tuple[List[Teacher], int]:
         # 功能：分页查询教师并返回总数。
+        record_operation(Teacher.__tablename__, "read")
         query = Teacher.query.options(selectinload(Teacher.department))
         query = cls._apply_filters(
             query,
@@ -77,9 +80,77 @@ class TeacherRepository:
         )
         return items, total
 
+    @classmethod
+    def list_rows(
+        cls,
+        *,
+        department: Optional[str] = None,
+        title: Optional[str] = None,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        keyword: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page as JSON-ready dicts built from a column projection."""
+        # 功能：以列投影分页查询教师，院系名称通过外连接一并取回。
+        record_operation(Teacher.__tablename__, "read")
+        filters = dict(
+            department=department,
+            title=title,
+            name=name,
+            email=email,
+            phone=phone,
+            keyword=keyword,
+        )
+        total_stmt = cls._apply_filters(select(func.count()).select_from(Teacher), **filters)
+        total = db.session.scalar(total_stmt) or 0
+        stmt = cls._apply_filters(TEACHER_PROJECTION.select(fields, expand), **filters)
+        result = db.session.execute(
+            stmt.order_by(Teacher.tname)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return TEACHER_PROJECTION.rows(result, fields, expand), int(total)
+
+    @staticmethod
+    def get_row(
+        tno: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # 功能：按工号以列投影读取单个教师，支持字段裁剪与关联展开。
+        record_operation(Teacher.__tablename__, "read", tno)
+        stmt = TEACHER_PROJECTION.select(fields, expand).where(Teacher.tno == tno)
+        row = db.session.execute(stmt).first()
+        return TEACHER_PROJECTION.converter(fields, expand)(row) if row is not None else None
+
+    @staticmethod
+    def get_rows(
+        tnos: Sequence[str],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        # 功能：按工号批量读取教师，分批 IN 查询并以工号为键返回。
+        record_operation(Teacher.__tablename__, "read")
+        return fetch_by_keys(
+            db.session,
+            TEACHER_PROJECTION,
+            [Teacher.tno],
+            tnos,
+            fields=fields,
+            expand=expand,
+        )
+
     @staticmethod
     def get(tno: str) -> Optional[Teacher]:
         # 功能：按工号加载单个教师。
+        record_operation(Teacher.__tablename__, "read", tno)
         return db.session.get(Teacher, tno)
 
     @staticmethod
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Query, selectinload
 
 from ..extensions import db
 from ..models import Teaching
+from ..read_models import TEACHING_PROJECTION, fetch_by_keys
+from ..services.audit_log import record_operation
+from ..services.room_bookings import RoomConflictError
+
+
+TOTAL_MODES = ("window", "count", "none")
 
 
 class TeachingRepository:
@@ -46,6 +53,7 @@ class TeachingRepository:
         per_page: int = 20,
     ) -> Tuple[List[Teaching], int]:
         # 功能：分页查询授课安排并返回总数。
+        record_operation(Teaching.__tablename__, "read")
         query = Teaching.query.options(
             selectinload(Teaching.course),
             selectinload(Teaching.teacher),
@@ -61,9 +69,95 @@ class TeachingRepository:
         )
         return items, total
 
+    @classmethod
+    def list_rows(
+        cls,
+        *,
+        course_id: Optional[str] = None,
+        teacher_id: Optional[str] = None,
+        term: Optional[str] = None,
+        year: Optional[int] = None,
+        page: int = 1,
+        per_page: int = 20,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+        total_mode: str = "window",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Return one schedule page with course/teacher/classroom labels in one joined statement.
+
+        ``total_mode`` selects how the total is produced: ``"window"`` appends
+        ``COUNT(*) OVER ()`` to the page query, ``"count"`` issues a separate
+        COUNT statement and ``"none"`` skips it (total is ``None``).
+        """
+        # 功能：以单条联结投影分页查询授课安排，课程/教师/教室名称随行返回。
+        record_operation(Teaching.__tablename__, "read")
+        if total_mode not in TOTAL_MODES:
+            raise ValueError(f"total_mode must be one of {', '.join(TOTAL_MODES)}")
+        filters = dict(
+            course_id=course_id,
+            teacher_id=teacher_id,
+            term=term,
+            year=year,
+        )
+        stmt = cls._apply_filters(TEACHING_PROJECTION.select(fields, expand), **filters)
+        if total_mode == "window":
+            stmt = stmt.add_columns(func.count().over().label("total_count"))
+        rows = db.session.execute(
+            stmt.order_by(Teaching.year_offered.desc(), Teaching.term.desc(), Teaching.teach_id.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        ).all()
+
+        total: Optional[int] = None
+        if total_mode == "window":
+            if rows:
+                total = int(rows[0][-1])
+                rows = [row[:-1] for row in rows]
+            elif page == 1:
+                total = 0
+            else:
+                # 页码越界时窗口函数没有返回行，退回到单独计数
+                total_mode = "count"
+        if total_mode == "count":
+            total_stmt = cls._apply_filters(select(func.count()).select_from(Teaching), **filters)
+            total = int(db.session.scalar(total_stmt) or 0)
+        return TEACHING_PROJECTION.rows(rows, fields, expand), total
+
+    @staticmethod
+    def get_row(
+        teach_id: int,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # 功能：按主键以列投影读取授课安排，支持字段裁剪与关联展开。
+        record_operation(Teaching.__tablename__, "read", teach_id)
+        stmt = TEACHING_PROJECTION.select(fields, expand).where(Teaching.teach_id == teach_id)
+        row = db.session.execute(stmt).first()
+        return TEACHING_PROJECTION.converter(fields, expand)(row) if row is not None else None
+
+    @staticmethod
+    def get_rows(
+        teach_ids: Sequence[int],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        expand: Optional[Sequence[str]] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        # 功能：按授课编号批量读取授课安排。
+        record_operation(Teaching.__tablename__, "read")
+        return fetch_by_keys(
+            db.session,
+            TEACHING_PROJECTION,
+            [Teaching.teach_id],
+            teach_ids,
+            fields=fields,
+            expand=expand,
+        )
+
     @staticmethod
     def get(teach_id: int) -> Optional[Teaching]:
         # 功能：按主键加载授课安排。
+        record_operation(Teaching.__tablename__, "read", teach_id)
         return db.session.get(Teaching, teach_id)
 
     @staticmethod
@@ -73,7 +167,7 @@ class TeachingRepository:
         db.session.add(teaching)
         try:
             db.session.commit()
-        except IntegrityError:
+        except (IntegrityError, RoomConflictError):
             db.session.rollback()
             raise
         return teaching
@@ -85,7 +179,7 @@ class TeachingRepository:
             setattr(teaching, key, value)
         try:
             db.session.commit()
-        except IntegrityError:
+        except (IntegrityError, RoomConflictError):
             db.session.rollback()
             raise
         return teaching
@@ -5,39 +5,71 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
-from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
-from sqlalchemy import func, select, text
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import func, or_, select, text
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
 
+from .api.http_cache import conditional_get
+from .caching import deferred
 from .constants import (
     ENROLLMENT_STATUSES,
     ENTITY_PK_DUP_MSG,
     ENTITY_PK_EMPTY_MSG,
     GENDER_OPTIONS,
+    OFFERING_FULL_MSG,
     REFERENTIAL_CLASSROOM_MSG,
     REFERENTIAL_COURSE_MSG,
     REFERENTIAL_DEPARTMENT_MSG,
     REFERENTIAL_STUDENT_COURSE_MSG,
     REFERENTIAL_TEACHER_MSG,
     REFERENTIAL_TERM_MSG,
+    ROOM_BOOKING_CONFLICT_MSG,
     TEACHER_TITLES,
+    TIMETABLE_CLASH_MSG,
 )
 from .extensions import db
 from .models import Classroom, Course, Department, Enrollment, Student, Teacher, Teaching, TermDict
+from .pagination import PageInfo, page_args
+from .repositories import (
+    ClassroomRepository,
+    CourseRepository,
+    EnrollmentRepository,
+    StudentRepository,
+    TeacherRepository,
+    TeachingRepository,
+)
 from .services import (
+    OfferingFullError,
+    RoomConflictError,
+    TimetableClashError,
+    check_room_booking,
+    check_timetable,
     describe_classroom_teaching_reference,
     describe_course_enrollment_reference,
     describe_course_prerequisite_reference,
     describe_course_teaching_reference,
     describe_student_enrollment_reference,
     describe_teacher_teaching_reference,
+    fan_out,
     format_integrity_violation,
+    rows_of,
+    scalar_of,
     validate_classroom_capacity,
     validate_course_credits,
     validate_course_hours,
     validate_student_enroll_year,
 )
+from .services.seats import SEAT_HOLDING_STATUSES
 
 bp = Blueprint("main", __name__)
 
@@ -46,10 +78,43 @@ def flash_integrity_error(detail: str) -> None:
     flash(format_integrity_violation(detail), "danger")
 
 
-@bp.route("/")
-def index() -> str:
-    """Render the minimal front-end landing page."""
-    # 功能：汇总系统关键指标与最新动态并渲染首页仪表盘。
+# 下拉联想数据源：首列为提交的主键，其余列拼成候选项说明；前两列参与前缀匹配
+TYPEAHEAD_SOURCES = {
+    "students": (Student.sno, Student.sname),
+    "courses": (Course.cno, Course.cname),
+    "teachers": (Teacher.tno, Teacher.tname),
+    "classrooms": (Classroom.room_id, Classroom.building, Classroom.room_no),
+}
+
+
+@bp.get("/typeahead/<string:kind>")
+@conditional_get(Student, Course, Teacher, Classroom)
+def typeahead(kind: str):
+    """表单下拉联想候选项。"""
+    # 功能：按主键或名称前缀检索少量候选项，代替整表渲染的下拉框。
+    columns = TYPEAHEAD_SOURCES.get(kind)
+    if columns is None:
+        abort(404)
+    key_column, name_column = columns[0], columns[1]
+    keyword = request.args.get("q", "").strip()
+    stmt = select(*columns).order_by(key_column).limit(current_app.config.get("TYPEAHEAD_LIMIT", 20))
+    if keyword:
+        stmt = stmt.where(
+            or_(
+                key_column.startswith(keyword, autoescape=True),
+                name_column.startswith(keyword, autoescape=True),
+            )
+        )
+    items = []
+    for key, *details in db.session.execute(stmt).all():
+        detail = " ".join(str(value) for value in details if value)
+        items.append({"value": key, "label": f"{key} · {detail}" if detail else key})
+    return jsonify(items=items)
+
+
+def _index_dashboard() -> dict:
+    """首页仪表盘所需的全部指标，仅在片段缓存未命中时执行。"""
+    # 功能：汇总系统关键指标与最新动态。
     student_count = db.session.scalar(select(func.count()).select_from(Student)) or 0
     course_count = db.session.scalar(select(func.count()).select_from(Course)) or 0
     teacher_count = db.session.scalar(select(func.count()).select_from(Teacher)) or 0
@@ -109,8 +174,7 @@ def index() -> str:
         .all()
     )
 
-    return render_template(
-        "index.html",
+    return dict(
         student_count=student_count,
         course_count=course_count,
         teacher_count=teacher_count,
@@ -126,55 +190,18 @@ def index() -> str:
     )
 
 
+@bp.route("/")
+def index() -> str:
+    """Render the minimal front-end landing page."""
+    # 功能：渲染首页仪表盘；指标由模板内 {% cache %} 片段按需加载，表未变更时不再查询。
+    return render_template("index.html", dashboard=deferred(_index_dashboard))
+
+
 @bp.route("/students", methods=["GET", "POST"])
 def manage_students() -> str:
     """List students and handle creation via simple form submission."""
-    # 功能：展示学生概览与统计 dashboards，并处理创建学生的表单请求。
-    departments = (
-        db.session.execute(select(Department).order_by(Department.dname))
-        .scalars()
-        .all()
-    )
-
-    # 课程总体统计（学生页仪表盘）
-    course_total = db.session.scalar(select(func.count()).select_from(Course)) or 0
-    active_course_count = db.session.scalar(select(func.count()).where(Course.is_active)) or 0
-    avg_credit = db.session.scalar(select(func.avg(Course.credits))) or 0
-
-    dept_distribution_rows = (
-        db.session.execute(
-            select(Department.dname, func.count(Course.cno))
-            .join(Course, Course.dno == Department.dno, isouter=True)
-            .group_by(Department.dname)
-            .order_by(Department.dname)
-        )
-        .all()
-    )
-    dept_distribution = [(dept or "未分配", count) for dept, count in dept_distribution_rows]
-
-    student_total = db.session.scalar(select(func.count()).select_from(Student)) or 0
-
-    # FIX: 不要 dict(ChunkedIteratorResult)；先 .all() 再 dict 推导
-    gender_rows = (
-        db.session.execute(
-            select(Student.gender, func.count()).group_by(Student.gender)
-        )
-        .all()
-    )
-    gender_distribution = {gender: count for gender, count in gender_rows}
-
-    dept_distribution_rows = (
-        db.session.execute(
-            select(Department.dname, func.count(Student.sno))
-            .join(Student, Student.dno == Department.dno, isouter=True)
-            .group_by(Department.dname)
-            .order_by(Department.dname)
-        )
-        .all()
-    )
-    dept_distribution = [
-        (dept or "未分配", count) for dept, count in dept_distribution_rows
-    ]
+    # 功能：展示学生列表并处理创建学生的表单请求；统计卡片与图表由 student_stats 异步提供。
+    departments = db.session.execute(select(Department).order_by(Department.dname)).scalars().all()
 
     if request.method == "POST":
         form = request.form
@@ -236,36 +263,55 @@ def manage_students() -> str:
     sname_search = request.args.get("name", "").strip()
     dept_filter = request.args.get("department", "").strip()
 
-    student_query = (
-        select(Student)
-        .options(selectinload(Student.department))
-        .order_by(Student.enroll_year.desc(), Student.sno)
-    )
-
-    if sno_search:
-        pattern = f"%{sno_search}%"
-        student_query = student_query.where(Student.sno.ilike(pattern))
-    if sname_search:
-        pattern = f"%{sname_search}%"
-        student_query = student_query.where(Student.sname.ilike(f"%{sname_search}%"))
-
-    if dept_filter:
-        student_query = student_query.where(Student.dno == dept_filter)
+    page, per_page = page_args()
 
-    students = db.session.execute(student_query.limit(200)).scalars().all()
+    def load_page() -> tuple[list[Student], PageInfo]:
+        # 表格片段缓存未命中时才执行分页查询
+        students, total = StudentRepository.list(
+            department=dept_filter or None,
+            student_id=sno_search or None,
+            name=sname_search or None,
+            page=page,
+            per_page=per_page,
+        )
+        return students, PageInfo(page, per_page, total)
 
     return render_template(
         "students.html",
-        students=students,
+        student_page=deferred(load_page),
         departments=departments,
         gender_options=GENDER_OPTIONS,
         sno_search=sno_search,
         sname_search=sname_search,
         dept_filter=dept_filter,
-        student_total=student_total,
-        gender_distribution=gender_distribution,
-        dept_distribution_labels=[label for label, _ in dept_distribution],
-        dept_distribution_values=[value for _, value in dept_distribution],
+    )
+
+
+@bp.get("/students/stats")
+@conditional_get(Student, Department)
+def student_stats():
+    """学生页统计卡片与院系分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "student_total": scalar_of(select(func.count()).select_from(Student)),
+            "gender_rows": rows_of(select(Student.gender, func.count()).group_by(Student.gender)),
+            "dept_rows": rows_of(
+                select(Department.dname, func.count(Student.sno))
+                .join(Student, Student.dno == Department.dno, isouter=True)
+                .group_by(Department.dname)
+                .order_by(Department.dname)
+            ),
+        }
+    )
+    gender_distribution = {gender: count for gender, count in stats["gender_rows"]}
+    dept_distribution = [(dept or "未分配", count) for dept, count in stats["dept_rows"]]
+    return jsonify(
+        student_total=stats["student_total"] or 0,
+        female=gender_distribution.get("Female", 0),
+        male=gender_distribution.get("Male", 0),
+        labels=[label for label, _ in dept_distribution],
+        values=[value for _, value in dept_distribution],
     )
 
 
@@ -365,22 +411,6 @@ def manage_courses() -> str:
         .all()
     )
 
-    # FIX: 本函数内补齐统计变量，避免 NameError
-    course_total = db.session.scalar(select(func.count()).select_from(Course)) or 0
-    active_course_count = db.session.scalar(select(func.count()).where(Course.is_active)) or 0
-    avg_credit = db.session.scalar(select(func.avg(Course.credits))) or 0
-
-    dept_distribution_rows = (
-        db.session.execute(
-            select(Department.dname, func.count(Course.cno))
-            .join(Course, Course.dno == Department.dno, isouter=True)
-            .group_by(Department.dname)
-            .order_by(Department.dname)
-        )
-        .all()
-    )
-    dept_distribution = [(dept or "未分配", count) for dept, count in dept_distribution_rows]
-
     if request.method == "POST":
         form = request.form
         cno = form.get("cno", "").strip()
@@ -447,34 +477,53 @@ def manage_courses() -> str:
     course_name_search = request.args.get("name", "").strip()
     dept_filter = request.args.get("department", "").strip()
 
-    course_query = (
-        select(Course)
-        .options(selectinload(Course.department), selectinload(Course.prerequisite))
-        .order_by(Course.cno)
+    page, per_page = page_args()
+    courses, total = CourseRepository.list(
+        department=dept_filter or None,
+        active_only=False,
+        course_id=course_code_search or None,
+        name=course_name_search or None,
+        page=page,
+        per_page=per_page,
     )
-    if course_code_search:
-        course_query = course_query.where(Course.cno.ilike(f"%{course_code_search}%"))
-    if course_name_search:
-        course_query = course_query.where(Course.cname.ilike(f"%{course_name_search}%"))
-    if dept_filter:
-        course_query = course_query.where(Course.dno == dept_filter)
-
-    courses = db.session.execute(course_query).scalars().all()
-    all_courses = db.session.execute(select(Course).order_by(Course.cname)).scalars().all()
 
     return render_template(
         "courses.html",
         courses=courses,
         departments=departments,
-        all_courses=all_courses,
         course_code_search=course_code_search,
         course_name_search=course_name_search,
         dept_filter=dept_filter,
-        course_total=course_total,
-        active_course_count=active_course_count,
+        pagination=PageInfo(page, per_page, total),
+    )
+
+
+@bp.get("/courses/stats")
+@conditional_get(Course, Department)
+def course_stats():
+    """课程页统计卡片与院系分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "course_total": scalar_of(select(func.count()).select_from(Course)),
+            "active_course_count": scalar_of(select(func.count()).where(Course.is_active)),
+            "avg_credit": scalar_of(select(func.avg(Course.credits))),
+            "dept_rows": rows_of(
+                select(Department.dname, func.count(Course.cno))
+                .join(Course, Course.dno == Department.dno, isouter=True)
+                .group_by(Department.dname)
+                .order_by(Department.dname)
+            ),
+        }
+    )
+    avg_credit = stats["avg_credit"]
+    dept_distribution = [(dept or "未分配", count) for dept, count in stats["dept_rows"]]
+    return jsonify(
+        course_total=stats["course_total"] or 0,
+        active_course_count=stats["active_course_count"] or 0,
         avg_credit=round(float(avg_credit), 2) if avg_credit else 0,
-        course_dept_labels=[label for label, _ in dept_distribution],
-        course_dept_values=[value for _, value in dept_distribution],
+        labels=[label for label, _ in dept_distribution],
+        values=[value for _, value in dept_distribution],
     )
 
 
@@ -601,22 +650,10 @@ def delete_course(cno: str) -> str:
 @bp.route("/enrollments", methods=["GET", "POST"])
 def manage_enrollments() -> str:
     """管理选课记录，包括创建、查询与筛选。"""
-    # 功能：提供选课 CRUD 表单、统计图表与多条件查询过滤。
-    students = db.session.execute(select(Student).order_by(Student.sno)).scalars().all()
-    courses = db.session.execute(select(Course).order_by(Course.cno)).scalars().all()
+    # 功能：提供选课 CRUD 表单与多条件查询过滤；统计图表由 enrollment_stats 异步提供。
+    # 学期为字典表，规模固定，仍直接渲染为下拉框；学生与课程改用下拉联想
     terms = db.session.execute(select(TermDict).order_by(TermDict.term_code)).scalars().all()
     valid_term_codes = {term.term_code for term in terms}
-    enrollment_total = db.session.scalar(select(func.count()).select_from(Enrollment)) or 0
-    status_distribution_rows = (
-        db.session.execute(
-            select(Enrollment.status, func.count())
-            .group_by(Enrollment.status)
-            .order_by(Enrollment.status)
-        )
-        .all()
-    )
-    status_distribution = [(status, count) for status, count in status_distribution_rows]
-    status_distribution_map = dict(status_distribution)
 
     if request.method == "POST":
         form = request.form
@@ -656,58 +693,83 @@ def manage_enrollments() -> str:
             if status not in ENROLLMENT_STATUSES:
                 status = ENROLLMENT_STATUSES[0]
 
-            enrollment = Enrollment(
-                sno=sno,
-                cno=cno,
-                year_taken=year_taken,
-                term=term,
-                grade=grade,
-                status=status,
-            )
-            db.session.add(enrollment)
             try:
-                db.session.commit()
-                flash("选课记录创建成功。", "success")
-                return redirect(url_for("main.manage_enrollments"))
-            except IntegrityError as exc:
-                db.session.rollback()
-                flash(f"创建选课记录失败：{exc.orig}", "danger")
+                if status in SEAT_HOLDING_STATUSES:
+                    # 锁住学生行直到提交，同一学生的并发选课不会各自通过校验后同时写入
+                    check_timetable(sno, cno, year_taken, term, lock=True)
+            except TimetableClashError:
+                flash(TIMETABLE_CLASH_MSG, "danger")
+            else:
+                enrollment = Enrollment(
+                    sno=sno,
+                    cno=cno,
+                    year_taken=year_taken,
+                    term=term,
+                    grade=grade,
+                    status=status,
+                )
+                db.session.add(enrollment)
+                try:
+                    db.session.commit()
+                    flash("选课记录创建成功。", "success")
+                    return redirect(url_for("main.manage_enrollments"))
+                except IntegrityError as exc:
+                    db.session.rollback()
+                    flash(f"创建选课记录失败：{exc.orig}", "danger")
+                except OfferingFullError:
+                    db.session.rollback()
+                    flash(OFFERING_FULL_MSG, "danger")
 
     student_filter = request.args.get("student", "").strip()
     course_filter = request.args.get("course", "").strip()
     status_filter = request.args.get("status", "").strip()
 
-    enrollment_query = (
-        select(Enrollment, Student, Course)
-        .join(Student, Student.sno == Enrollment.sno)
-        .join(Course, Course.cno == Enrollment.cno)
-        .order_by(Enrollment.enroll_date.desc())
+    page, per_page = page_args()
+    enrollments, total = EnrollmentRepository.list(
+        student_id=student_filter or None,
+        course_id=course_filter or None,
+        status=status_filter if status_filter in ENROLLMENT_STATUSES else None,
+        page=page,
+        per_page=per_page,
     )
-    if student_filter:
-        enrollment_query = enrollment_query.where(Enrollment.sno == student_filter)
-    if course_filter:
-        enrollment_query = enrollment_query.where(Enrollment.cno == course_filter)
-    if status_filter and status_filter in ENROLLMENT_STATUSES:
-        enrollment_query = enrollment_query.where(Enrollment.status == status_filter)
-
-    enrollments = db.session.execute(enrollment_query.limit(300)).all()
     term_lookup = {term.term_code: term.term_name for term in terms}
 
     return render_template(
         "enrollments.html",
         enrollments=enrollments,
-        students=students,
-        courses=courses,
         terms=terms,
         term_lookup=term_lookup,
         statuses=ENROLLMENT_STATUSES,
         student_filter=student_filter,
         course_filter=course_filter,
         status_filter=status_filter,
-        enrollment_total=enrollment_total,
-        enrollment_status_labels=[label for label, _ in status_distribution],
-        enrollment_status_values=[value for _, value in status_distribution],
-        enrollment_status_map=status_distribution_map,
+        pagination=PageInfo(page, per_page, total),
+    )
+
+
+@bp.get("/enrollments/stats")
+@conditional_get(Enrollment)
+def enrollment_stats():
+    """选课页统计卡片与状态分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "enrollment_total": scalar_of(select(func.count()).select_from(Enrollment)),
+            "status_rows": rows_of(
+                select(Enrollment.status, func.count())
+                .group_by(Enrollment.status)
+                .order_by(Enrollment.status)
+            ),
+        }
+    )
+    status_distribution = [(status, count) for status, count in stats["status_rows"]]
+    status_distribution_map = dict(status_distribution)
+    return jsonify(
+        enrollment_total=stats["enrollment_total"] or 0,
+        completed=status_distribution_map.get("completed", 0),
+        enrolled=status_distribution_map.get("enrolled", 0),
+        labels=[label for label, _ in status_distribution],
+        values=[value for _, value in status_distribution],
     )
 
 
@@ -724,6 +786,7 @@ def update_enrollment(sno: str, cno: str) -> str:
         flash("未找到选课记录。", "danger")
         return redirect(url_for("main.manage_enrollments"))
 
+    before = (enrollment.year_taken, enrollment.term, enrollment.status)
     form = request.form
     year_taken_raw = form.get("year_taken", "").strip()
     if year_taken_raw:
@@ -746,12 +809,27 @@ def update_enrollment(sno: str, cno: str) -> str:
     if status in ENROLLMENT_STATUSES:
         enrollment.status = status
 
+    # 与 API 一致：变为占名额状态或换到其他学期时重新检查课表冲突
+    moved = (enrollment.year_taken, enrollment.term) != before[:2]
+    if enrollment.status in SEAT_HOLDING_STATUSES and (moved or before[2] not in SEAT_HOLDING_STATUSES):
+        try:
+            # 校验查询不应提前 flush 本次修改，否则名额不足会在这里而不是提交时抛出
+            with db.session.no_autoflush:
+                check_timetable(sno, cno, enrollment.year_taken, enrollment.term, lock=True)
+        except TimetableClashError:
+            db.session.rollback()
+            flash(TIMETABLE_CLASH_MSG, "danger")
+            return redirect(url_for("main.manage_enrollments"))
+
     try:
         db.session.commit()
         flash("选课记录已更新。", "success")
     except IntegrityError as exc:
         db.session.rollback()
         flash(f"更新失败：{exc.orig}", "danger")
+    except OfferingFullError:
+        db.session.rollback()
+        flash(OFFERING_FULL_MSG, "danger")
 
     return redirect(url_for("main.manage_enrollments"))
 
@@ -781,19 +859,7 @@ def delete_enrollment(sno: str, cno: str) -> str:
 @bp.route("/classrooms", methods=["GET", "POST"])
 def manage_classrooms() -> str:
     """管理教室信息。"""
-    # 功能：展示教室资源、楼栋统计并支持创建新教室。
-    classroom_total = db.session.scalar(select(func.count()).select_from(Classroom)) or 0
-    avg_capacity = db.session.scalar(select(func.avg(Classroom.capacity))) or 0
-    building_distribution_rows = (
-        db.session.execute(
-            select(Classroom.building, func.count())
-            .group_by(Classroom.building)
-            .order_by(Classroom.building)
-        )
-        .all()
-    )
-    building_distribution = [(building, count) for building, count in building_distribution_rows]
-    building_distribution_map = dict(building_distribution)
+    # 功能：展示教室资源并支持创建新教室；楼栋统计由 classroom_stats 异步提供。
     if request.method == "POST":
         form = request.form
         room_id = form.get("room_id", "").strip()
@@ -829,22 +895,40 @@ def manage_classrooms() -> str:
                     db.session.rollback()
                     flash(f"创建教室失败：{exc.orig}", "danger")
 
-    classrooms = (
-        db.session.execute(
-            select(Classroom).order_by(Classroom.building, Classroom.room_no)
-        )
-        .scalars()
-        .all()
-    )
+    page, per_page = page_args()
+    classrooms, total = ClassroomRepository.list(page=page, per_page=per_page)
 
     return render_template(
         "classrooms.html",
         classrooms=classrooms,
-        classroom_total=classroom_total,
+        pagination=PageInfo(page, per_page, total),
+    )
+
+
+@bp.get("/classrooms/stats")
+@conditional_get(Classroom)
+def classroom_stats():
+    """教室页统计卡片与楼栋分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "classroom_total": scalar_of(select(func.count()).select_from(Classroom)),
+            "avg_capacity": scalar_of(select(func.avg(Classroom.capacity))),
+            "building_rows": rows_of(
+                select(Classroom.building, func.count())
+                .group_by(Classroom.building)
+                .order_by(Classroom.building)
+            ),
+        }
+    )
+    avg_capacity = stats["avg_capacity"]
+    building_distribution = [(building, count) for building, count in stats["building_rows"]]
+    return jsonify(
+        classroom_total=stats["classroom_total"] or 0,
         avg_capacity=round(float(avg_capacity), 1) if avg_capacity else 0,
-        classroom_building_labels=[label for label, _ in building_distribution],
-        classroom_building_values=[value for _, value in building_distribution],
-        classroom_building_map=building_distribution_map,
+        building_count=len(building_distribution),
+        labels=[label for label, _ in building_distribution],
+        values=[value for _, value in building_distribution],
     )
 
 
@@ -917,19 +1001,8 @@ def delete_classroom(room_id: str) -> str:
 @bp.route("/teachers", methods=["GET", "POST"])
 def manage_teachers() -> str:
     """管理教师信息。"""
-    # 功能：展示教师列表、统计职称分布并处理新增教师提交。
+    # 功能：展示教师列表并处理新增教师提交；职称分布由 teacher_stats 异步提供。
     departments = db.session.execute(select(Department).order_by(Department.dname)).scalars().all()
-    teacher_total = db.session.scalar(select(func.count()).select_from(Teacher)) or 0
-    title_distribution_rows = (
-        db.session.execute(
-            select(Teacher.title, func.count())
-            .group_by(Teacher.title)
-            .order_by(Teacher.title)
-        )
-        .all()
-    )
-    title_distribution = [(title, count) for title, count in title_distribution_rows]
-    title_distribution_map = dict(title_distribution)
     if request.method == "POST":
         form = request.form
         tno = form.get("tno", "").strip()
@@ -968,25 +1041,39 @@ def manage_teachers() -> str:
                 db.session.rollback()
                 flash(f"创建教师失败：{exc.orig}", "danger")
 
-    teachers = (
-        db.session.execute(
-            select(Teacher)
-            .options(selectinload(Teacher.department))
-            .order_by(Teacher.tname)
-        )
-        .scalars()
-        .all()
-    )
+    page, per_page = page_args()
+    teachers, total = TeacherRepository.list(page=page, per_page=per_page)
 
     return render_template(
         "teachers.html",
         teachers=teachers,
         departments=departments,
         teacher_titles=TEACHER_TITLES,
-        teacher_total=teacher_total,
-        teacher_title_labels=[label for label, _ in title_distribution],
-        teacher_title_values=[value for _, value in title_distribution],
-        teacher_title_map=title_distribution_map,
+        pagination=PageInfo(page, per_page, total),
+    )
+
+
+@bp.get("/teachers/stats")
+@conditional_get(Teacher)
+def teacher_stats():
+    """教师页统计卡片与职称分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "teacher_total": scalar_of(select(func.count()).select_from(Teacher)),
+            "title_rows": rows_of(
+                select(Teacher.title, func.count()).group_by(Teacher.title).order_by(Teacher.title)
+            ),
+        }
+    )
+    title_distribution = [(title, count) for title, count in stats["title_rows"]]
+    title_distribution_map = dict(title_distribution)
+    return jsonify(
+        teacher_total=stats["teacher_total"] or 0,
+        professor=title_distribution_map.get("Professor", 0),
+        lecturer=title_distribution_map.get("Lecturer", 0),
+        labels=[label for label, _ in title_distribution],
+        values=[value for _, value in title_distribution],
     )
 
 
@@ -1061,24 +1148,9 @@ def delete_teacher(tno: str) -> str:
 @bp.route("/teachings", methods=["GET", "POST"])
 def manage_teachings() -> str:
     """管理授课安排。"""
-    # 功能：整合课程、教师、教室资源以维护授课安排并提供创建能力。
-    courses = db.session.execute(select(Course).order_by(Course.cno)).scalars().all()
-    teachers = db.session.execute(select(Teacher).order_by(Teacher.tname)).scalars().all()
-    classrooms = db.session.execute(select(Classroom).order_by(Classroom.building, Classroom.room_no)).scalars().all()
+    # 功能：维护授课安排并提供创建能力；课程、教师、教室通过下拉联想选择，不再整表加载。
     terms = db.session.execute(select(TermDict).order_by(TermDict.term_code)).scalars().all()
     term_lookup = {term.term_code: term.term_name for term in terms}
-    teaching_total = db.session.scalar(select(func.count()).select_from(Teaching)) or 0
-    avg_teaching_capacity = db.session.scalar(select(func.avg(Teaching.capacity))) or 0
-    term_distribution_rows = (
-        db.session.execute(
-            select(Teaching.term, func.count())
-            .group_by(Teaching.term)
-            .order_by(Teaching.term)
-        )
-        .all()
-    )
-    term_distribution = [(term_lookup.get(term, term), count) for term, count in term_distribution_rows]
-    term_distribution_map = dict(term_distribution)
 
     if request.method == "POST":
         form = request.form
@@ -1118,49 +1190,73 @@ def manage_teachings() -> str:
                 except ValueError:
                     flash("结束日期格式不正确。", "warning")
 
-            teaching = Teaching(
-                cno=cno,
-                tno=tno,
-                year_offered=int(year_offered_raw),
-                term=term,
-                room_id=room_id or None,
-                capacity=capacity,
-                start_date=start_date,
-                end_date=end_date,
-            )
-            db.session.add(teaching)
             try:
-                db.session.commit()
-                flash("授课安排创建成功。", "success")
-                return redirect(url_for("main.manage_teachings"))
-            except IntegrityError as exc:
-                db.session.rollback()
-                flash(f"创建授课安排失败：{exc.orig}", "danger")
+                check_room_booking(room_id, start_date, end_date)
+            except RoomConflictError:
+                flash(ROOM_BOOKING_CONFLICT_MSG, "danger")
+            else:
+                teaching = Teaching(
+                    cno=cno,
+                    tno=tno,
+                    year_offered=int(year_offered_raw),
+                    term=term,
+                    room_id=room_id or None,
+                    capacity=capacity,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+                db.session.add(teaching)
+                try:
+                    db.session.commit()
+                    flash("授课安排创建成功。", "success")
+                    return redirect(url_for("main.manage_teachings"))
+                except RoomConflictError:
+                    # 索引预检之后其他请求抢先订下了教室，提交前的加锁复核拒绝了这次写入
+                    db.session.rollback()
+                    flash(ROOM_BOOKING_CONFLICT_MSG, "danger")
+                except IntegrityError as exc:
+                    db.session.rollback()
+                    flash(f"创建授课安排失败：{exc.orig}", "danger")
 
-    teachings = (
-        db.session.execute(
-            select(Teaching, Course, Teacher, Classroom)
-            .join(Course, Course.cno == Teaching.cno)
-            .join(Teacher, Teacher.tno == Teaching.tno)
-            .join(Classroom, Classroom.room_id == Teaching.room_id, isouter=True)
-            .order_by(Teaching.year_offered.desc(), Teaching.term.desc(), Course.cno)
-        )
-        .all()
-    )
+    page, per_page = page_args()
+
+    def load_page() -> tuple[list[Teaching], PageInfo]:
+        # 表格片段缓存未命中时才执行分页查询
+        teachings, total = TeachingRepository.list(page=page, per_page=per_page)
+        return teachings, PageInfo(page, per_page, total)
 
     return render_template(
         "teachings.html",
-        teachings=teachings,
-        courses=courses,
-        teachers=teachers,
-        classrooms=classrooms,
+        teaching_page=deferred(load_page),
         terms=terms,
         term_lookup=term_lookup,
-        teaching_total=teaching_total,
-        avg_teaching_capacity=round(float(avg_teaching_capacity), 1) if avg_teaching_capacity else 0,
-        teaching_term_labels=[label for label, _ in term_distribution],
-        teaching_term_values=[value for _, value in term_distribution],
-        teaching_term_map=term_distribution_map,
+    )
+
+
+@bp.get("/teachings/stats")
+@conditional_get(Teaching, TermDict)
+def teaching_stats():
+    """授课页统计卡片与学期分布图数据。"""
+    # 功能：首屏渲染后由页面异步获取，表版本未变时直接返回 304。
+    stats = fan_out(
+        {
+            "term_names": rows_of(select(TermDict.term_code, TermDict.term_name)),
+            "teaching_total": scalar_of(select(func.count()).select_from(Teaching)),
+            "avg_capacity": scalar_of(select(func.avg(Teaching.capacity))),
+            "term_rows": rows_of(
+                select(Teaching.term, func.count()).group_by(Teaching.term).order_by(Teaching.term)
+            ),
+        }
+    )
+    term_lookup = dict(stats["term_names"])
+    avg_capacity = stats["avg_capacity"]
+    term_distribution = [(term_lookup.get(term, term), count) for term, count in stats["term_rows"]]
+    return jsonify(
+        teaching_total=stats["teaching_total"] or 0,
+        term_count=len(term_distribution),
+        avg_teaching_capacity=round(float(avg_capacity), 1) if avg_capacity else 0,
+        labels=[label for label, _ in term_distribution],
+        values=[value for _, value in term_distribution],
     )
 
 
@@ -1226,9 +1322,19 @@ def update_teaching(teach_id: int) -> str:
     else:
         teaching.end_date = None
 
+    try:
+        check_room_booking(teaching.room_id, teaching.start_date, teaching.end_date, exclude=teach_id)
+    except RoomConflictError:
+        db.session.rollback()
+        flash(ROOM_BOOKING_CONFLICT_MSG, "danger")
+        return redirect(url_for("main.manage_teachings"))
+
     try:
         db.session.commit()
         flash("授课安排已更新。", "success")
+    except RoomConflictError:
+        db.session.rollback()
+        flash(ROOM_BOOKING_CONFLICT_MSG, "danger")
     except IntegrityError as exc:
         db.session.rollback()
         flash(f"更新失败：{exc.orig}", "danger")
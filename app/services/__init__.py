@@ -13,7 +13,64 @@ from .integrity import (
     validate_course_hours,
     validate_student_enroll_year,
 )
+from .audit_log import OperationLogWriter, init_operation_log, record_operation
+from .change_bus import Change, ChangeBus, get_change_bus, init_change_bus
+from .enrollment_stream import EnrollmentFeed, get_enrollment_feed, init_enrollment_stream
+from .fanout import FanOutTimeout, fan_out, rows_of, scalar_of, scalars_of
+from .lottery import (
+    RoundClosedError,
+    allocate_round,
+    create_round,
+    round_summary,
+    student_requests,
+    submit_requests,
+)
+from .room_assignment import assign_rooms
+from .room_bookings import (
+    RoomBookingIndex,
+    RoomConflictError,
+    check_room_booking,
+    get_room_booking_index,
+    init_room_bookings,
+    locked_room_conflicts,
+)
+from .seats import (
+    OfferingFullError,
+    reconcile_seats,
+    register_seat_listener,
+    remaining_seats,
+)
 from .seed_service import populate_sample_data
+from .waitlist import (
+    WaitlistPromoter,
+    get_waitlist_promoter,
+    init_waitlist,
+    join_waitlist,
+    leave_waitlist,
+    promote_waitlist,
+    waitlist_position,
+)
+from .timetable import (
+    TimetableClashError,
+    check_timetable,
+    replace_teaching_slots,
+    student_timetable,
+    teaching_slots,
+    term_clash_report,
+)
+from .workload import (
+    WORKLOAD_METRICS,
+    rebuild_workload,
+    register_workload_listener,
+    teacher_workload,
+    workload_ranking,
+)
+from .utilization import classroom_utilization
+from .table_versions import (
+    bump_table_versions,
+    register_table_version_listener,
+    table_version_token,
+)
 
 __all__ = [
     "describe_classroom_teaching_reference",
@@ -27,5 +84,59 @@ __all__ = [
     "validate_course_credits",
     "validate_course_hours",
     "validate_student_enroll_year",
+    "OperationLogWriter",
+    "init_operation_log",
+    "record_operation",
+    "Change",
+    "ChangeBus",
+    "get_change_bus",
+    "init_change_bus",
+    "EnrollmentFeed",
+    "get_enrollment_feed",
+    "init_enrollment_stream",
+    "FanOutTimeout",
+    "fan_out",
+    "rows_of",
+    "scalar_of",
+    "scalars_of",
+    "RoundClosedError",
+    "allocate_round",
+    "create_round",
+    "round_summary",
+    "student_requests",
+    "submit_requests",
+    "assign_rooms",
+    "RoomBookingIndex",
+    "RoomConflictError",
+    "check_room_booking",
+    "get_room_booking_index",
+    "init_room_bookings",
+    "locked_room_conflicts",
+    "OfferingFullError",
+    "reconcile_seats",
+    "register_seat_listener",
+    "remaining_seats",
     "populate_sample_data",
+    "WaitlistPromoter",
+    "get_waitlist_promoter",
+    "init_waitlist",
+    "join_waitlist",
+    "leave_waitlist",
+    "promote_waitlist",
+    "waitlist_position",
+    "TimetableClashError",
+    "check_timetable",
+    "replace_teaching_slots",
+    "student_timetable",
+    "teaching_slots",
+    "term_clash_report",
+    "WORKLOAD_METRICS",
+    "rebuild_workload",
+    "register_workload_listener",
+    "teacher_workload",
+    "workload_ranking",
+    "classroom_utilization",
+    "bump_table_versions",
+    "register_table_version_listener",
+    "table_version_token",
 ]
@@ -0,0 +1,295 @@
+"""Append-only CRUD operation log, buffered in memory and flushed in batches.
+
+Repositories record reads explicitly via :func:`record_operation`; writes are
+picked up from the shared session (so page routes that write directly are
+covered too) and only enter the buffer once their transaction commits. A
+background thread drains the buffer into ``OperationLog`` and folds each batch
+into per-table, per-hour counters in ``OperationRollup``, which is what the
+dashboard heatmap reads.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect, insert, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import OperationLog, OperationRollup, TableVersion
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("create", "read", "update", "delete")
+
+_LOG_TABLE = OperationLog.__table__
+_ROLLUP_TABLE = OperationRollup.__table__
+_IGNORED_TABLES = {_LOG_TABLE.name, _ROLLUP_TABLE.name, TableVersion.__table__.name}
+_PENDING_KEY = "_operation_log_pending"
+
+
+@dataclass(frozen=True)
+class OperationEvent:
+    table: str
+    operation: str
+    key: Optional[str]
+    occurred_at: datetime
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def format_record_key(key: Any) -> Optional[str]:
+    """Render a primary key (scalar or composite tuple) as the ``RecordKey`` string."""
+    if key is None:
+        return None
+    if isinstance(key, tuple):
+        key = ":".join("" if part is None else str(part) for part in key)
+    return str(key)[:100]
+
+
+def _upsert_rollups(connection: Connection, events: List[OperationEvent]) -> None:
+    # 功能：把一批操作按（表, 操作, 小时）累加到汇总表，缺少汇总行时补插一行。
+    now = datetime.utcnow()
+    buckets: Counter[Tuple[str, str, datetime]] = Counter(
+        (item.table, item.operation, hour_bucket(item.occurred_at)) for item in events
+    )
+    for (table, operation, hour), count in sorted(buckets.items()):
+        stmt = (
+            update(_ROLLUP_TABLE)
+            .where(
+                _ROLLUP_TABLE.c.TableName == table,
+                _ROLLUP_TABLE.c.Operation == operation,
+                _ROLLUP_TABLE.c.HourStart == hour,
+            )
+            .values(Count=_ROLLUP_TABLE.c.Count + count, UpdatedAt=now)
+        )
+        if connection.execute(stmt).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(
+                    insert(_ROLLUP_TABLE).values(
+                        TableName=table,
+                        Operation=operation,
+                        HourStart=hour,
+                        Count=count,
+                        UpdatedAt=now,
+                    )
+                )
+        except IntegrityError:
+            # 其他 worker 已插入同一小时的汇总行，改为累加
+            connection.execute(stmt)
+
+
+class OperationLogWriter:
+    """Per-process buffer of operation events with a background flusher thread."""
+
+    def __init__(
+        self,
+        app: Flask,
+        *,
+        flush_interval: float = 5.0,
+        batch_size: int = 500,
+        max_buffer: int = 50_000,
+    ) -> None:
+        self._app = app
+        self.flush_interval = flush_interval
+        self.batch_size = max(batch_size, 1)
+        self.max_buffer = max(max_buffer, self.batch_size)
+        self._buffer: Deque[OperationEvent] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.dropped = 0
+        self.flushed = 0
+
+    def record(self, table: str, operation: str, key: Any = None) -> None:
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        item = OperationEvent(table, operation, format_record_key(key), datetime.utcnow())
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                # 数据库长时间不可写时丢弃最旧的记录，避免内存无限增长
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(item)
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _ensure_started(self) -> None:
+        # 预加载应用后 fork 出的 worker 不会继承线程，按进程号懒启动
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="operation-log-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - background thread guard
+                logger.exception("Failed to flush operation log")
+
+    def _drain(self) -> List[OperationEvent]:
+        with self._lock:
+            count = min(len(self._buffer), self.batch_size)
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _requeue(self, batch: List[OperationEvent]) -> None:
+        with self._lock:
+            self._buffer.extendleft(reversed(batch))
+            while len(self._buffer) > self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+
+    def flush(self) -> int:
+        """Write everything buffered so far; return the number of events written."""
+        # 功能：按批次写入操作日志并在同一事务内累加小时汇总，失败的批次放回缓冲区。
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                try:
+                    with self._app.app_context(), db.engine.begin() as connection:
+                        connection.execute(
+                            insert(_LOG_TABLE),
+                            [
+                                {
+                                    "TableName": item.table,
+                                    "Operation": item.operation,
+                                    "RecordKey": item.key,
+                                    "OccurredAt": item.occurred_at,
+                                }
+                                for item in batch
+                            ],
+                        )
+                        _upsert_rollups(connection, batch)
+                except Exception:
+                    self._requeue(batch)
+                    raise
+                written += len(batch)
+                self.flushed += len(batch)
+        return written
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush()
+        except Exception:  # pragma: no cover - best effort at shutdown
+            logger.exception("Failed to flush operation log at shutdown")
+
+
+def _get_writer() -> Optional[OperationLogWriter]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("operation_log")
+
+
+def record_operation(table: str, operation: str, key: Any = None) -> None:
+    """Queue one operation on ``table``; a no-op when the log is disabled."""
+    writer = _get_writer()
+    if writer is not None:
+        writer.record(table, operation, key)
+
+
+def _pending(session: Session) -> List[Tuple[str, str, Any]]:
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+def record_on_commit(session: Session, table: str, operation: str, keys: Iterable[Any]) -> None:
+    """Queue operations written outside the ORM flush (bulk or Core statements) until commit."""
+    _pending(session).extend((table, operation, key) for key in keys)
+
+
+def primary_key_of(obj: Any) -> Any:
+    # flush 后新对象尚未登记 identity，直接从实例读取主键（含自增值）
+    values = tuple(inspect(obj).mapper.primary_key_from_instance(obj))
+    return values[0] if len(values) == 1 else values
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：记录本次 flush 的增删改，等事务提交后再放入缓冲区。
+    pending = _pending(session)
+    for operation, objects in (
+        ("create", session.new),
+        ("delete", session.deleted),
+        ("update", session.dirty),
+    ):
+        for obj in objects:
+            table = obj.__table__.name
+            if table in _IGNORED_TABLES:
+                continue
+            if operation == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            pending.append((table, operation, primary_key_of(obj)))
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for table, operation, key in pending:
+            record_operation(table, operation, key)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_operation_log(app: Flask) -> Optional[OperationLogWriter]:
+    """Create the application's operation log writer from ``AUDIT_LOG_*`` settings."""
+    # 功能：按配置创建写入器并挂到 app.extensions 上，同时为全局会话注册提交监听。
+    if not app.config.get("AUDIT_LOG_ENABLED", True):
+        return None
+    writer = OperationLogWriter(
+        app,
+        flush_interval=app.config.get("AUDIT_LOG_FLUSH_INTERVAL", 5.0),
+        batch_size=app.config.get("AUDIT_LOG_BATCH_SIZE", 500),
+        max_buffer=app.config.get("AUDIT_LOG_MAX_BUFFER", 50_000),
+    )
+    app.extensions["operation_log"] = writer
+    for name, listener in (
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    atexit.register(writer.close)
+    return writer
@@ -0,0 +1,70 @@
+"""Micro-benchmarks comparing read paths against the configured database."""
+
+from __future__ import annotations
+
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from sqlalchemy import event
+
+from ..extensions import db
+from ..repositories.teaching_repository import TeachingRepository
+
+
+@contextmanager
+def _count_statements(counter: List[int]) -> Iterator[None]:
+    # 功能：在上下文内统计引擎实际发出的 SQL 语句条数。
+    def _on_execute(*_args: Any) -> None:
+        counter[0] += 1
+
+    event.listen(db.engine, "before_cursor_execute", _on_execute)
+    try:
+        yield
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _on_execute)
+
+
+def _measure(func: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    # 功能：重复执行读取路径，记录耗时与每次调用的语句数。
+    timings: List[float] = []
+    counter = [0]
+    with _count_statements(counter):
+        for _ in range(iterations):
+            # 清空 identity map，避免 ORM 路径复用上一轮已加载的对象
+            db.session.expunge_all()
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "statements": counter[0] / iterations,
+    }
+
+
+def benchmark_teaching_list(*, iterations: int = 50, per_page: int = 20) -> Dict[str, Dict[str, float]]:
+    """Compare the ORM + selectinload teaching list with the joined projection."""
+    from ..api.teachings import _serialize_teaching
+
+    def orm_path() -> None:
+        teachings, _total = TeachingRepository.list(page=1, per_page=per_page)
+        [_serialize_teaching(teaching) for teaching in teachings]
+
+    def projection_count() -> None:
+        TeachingRepository.list_rows(page=1, per_page=per_page, total_mode="count")
+
+    def projection_window() -> None:
+        TeachingRepository.list_rows(page=1, per_page=per_page, total_mode="window")
+
+    # 预热一次，排除连接池建立与语句编译缓存的首轮开销
+    for func in (orm_path, projection_count, projection_window):
+        func()
+
+    return {
+        "orm_selectinload": _measure(orm_path, iterations),
+        "projection_count": _measure(projection_count, iterations),
+        "projection_window": _measure(projection_window, iterations),
+    }
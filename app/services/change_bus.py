@@ -0,0 +1,302 @@
+"""Transactional change outbox and the per-worker bus that tails it.
+
+Every flush appends one ``ChangeOutbox`` row per created, updated or deleted
+object inside the same transaction, together with the table's write version
+as of the write (the counters themselves are incremented after commit, see
+:mod:`.table_versions`). ORM bulk statements add a single row with no key,
+meaning "anything in this table may have changed". Each worker process runs a
+poller that reads the outbox past its high-water mark and hands the changes to
+subscribers, so in-process caches, search indexes and rollups stay coherent
+across gunicorn workers.
+
+Subscribers register with :meth:`ChangeBus.subscribe`; they are called on the
+poller thread inside an app context with the batch of changes for the tables
+they asked for.
+
+``Change.version`` is the ``TableVersion`` counter read when the outbox row
+was written, i.e. before this transaction's own increment. It is informational
+only: the increment happens after commit on its own connection (and is
+skipped if that fails), so it must not be compared with
+:func:`~.table_versions.table_version_token` or used to decide whether a
+cached value is current. React to the change itself instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import (
+    ChangeOutbox,
+    EnrollmentEvent,
+    OperationLog,
+    OperationRollup,
+    TableVersion,
+)
+from .audit_log import format_record_key, primary_key_of
+
+logger = logging.getLogger(__name__)
+
+_OUTBOX_TABLE = ChangeOutbox.__table__
+_VERSION_TABLE = TableVersion.__table__
+# 基础设施表不产生变更通知，避免写发件箱本身再触发通知
+_IGNORED_TABLES = {
+    _OUTBOX_TABLE.name,
+    _VERSION_TABLE.name,
+    OperationLog.__table__.name,
+    OperationRollup.__table__.name,
+    EnrollmentEvent.__table__.name,
+}
+_PENDING_KEY = "_change_outbox_pending"
+
+
+@dataclass(frozen=True)
+class Change:
+    change_id: int
+    table: str
+    key: Optional[str]
+    operation: str
+    # 写入发件箱时读到的表版本号（本事务递增之前），不可与 table_version_token 比较
+    version: int
+
+
+Subscriber = Callable[[List[Change]], None]
+
+
+def _table_name(table: Any) -> str:
+    return table if isinstance(table, str) else table.__table__.name
+
+
+class ChangeBus:
+    """Per-process poller of ``ChangeOutbox`` that fans changes out to subscribers."""
+
+    def __init__(
+        self,
+        app: Flask,
+        *,
+        poll_interval: float = 1.0,
+        batch_size: int = 500,
+        lookback: int = 100,
+    ) -> None:
+        self._app = app
+        self.poll_interval = poll_interval
+        self.batch_size = max(batch_size, 1)
+        self.lookback = max(lookback, 0)
+        self._subscribers: List[Tuple[Optional[FrozenSet[str]], Subscriber]] = []
+        self._high_water: Optional[int] = None
+        self._recent_ids: Deque[int] = deque()
+        self._recent_set: Set[int] = set()
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def subscribe(self, callback: Subscriber, tables: Iterable[Any] = ()) -> Subscriber:
+        """Call ``callback`` with each batch of changes to ``tables`` (all tables when empty).
+
+        ``tables`` accepts model classes or table names.
+        """
+        names = frozenset(_table_name(table) for table in tables) or None
+        with self._lock:
+            self._subscribers.append((names, callback))
+        return callback
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item[1] is not callback]
+
+    def _remember(self, change_id: int) -> bool:
+        if change_id in self._recent_set:
+            return False
+        self._recent_ids.append(change_id)
+        self._recent_set.add(change_id)
+        while len(self._recent_ids) > self.lookback + self.batch_size:
+            self._recent_set.discard(self._recent_ids.popleft())
+        return True
+
+    def poll(self) -> int:
+        """Read and dispatch outbox rows past the high-water mark; return how many were new."""
+        # 功能：按高水位读取新的发件箱记录，去重后按订阅的表分组回调。
+        with self._poll_lock, self._app.app_context():
+            if self._high_water is None:
+                # 进程首次启动时从当前末尾开始，不回放历史变更
+                self._high_water = db.session.scalar(select(func.max(_OUTBOX_TABLE.c.ChangeID))) or 0
+                return 0
+            # 自增主键可能乱序提交，回看高水位之前的少量记录以补上迟到的变更
+            floor = max(self._high_water - self.lookback, 0)
+            rows = db.session.execute(
+                select(
+                    _OUTBOX_TABLE.c.ChangeID,
+                    _OUTBOX_TABLE.c.TableName,
+                    _OUTBOX_TABLE.c.RecordKey,
+                    _OUTBOX_TABLE.c.Operation,
+                    _OUTBOX_TABLE.c.Version,
+                )
+                .where(_OUTBOX_TABLE.c.ChangeID > floor)
+                .order_by(_OUTBOX_TABLE.c.ChangeID)
+                .limit(self.lookback + self.batch_size)
+            ).all()
+            changes = [Change(*row) for row in rows if self._remember(row[0])]
+            if rows:
+                self._high_water = max(self._high_water, rows[-1][0])
+            if changes:
+                self._dispatch(changes)
+            if len(rows) >= self.lookback + self.batch_size:
+                # 积压超过一批，尽快再轮询一次
+                self._wakeup.set()
+            return len(changes)
+
+    def _dispatch(self, changes: List[Change]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for tables, callback in subscribers:
+            selected = changes if tables is None else [c for c in changes if c.table in tables]
+            if not selected:
+                continue
+            try:
+                callback(selected)
+            except Exception:  # noqa: BLE001 - one subscriber must not block the others
+                logger.exception("Change subscriber %r failed", callback)
+
+    def ensure_started(self) -> None:
+        # 预加载应用后 fork 出的 worker 不会继承线程，按进程号懒启动
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._high_water is None:
+                # 同步确定起始高水位，保证本请求随后的写入一定会被分发
+                self.poll()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="change-bus-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception:  # pragma: no cover - background thread guard
+                logger.exception("Failed to poll change outbox")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def notify_write(self) -> None:
+        """Poll right away instead of waiting for the next interval."""
+        self._wakeup.set()
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：在同一事务内为本次 flush 的增删改写入发件箱，附带写入时（本事务递增之前）的表版本号，仅供参考。
+    changes: List[Tuple[str, str, Any]] = []
+    for operation, objects in (
+        ("create", session.new),
+        ("delete", session.deleted),
+        ("update", session.dirty),
+    ):
+        for obj in objects:
+            table = obj.__table__.name
+            if table in _IGNORED_TABLES:
+                continue
+            if operation == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.append((table, operation, primary_key_of(obj)))
+    if changes:
+        _write_outbox(session, changes)
+
+
+def _do_orm_execute(orm_execute_state: Any) -> None:
+    # ORM 批量 insert/update/delete 不经过 flush，记一条无主键的整表变更
+    if orm_execute_state.is_insert:
+        operation = "create"
+    elif orm_execute_state.is_update:
+        operation = "update"
+    elif orm_execute_state.is_delete:
+        operation = "delete"
+    else:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.local_table.name in _IGNORED_TABLES:
+        return
+    _write_outbox(orm_execute_state.session, [(mapper.local_table.name, operation, None)])
+
+
+def _write_outbox(session: Session, changes: List[Tuple[str, str, Any]]) -> None:
+    connection = session.connection()
+    tables = sorted({table for table, _, _ in changes})
+    versions: Dict[str, int] = dict(
+        connection.execute(
+            select(_VERSION_TABLE.c.TableName, _VERSION_TABLE.c.Version).where(
+                _VERSION_TABLE.c.TableName.in_(tables)
+            )
+        ).all()
+    )
+    now = datetime.utcnow()
+    connection.execute(
+        insert(_OUTBOX_TABLE),
+        [
+            {
+                "TableName": table,
+                "RecordKey": format_record_key(key),
+                "Operation": operation,
+                "Version": int(versions.get(table) or 0),
+                "CreatedAt": now,
+            }
+            for table, operation, key in changes
+        ],
+    )
+    session.info[_PENDING_KEY] = True
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, None) and has_app_context():
+        bus = current_app.extensions.get("change_bus")
+        if bus is not None:
+            bus.notify_write()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_change_bus() -> ChangeBus:
+    return current_app.extensions["change_bus"]
+
+
+def init_change_bus(app: Flask) -> ChangeBus:
+    """Create the application's change bus from ``CHANGE_BUS_*`` settings.
+
+    Must be called after ``register_table_version_listener`` so the table
+    versions are already tracked for the sessions writing the outbox.
+    """
+    # 功能：创建变更总线并挂到 app.extensions 上，注册发件箱监听，并在每个请求前确保轮询线程已启动。
+    bus = ChangeBus(
+        app,
+        poll_interval=app.config.get("CHANGE_BUS_POLL_INTERVAL", 1.0),
+        batch_size=app.config.get("CHANGE_BUS_BATCH_SIZE", 500),
+        lookback=app.config.get("CHANGE_BUS_LOOKBACK", 100),
+    )
+    app.extensions["change_bus"] = bus
+    for name, listener in (
+        ("after_flush", _after_flush),
+        ("do_orm_execute", _do_orm_execute),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    app.before_request(bus.ensure_started)
+    return bus
@@ -0,0 +1,305 @@
+"""Enrollment change feed for the dashboard's Server-Sent Events stream.
+
+Every flush that creates, updates or deletes an ``Enrollment`` appends a row to
+the ``EnrollmentEvent`` outbox inside the same transaction, whether the write
+came from ``EnrollmentRepository`` or a page route. Each worker process keeps
+the latest events in an in-memory ring buffer and reads the outbox past its
+high-water mark whenever the change bus reports a write to ``SC``; SSE
+connections and the dashboard's "recent enrollments" list are served from that
+buffer without touching ``SC``.
+
+"Recent enrollments" keeps its original meaning, ``ORDER BY EnrollDate DESC``:
+next to the event buffer each worker holds the latest state of the newest
+enrollments by ``EnrollDate``, seeded from ``SC`` and updated from the same
+events, so a grade or status change never moves an old enrollment to the top.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Course, Enrollment, EnrollmentEvent, Student
+
+logger = logging.getLogger(__name__)
+
+_EVENT_TABLE = EnrollmentEvent.__table__
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    seq: int
+    event_id: Optional[int]
+    kind: str
+    payload: Dict[str, Any]
+
+
+def _payload(
+    sno: str,
+    cno: str,
+    sname: Optional[str],
+    cname: Optional[str],
+    status: Optional[str],
+    grade: Any,
+    enroll_date: Any,
+) -> Dict[str, Any]:
+    # 与仪表盘 recent_enrollments 的字段保持一致
+    return {
+        "student_id": sno,
+        "student_name": sname,
+        "course_id": cno,
+        "course_name": cname,
+        "status": status,
+        "grade": float(grade) if grade is not None else None,
+        "enroll_date": enroll_date.isoformat() if enroll_date else None,
+    }
+
+
+class EnrollmentFeed:
+    """Per-process ring buffer of enrollment events tailed from the outbox."""
+
+    def __init__(self, app: Flask, *, capacity: int = 256, lookback: int = 50) -> None:
+        self._app = app
+        self.capacity = max(capacity, 1)
+        self.lookback = max(lookback, 0)
+        self._events: Deque[StreamEvent] = deque()
+        self._seq_by_id: Dict[int, int] = {}
+        self._seq = 0
+        self._high_water: Optional[int] = None
+        # (学号, 课程号) -> (选课日期, 序号, 最新状态)；只保留选课日期最新的 capacity 条
+        self._newest: Dict[Tuple[str, str], Tuple[str, int, Dict[str, Any]]] = {}
+        # 种子查询已取到全部选课记录时，删除后无需回表补足
+        self._newest_complete = False
+        self._cond = threading.Condition()
+        self._poll_lock = threading.Lock()
+
+    def _append(self, event_id: Optional[int], kind: str, payload: Dict[str, Any]) -> bool:
+        if event_id is not None and event_id in self._seq_by_id:
+            return False
+        self._seq += 1
+        if len(self._events) >= self.capacity:
+            evicted = self._events.popleft()
+            if evicted.event_id is not None:
+                self._seq_by_id.pop(evicted.event_id, None)
+        self._events.append(StreamEvent(self._seq, event_id, kind, payload))
+        if event_id is not None:
+            self._seq_by_id[event_id] = self._seq
+        self._track(kind, payload)
+        return True
+
+    def _track(self, kind: str, payload: Dict[str, Any]) -> None:
+        # 功能：按事件更新最新选课表：删除即移除，其余原地覆盖状态，超出容量时淘汰选课日期最早的一条。
+        key = (payload["student_id"], payload["course_id"])
+        if kind == "deleted":
+            self._newest.pop(key, None)
+            return
+        self._newest[key] = (payload["enroll_date"] or "", self._seq, payload)
+        if len(self._newest) > self.capacity:
+            oldest = min(self._newest, key=lambda item: self._newest[item][:2])
+            del self._newest[oldest]
+            self._newest_complete = False
+
+    def _reseed(self, rows: List[Tuple[Any, ...]]) -> None:
+        self._newest = {}
+        for row in reversed(rows):
+            self._seq += 1
+            payload = _payload(*row)
+            self._newest[(payload["student_id"], payload["course_id"])] = (
+                payload["enroll_date"] or "",
+                self._seq,
+                payload,
+            )
+        self._newest_complete = len(rows) < self.capacity
+
+    def _fetch(self) -> List[Tuple[Any, ...]]:
+        stmt = select(
+            EnrollmentEvent.event_id,
+            EnrollmentEvent.kind,
+            EnrollmentEvent.sno,
+            EnrollmentEvent.cno,
+            Student.sname,
+            Course.cname,
+            EnrollmentEvent.status,
+            EnrollmentEvent.grade,
+            EnrollmentEvent.enroll_date,
+        ).outerjoin(Student, Student.sno == EnrollmentEvent.sno).outerjoin(
+            Course, Course.cno == EnrollmentEvent.cno
+        )
+        if self._high_water is None:
+            # 首次加载：只取最近 capacity 条填满缓冲区
+            rows = db.session.execute(
+                stmt.order_by(EnrollmentEvent.event_id.desc()).limit(self.capacity)
+            ).all()
+            return list(reversed(rows))
+        # 自增主键可能乱序提交，回看高水位之前的少量记录以补上迟到的事件
+        floor = max(self._high_water - self.lookback, 0)
+        return db.session.execute(
+            stmt.where(EnrollmentEvent.event_id > floor).order_by(EnrollmentEvent.event_id)
+        ).all()
+
+    def _seed_from_enrollments(self) -> List[Tuple[Any, ...]]:
+        # 首次加载时先放入选课日期最新的记录作为最新选课表的底稿，发件箱事件叠加在其后；
+        # 否则发件箱刚启用或被清理后，最近选课列表会缺少早于发件箱的记录
+        return db.session.execute(
+            select(
+                Enrollment.sno,
+                Enrollment.cno,
+                Student.sname,
+                Course.cname,
+                Enrollment.status,
+                Enrollment.grade,
+                Enrollment.enroll_date,
+            )
+            .join(Student, Student.sno == Enrollment.sno)
+            .join(Course, Course.cno == Enrollment.cno)
+            .order_by(Enrollment.enroll_date.desc())
+            .limit(self.capacity)
+        ).all()
+
+    def poll(self) -> int:
+        """Pull new outbox rows into the buffer; return how many were added."""
+        # 功能：读取高水位之后的发件箱记录追加到环形缓冲区，并唤醒等待中的 SSE 连接。
+        with self._poll_lock:
+            with self._app.app_context():
+                first_load = self._high_water is None
+                rows = self._fetch()
+                seed = self._seed_from_enrollments() if first_load else []
+            added = 0
+            with self._cond:
+                if first_load:
+                    self._reseed(seed)
+                for event_id, kind, sno, cno, sname, cname, status, grade, enroll_date in rows:
+                    payload = _payload(sno, cno, sname, cname, status, grade, enroll_date)
+                    added += self._append(event_id, kind, payload)
+                    self._high_water = max(self._high_water or 0, event_id)
+                if self._high_water is None:
+                    self._high_water = 0
+                if added:
+                    self._cond.notify_all()
+            return added
+
+    def ensure_loaded(self) -> None:
+        if self._high_water is None:
+            self.poll()
+
+    def current_seq(self) -> int:
+        self.ensure_loaded()
+        with self._cond:
+            return self._seq
+
+    def seq_for(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Map an SSE ``Last-Event-ID`` back to a buffer position, if still buffered."""
+        self.ensure_loaded()
+        try:
+            event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return None
+        if event_id is None:
+            return None
+        with self._cond:
+            return self._seq_by_id.get(event_id)
+
+    def wait_after(self, seq: int, timeout: float) -> List[StreamEvent]:
+        """Return events after ``seq``, blocking up to ``timeout`` seconds for new ones."""
+        with self._cond:
+            if self._seq <= seq:
+                self._cond.wait(timeout)
+            return [item for item in self._events if item.seq > seq]
+
+    def recent(self, limit: int = 8) -> List[Dict[str, Any]]:
+        """Latest state of the newest enrollments by ``enroll_date``, newest first."""
+        # 功能：从最新选课表按选课日期倒序截取；删除使其少于 limit 条且库中可能还有更早记录时回表补足。
+        self.ensure_loaded()
+        with self._cond:
+            short = len(self._newest) < limit and not self._newest_complete
+        if short:
+            with self._poll_lock:
+                with self._app.app_context():
+                    rows = self._seed_from_enrollments()
+                with self._cond:
+                    self._reseed(rows)
+        with self._cond:
+            entries = sorted(self._newest.values(), key=lambda entry: entry[:2], reverse=True)
+        return [payload for _, _, payload in entries[:limit]]
+
+
+def _event_kind(session: Session, obj: Enrollment) -> Optional[str]:
+    if obj in session.new:
+        return "created"
+    if obj in session.deleted:
+        return "deleted"
+    if not session.is_modified(obj, include_collections=False):
+        return None
+    status = inspect(obj).attrs.status.history
+    return "dropped" if status.has_changes() and obj.status == "dropped" else "updated"
+
+
+def write_enrollment_events(connection: Connection, kind: str, enrollments: Iterable[Dict[str, Any]]) -> None:
+    """Append outbox rows for enrollments written outside the ORM flush (bulk or Core statements).
+
+    Each item carries the ``Enrollment`` attribute names (``sno``, ``cno``,
+    ``status``, ``grade``, ``enroll_date``).
+    """
+    rows = [
+        {
+            "Kind": kind,
+            "Sno": item["sno"],
+            "Cno": item["cno"],
+            "Status": item.get("status"),
+            "Grade": item.get("grade"),
+            "EnrollDate": item.get("enroll_date"),
+        }
+        for item in enrollments
+    ]
+    if rows:
+        connection.execute(insert(_EVENT_TABLE), rows)
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：在同一事务内把本次 flush 的选课增删改写入发件箱。
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, Enrollment):
+            continue
+        kind = _event_kind(session, obj)
+        if kind is None:
+            continue
+        by_kind.setdefault(kind, []).append(
+            {
+                "sno": obj.sno,
+                "cno": obj.cno,
+                "status": obj.status,
+                "grade": obj.grade,
+                "enroll_date": obj.enroll_date,
+            }
+        )
+    for kind, items in by_kind.items():
+        write_enrollment_events(session.connection(), kind, items)
+
+
+def get_enrollment_feed() -> EnrollmentFeed:
+    return current_app.extensions["enrollment_feed"]
+
+
+def init_enrollment_stream(app: Flask) -> EnrollmentFeed:
+    """Create the application's enrollment feed from ``ENROLLMENT_STREAM_*`` settings.
+
+    Must be called after ``init_change_bus``: the feed refreshes itself when the
+    bus reports changes to ``SC``.
+    """
+    # 功能：按配置创建事件缓冲区并挂到 app.extensions 上，注册发件箱监听并订阅 SC 的变更。
+    feed = EnrollmentFeed(app, capacity=app.config.get("ENROLLMENT_STREAM_BUFFER", 256))
+    app.extensions["enrollment_feed"] = feed
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+    app.extensions["change_bus"].subscribe(lambda _changes: feed.poll(), tables=(Enrollment,))
+    return feed
@@ -0,0 +1,119 @@
+"""Run independent read queries concurrently on separate pooled connections."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from flask import current_app
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from ..extensions import db
+
+QueryFn = Callable[[Session], Any]
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+class FanOutTimeout(TimeoutError):
+    """Raised when a fan-out query does not finish within its timeout."""
+
+
+class _Task:
+    """One query that runs exactly once, on a pool thread or on the calling thread."""
+
+    def __init__(self, fn: QueryFn) -> None:
+        self.fn = fn
+        self.started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self.started_at is not None:
+                return False
+            self.started_at = time.monotonic()
+            return True
+
+
+def scalar_of(stmt: Executable) -> QueryFn:
+    return lambda session: session.scalar(stmt)
+
+
+def scalars_of(stmt: Executable) -> QueryFn:
+    return lambda session: session.execute(stmt).scalars().all()
+
+
+def rows_of(stmt: Executable) -> QueryFn:
+    return lambda session: session.execute(stmt).all()
+
+
+def _executor(workers: int) -> ThreadPoolExecutor:
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="query-fanout"
+            )
+        return executor
+
+
+def _supports_concurrency() -> bool:
+    # 内存 SQLite 每个连接都是独立的库，无法分发到其他连接
+    url = db.engine.url
+    return url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:")
+
+
+def fan_out(queries: Mapping[str, QueryFn], *, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run ``queries`` concurrently and return their results under the same names.
+
+    Queries are offered to a bounded shared pool, where each runs inside its
+    own app context, hence its own session and pooled connection. The calling
+    thread meanwhile runs every query no pool thread has picked up yet, so a
+    busy pool degrades to running inline instead of queueing. ``timeout``
+    (default ``FANOUT_TIMEOUT``) counts from the moment a pool thread starts a
+    query, not from submission; when it expires :class:`FanOutTimeout` is
+    raised. A timed-out query is not cancelled: it keeps its thread and
+    connection until it finishes on its own. The first query error is
+    re-raised as is. Queries must be read-only and must not call ``fan_out``
+    themselves.
+    """
+    # 功能：将互不依赖的统计查询分发到线程池并行执行，线程池忙时由请求线程就地执行，整体耗时约等于最慢的一条。
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    workers = app.config.get("FANOUT_MAX_WORKERS", 4)
+    if workers <= 1 or len(queries) <= 1 or not _supports_concurrency():
+        return {name: fn(db.session) for name, fn in queries.items()}
+
+    def run(task: _Task) -> Any:
+        if not task.claim():
+            return None
+        with app.app_context():
+            return task.fn(db.session)
+
+    executor = _executor(workers)
+    tasks = {name: _Task(fn) for name, fn in queries.items()}
+    futures: Dict[str, Future] = {name: executor.submit(run, task) for name, task in tasks.items()}
+    results: Dict[str, Any] = {}
+    # 尚未被线程池取走的查询由当前线程认领执行，排队时间不计入超时
+    for name, task in tasks.items():
+        if task.claim():
+            futures[name].cancel()
+            results[name] = task.fn(db.session)
+
+    limit = app.config.get("FANOUT_TIMEOUT", 10.0) if timeout is None else timeout
+    late: List[str] = []
+    for name, future in futures.items():
+        if name in results:
+            continue
+        remaining = tasks[name].started_at + limit - time.monotonic()
+        try:
+            results[name] = future.result(timeout=max(remaining, 0))
+        except FutureTimeout:
+            late.append(name)
+    if late:
+        raise FanOutTimeout(f"Queries did not finish within {limit}s: {', '.join(sorted(late))}")
+    return {name: results[name] for name in queries}
@@ -0,0 +1,402 @@
+"""Registration rounds: ranked course requests allocated by lottery in one batch.
+
+During a round students submit up to ``LOTTERY_MAX_REQUESTS`` ranked course
+requests for one ``(YearTaken, Term)``. When the round closes,
+:func:`allocate_round` assigns seats across every requested offering at once:
+
+* students are ordered by ``EnrollYear`` (earlier years first) and, within a
+  year, by a lottery drawn from the round's stored seed, so rerunning the
+  allocation on the same data gives the same result;
+* seats are handed out in passes over the ranks (every student's first choice,
+  then every student's second choice, ...) up to ``MaxCourses`` per student;
+* prerequisites and existing ``SC`` rows are checked for all requests with one
+  query each, and the work itself runs on flat ``array`` buffers indexed by
+  student and offering, with no queries inside the loop;
+* timetable clashes follow the same per-section rule as direct enrollment
+  (:func:`~.timetable.check_timetable`), against the courses the student
+  already holds in the term plus those assigned earlier in the run;
+* enrollments and one result row per student (a string with one outcome
+  code per request) are written with multi-row inserts and the seat counters
+  are claimed in the same transaction, together with the enrollment events
+  and operation log entries the ORM flush would have produced.
+
+Before reading anything the round is claimed by a conditional ``UPDATE`` from
+``open`` to ``allocating``, so of two concurrent allocations (API and CLI)
+exactly one proceeds. A failed allocation puts the round back to ``open``.
+"""
+
+from __future__ import annotations
+
+import random
+import secrets
+from array import array
+from collections import Counter
+from itertools import groupby
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import (
+    AllocationResult,
+    Course,
+    CourseRequest,
+    Enrollment,
+    RegistrationRound,
+    Student,
+)
+from .audit_log import record_on_commit
+from .enrollment_stream import write_enrollment_events
+from .seats import SEAT_HOLDING_STATUSES, remaining_seats, take_seats
+from .table_versions import bump_table_versions
+from .timetable import Section, clashes_with, section_masks
+from .workload import adjust_enrolled
+
+OUTCOMES = ("pending", "assigned", "full", "prerequisite", "exists", "limit", "not_offered", "clash")
+_PENDING, _ASSIGNED, _FULL, _PREREQUISITE, _EXISTS, _LIMIT, _NOT_OFFERED, _CLASH = range(len(OUTCOMES))
+# AllocationResult.Outcomes 中每条志愿结果的单字符编码；新结果只追加，已存的结果字符串含义不变
+OUTCOME_CODES = "-AFPELNC"
+_CODE_TABLE = OUTCOME_CODES.encode("ascii").ljust(256, b"?")
+
+
+_ROUND_TABLE = RegistrationRound.__table__
+
+
+class RoundClosedError(Exception):
+    """Raised when requests are changed or allocated after a round was allocated."""
+
+
+def _set_round_status(round_id: int, current: str, new: str) -> bool:
+    # 功能：条件更新轮次状态并立即提交，返回本次调用是否完成了状态转换。
+    claimed = db.session.execute(
+        update(_ROUND_TABLE)
+        .where(_ROUND_TABLE.c.RoundID == round_id, _ROUND_TABLE.c.Status == current)
+        .values(Status=new)
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+
+def create_round(
+    year: int, term: str, *, seed: Optional[int] = None, max_courses: int = 5
+) -> RegistrationRound:
+    # 功能：开启新的抽签轮次；未指定种子时随机生成并保存，便于复现分配结果。
+    registration_round = RegistrationRound(
+        year_taken=year,
+        term=term,
+        seed=secrets.randbits(62) if seed is None else seed,
+        max_courses=max_courses,
+        status="open",
+    )
+    db.session.add(registration_round)
+    db.session.commit()
+    return registration_round
+
+
+def submit_requests(registration_round: RegistrationRound, sno: str, cnos: Sequence[str]) -> None:
+    """Replace ``sno``'s ranked requests in an open round (first course = rank 1)."""
+    # 功能：整体替换学生在本轮的志愿列表，按提交顺序编号。
+    if registration_round.status != "open":
+        raise RoundClosedError(f"Round {registration_round.round_id} is no longer open")
+    db.session.execute(
+        delete(CourseRequest).where(
+            CourseRequest.round_id == registration_round.round_id, CourseRequest.sno == sno
+        )
+    )
+    db.session.add_all(
+        CourseRequest(round_id=registration_round.round_id, sno=sno, rank=rank, cno=cno)
+        for rank, cno in enumerate(cnos, start=1)
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise
+
+
+def student_requests(round_id: int, sno: str) -> List[Dict[str, Any]]:
+    # 功能：返回学生在本轮的志愿及（分配后的）结果。
+    codes = db.session.scalar(
+        select(AllocationResult.outcomes).where(
+            AllocationResult.round_id == round_id, AllocationResult.sno == sno
+        )
+    ) or ""
+    rows = db.session.execute(
+        select(CourseRequest.rank, CourseRequest.cno, Course.cname)
+        .join(Course, Course.cno == CourseRequest.cno)
+        .where(CourseRequest.round_id == round_id, CourseRequest.sno == sno)
+        .order_by(CourseRequest.rank)
+    ).all()
+    return [
+        {
+            "rank": rank,
+            "course_id": cno,
+            "course_name": cname,
+            "outcome": OUTCOMES[OUTCOME_CODES.index(codes[pos])] if pos < len(codes) else None,
+        }
+        for pos, (rank, cno, cname) in enumerate(rows)
+    ]
+
+
+def round_summary(registration_round: RegistrationRound) -> Dict[str, Any]:
+    round_id = registration_round.round_id
+    requests, students = db.session.execute(
+        select(func.count(), func.count(func.distinct(CourseRequest.sno))).where(
+            CourseRequest.round_id == round_id
+        )
+    ).one()
+    assigned, students_assigned = db.session.execute(
+        select(
+            func.coalesce(func.sum(AllocationResult.assigned), 0),
+            func.count().filter(AllocationResult.assigned > 0),
+        ).where(AllocationResult.round_id == round_id)
+    ).one()
+    return {
+        "round_id": round_id,
+        "year": registration_round.year_taken,
+        "term": registration_round.term,
+        "seed": registration_round.seed,
+        "max_courses": registration_round.max_courses,
+        "status": registration_round.status,
+        "created_at": registration_round.created_at.isoformat() if registration_round.created_at else None,
+        "allocated_at": (
+            registration_round.allocated_at.isoformat() if registration_round.allocated_at else None
+        ),
+        "requests": int(requests or 0),
+        "students": int(students or 0),
+        "assigned": int(assigned or 0),
+        "students_assigned": int(students_assigned or 0),
+    }
+
+
+def allocate_round(round_id: int, *, dry_run: bool = False) -> Dict[str, Any]:
+    """Allocate every request of an open round; return outcome counts per kind.
+
+    With ``dry_run`` the allocation is computed and reported but nothing is
+    written. Raises :class:`RoundClosedError` when the round is not open,
+    including while another call is allocating it, and ``OfferingFullError``
+    (rolling everything back and reopening the round) if direct enrollments
+    took seats while the allocation was running.
+    """
+    # 功能：先以条件更新认领轮次，再一次性读入本轮所有申请与各开课剩余名额，在内存数组上按优先级逐志愿分配后批量写回。
+    registration_round = db.session.get(RegistrationRound, round_id)
+    if registration_round is None:
+        raise LookupError(f"Registration round {round_id} not found")
+    if dry_run:
+        if registration_round.status != "open":
+            raise RoundClosedError(f"Round {round_id} is no longer open")
+    elif not _set_round_status(round_id, "open", "allocating"):
+        raise RoundClosedError(f"Round {round_id} is already allocated or being allocated")
+    try:
+        return _allocate(registration_round, dry_run=dry_run)
+    except Exception:
+        db.session.rollback()
+        if not dry_run:
+            _set_round_status(round_id, "allocating", "open")
+        raise
+
+
+def _allocate(registration_round: RegistrationRound, *, dry_run: bool) -> Dict[str, Any]:
+    round_id = registration_round.round_id
+    year, term = registration_round.year_taken, registration_round.term
+    in_round = select(CourseRequest.sno).where(CourseRequest.round_id == round_id)
+
+    # 百万级申请行直接在连接上执行 Core 查询，省去 ORM 结果加载的开销
+    connection = db.session.connection()
+    request_table = CourseRequest.__table__
+    rows = connection.execute(
+        select(request_table.c.Sno, request_table.c.Cno)
+        .where(request_table.c.RoundID == round_id)
+        .order_by(request_table.c.Sno, request_table.c.ChoiceRank)
+    ).all()
+
+    # 学生、课程编号化：请求按学生连续存放，starts[i]..starts[i+1] 为第 i 个学生的志愿
+    request_snos, request_cnos = zip(*rows) if rows else ((), ())
+    del rows
+    courses: List[str] = sorted(set(request_cnos))
+    course_index = {cno: index for index, cno in enumerate(courses)}
+    request_course = array("l", map(course_index.__getitem__, request_cnos))
+    students: List[str] = []
+    starts = array("l")
+    total = 0
+    for sno, group in groupby(request_snos):
+        students.append(sno)
+        starts.append(total)
+        total += sum(1 for _ in group)
+    starts.append(total)
+    outcome = bytearray(total)
+
+    # 各开课剩余名额；没有授课安排的开课视为本学期未开设
+    capacity = array("l", [0] * len(courses))
+    offered = array("b", bytes(len(courses)))
+    for item in remaining_seats([(cno, year, term) for cno in courses]):
+        if item["capacity"] is None:
+            continue
+        index = course_index[item["course_id"]]
+        offered[index] = 1
+        capacity[index] = item["remaining"]
+
+    # 一次查询取回全部先修课达标记录与已有选课记录
+    prerequisite_of: Dict[str, str] = {}
+    passed: Set[Tuple[str, str]] = set()
+    existing: Set[Tuple[str, str]] = set()
+    if courses:
+        prerequisite_of = dict(
+            db.session.execute(
+                select(Course.cno, Course.prereq_cno).where(
+                    Course.cno.in_(courses), Course.prereq_cno.is_not(None)
+                )
+            ).all()
+        )
+        existing = set(
+            db.session.execute(
+                select(Enrollment.sno, Enrollment.cno).where(
+                    Enrollment.sno.in_(in_round), Enrollment.cno.in_(courses)
+                )
+            ).all()
+        )
+    if prerequisite_of:
+        passed = set(
+            db.session.execute(
+                select(Enrollment.sno, Enrollment.cno).where(
+                    Enrollment.sno.in_(in_round),
+                    Enrollment.cno.in_(sorted(set(prerequisite_of.values()))),
+                    Enrollment.status == "completed",
+                    Enrollment.grade.is_not(None),
+                    Enrollment.grade >= Decimal("60"),
+                )
+            ).all()
+        )
+    # 本学期已占名额的课程按学生载入课表；分配成功的课程随后追加，循环内只做位运算
+    sections = section_masks(year, term)
+    course_sections: List[List[Section]] = [sections.get(cno, []) for cno in courses]
+    timetable: Dict[str, List[List[Section]]] = {}
+    for sno, cno in db.session.execute(
+        select(Enrollment.sno, Enrollment.cno).where(
+            Enrollment.sno.in_(in_round),
+            Enrollment.year_taken == year,
+            Enrollment.term == term,
+            Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+        )
+    ):
+        timetable.setdefault(sno, []).append(sections.get(cno, []))
+    enroll_year = dict(
+        db.session.execute(
+            select(Student.sno, Student.enroll_year).where(Student.sno.in_(in_round))
+        ).all()
+    )
+
+    # 先修课达标与已有选课按课程编号转换为学生下标集合，循环内只做数组下标与整数集合查找
+    student_index = {sno: i for i, sno in enumerate(students)}
+    passed_by_prerequisite: Dict[str, Set[int]] = {}
+    for sno, cno in passed:
+        passed_by_prerequisite.setdefault(cno, set()).add(student_index[sno])
+    qualified: List[Optional[Set[int]]] = [
+        passed_by_prerequisite.get(prerequisite_of[cno], set()) if cno in prerequisite_of else None
+        for cno in courses
+    ]
+    taken_before: List[Set[int]] = [set() for _ in courses]
+    for sno, cno in existing:
+        taken_before[course_index[cno]].add(student_index[sno])
+
+    # 入学年份早者优先，同年按本轮种子抽签；学生按学号有序，保证同一种子结果可复现
+    rng = random.Random(registration_round.seed)
+    lottery = [rng.random() for _ in students]
+    order = sorted(
+        range(len(students)), key=lambda i: (enroll_year.get(students[i], 9999), lottery[i])
+    )
+
+    # 逐志愿轮次：先满足所有人的第一志愿，再第二志愿……每条申请恰好处理一次
+    max_ranks = max((starts[i + 1] - starts[i] for i in range(len(students))), default=0)
+    load = array("l", [0] * len(students))
+    max_courses = registration_round.max_courses
+    for choice in range(max_ranks):
+        for i in order:
+            pos = starts[i] + choice
+            if pos >= starts[i + 1]:
+                continue
+            course = request_course[pos]
+            if not offered[course]:
+                outcome[pos] = _NOT_OFFERED
+            elif i in taken_before[course]:
+                outcome[pos] = _EXISTS
+            elif qualified[course] is not None and i not in qualified[course]:
+                outcome[pos] = _PREREQUISITE
+            elif load[i] >= max_courses:
+                outcome[pos] = _LIMIT
+            elif students[i] in timetable and clashes_with(course_sections[course], timetable[students[i]]):
+                outcome[pos] = _CLASH
+            elif capacity[course] > 0:
+                capacity[course] -= 1
+                load[i] += 1
+                outcome[pos] = _ASSIGNED
+                if course_sections[course]:
+                    timetable.setdefault(students[i], []).append(course_sections[course])
+            else:
+                outcome[pos] = _FULL
+
+    report: Dict[str, Any] = {
+        "round_id": round_id,
+        "students": len(students),
+        "requests": total,
+        "outcomes": {name: outcome.count(code) for code, name in enumerate(OUTCOMES) if code},
+    }
+    if dry_run:
+        return report
+
+    now = datetime.utcnow()
+    assigned: Counter[str] = Counter()
+    enrollments: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    # 结果编码成每名学生一行（志愿顺序的结果字符串），行数为学生数而非申请数
+    codes = outcome.translate(_CODE_TABLE).decode("ascii")
+    for i, sno in enumerate(students):
+        begin, end = starts[i], starts[i + 1]
+        count = 0
+        for pos in range(begin, end):
+            if outcome[pos] == _ASSIGNED:
+                cno = courses[request_course[pos]]
+                assigned[cno] += 1
+                count += 1
+                enrollments.append(
+                    {
+                        "sno": sno,
+                        "cno": cno,
+                        "year_taken": year,
+                        "term": term,
+                        "status": "enrolled",
+                        "enroll_date": now,
+                        "updated_at": now,
+                    }
+                )
+        results.append(
+            {"RoundID": round_id, "Sno": sno, "Outcomes": codes[begin:end], "Assigned": count}
+        )
+
+    # 选课记录走 ORM 批量 INSERT（单条语句由 SQLAlchemy 拆成多行 INSERT 分页执行），
+    # 表版本与变更发件箱各只记一次整表变更
+    if enrollments:
+        db.session.execute(insert(Enrollment), enrollments)
+        # 批量 INSERT 不经过 flush 监听：选课事件发件箱与操作日志逐条补记，SSE 与热力图才能看到抽签选课
+        write_enrollment_events(connection, "created", enrollments)
+        record_on_commit(
+            db.session,
+            Enrollment.__tablename__,
+            "create",
+            ((item["sno"], item["cno"]) for item in enrollments),
+        )
+    for cno, count in sorted(assigned.items()):
+        take_seats(connection, (cno, year, term), count)
+        # 教师工作量的选课人数同样需要同步增量
+        adjust_enrolled(connection, (cno, year, term), count)
+    result_table = AllocationResult.__table__
+    if results:
+        connection.execute(insert(result_table), results)
+        bump_table_versions(db.session, [result_table.name])
+    registration_round.status = "allocated"
+    registration_round.allocated_at = now
+    db.session.commit()
+    return report
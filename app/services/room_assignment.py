@@ -0,0 +1,211 @@
+"""Automatic classroom assignment for the unassigned teachings of a term.
+
+Every ``Teaching`` of the term with ``RoomID`` NULL and both dates set is a
+candidate. Candidates are placed largest first into the smallest classroom
+that fits (``Classroom.Capacity >= Teaching.Capacity``) and is free on the
+teaching's dates. Classrooms are grouped into buckets by capacity, so the
+smallest fitting bucket is one bisect away. Room bookings use the same
+per-room :class:`~.room_bookings.RoomSchedule` as the write path. A room is
+therefore "free" under exactly the overlap rule that ``create_teaching`` and
+``update_teaching`` enforce.
+
+The optional improvement pass retries each teaching the greedy pass could not
+place. For every fitting room it looks at the teachings placed in this run
+that block it. If all of them can move to another free room, they are moved
+and the teaching takes the room they vacated. Bookings that existed before
+the run are never moved.
+
+All assignments are written with one executemany ``UPDATE`` keyed by
+``TeachID``. Before that write, each target classroom is locked and
+re-checked against the database (see
+:func:`~.room_bookings.locked_room_conflicts`); a placement that collides with
+a booking committed since the plan was loaded is dropped and reported as
+having no free room.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+
+from ..extensions import db
+from ..models import Classroom, Teaching
+from .room_bookings import RoomSchedule, locked_room_conflicts
+
+# (授课编号, 容量, 开始日期, 结束日期)
+Candidate = Tuple[int, int, date, date]
+
+
+class _Rooms:
+    """Classrooms bucketed by capacity together with their booking schedules."""
+
+    def __init__(self, classrooms: List[Tuple[str, int]]) -> None:
+        buckets: Dict[int, List[str]] = {}
+        for room_id, capacity in classrooms:
+            buckets.setdefault(int(capacity), []).append(room_id)
+        self.capacities = sorted(buckets)
+        self.buckets = [sorted(buckets[capacity]) for capacity in self.capacities]
+        self.capacity_of = {room_id: int(capacity) for room_id, capacity in classrooms}
+        self.schedules: Dict[str, RoomSchedule] = {room_id: RoomSchedule() for room_id, _ in classrooms}
+
+    def fitting(self, capacity: int):
+        """Rooms that can seat ``capacity``, smallest bucket first."""
+        for index in range(bisect_left(self.capacities, capacity), len(self.capacities)):
+            yield from self.buckets[index]
+
+    def is_free(self, room_id: str, start: date, end: date) -> bool:
+        return not self.schedules[room_id].between(start, end)
+
+    def find(self, capacity: int, start: date, end: date, *, skip: Optional[str] = None) -> Optional[str]:
+        for room_id in self.fitting(capacity):
+            if room_id != skip and self.is_free(room_id, start, end):
+                return room_id
+        return None
+
+
+def _load(year: int, term: str) -> Tuple[_Rooms, List[Candidate], int]:
+    rooms = _Rooms(db.session.execute(select(Classroom.room_id, Classroom.capacity)).all())
+    # 已有预订按日期占用教室，与学年学期无关，全部载入
+    for teach_id, room_id, start, end in db.session.execute(
+        select(Teaching.teach_id, Teaching.room_id, Teaching.start_date, Teaching.end_date).where(
+            Teaching.room_id.is_not(None),
+            Teaching.start_date.is_not(None),
+            Teaching.end_date.is_not(None),
+        )
+    ):
+        schedule = rooms.schedules.get(room_id)
+        if schedule is not None:
+            schedule.add((start, int(teach_id), end))
+    candidates: List[Candidate] = []
+    undated = 0
+    for teach_id, capacity, start, end in db.session.execute(
+        select(Teaching.teach_id, Teaching.capacity, Teaching.start_date, Teaching.end_date).where(
+            Teaching.year_offered == year,
+            Teaching.term == term,
+            Teaching.room_id.is_(None),
+        )
+    ):
+        if start is None or end is None or end < start:
+            undated += 1
+            continue
+        candidates.append((int(teach_id), int(capacity), start, end))
+    # 容量大、周期长的授课可选教室最少，优先安排
+    candidates.sort(key=lambda item: (-item[1], item[2] - item[3], item[0]))
+    return rooms, candidates, undated
+
+
+def _relocate(
+    rooms: _Rooms,
+    candidate: Candidate,
+    placed: Dict[int, str],
+    by_id: Dict[int, Candidate],
+    stuck: Set[int],
+) -> Optional[List[Tuple[int, str]]]:
+    """Moves (teach_id, new room) that free a fitting room for ``candidate``, ending with it.
+
+    ``stuck`` holds teachings known to have no other free room; the caller
+    clears it whenever a relocation changes the bookings.
+    """
+    teach_id, capacity, start, end = candidate
+    for room_id in rooms.fitting(capacity):
+        blockers = [booking[1] for booking in rooms.schedules[room_id].between(start, end)]
+        if not blockers or any(blocker not in placed or blocker in stuck for blocker in blockers):
+            continue
+        moves: List[Tuple[int, str]] = []
+        for blocker in blockers:
+            _, blocker_capacity, blocker_start, blocker_end = by_id[blocker]
+            target = rooms.find(blocker_capacity, blocker_start, blocker_end, skip=room_id)
+            if target is None:
+                if not moves:
+                    # 没有暂占其他教室时的失败在预订变化前一直成立，记下以免重复搜索
+                    stuck.add(blocker)
+                break
+            # 暂时占住目标教室，避免多个被挤出的授课挪到同一间
+            rooms.schedules[target].add((blocker_start, blocker, blocker_end))
+            moves.append((blocker, target))
+        if len(moves) == len(blockers):
+            for blocker, target in moves:
+                _, _, blocker_start, blocker_end = by_id[blocker]
+                rooms.schedules[room_id].remove((blocker_start, blocker, blocker_end))
+            return moves + [(teach_id, room_id)]
+        for blocker, target in moves:
+            _, _, blocker_start, blocker_end = by_id[blocker]
+            rooms.schedules[target].remove((blocker_start, blocker, blocker_end))
+    return None
+
+
+def assign_rooms(year: int, term: str, *, improve: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """Assign classrooms to the term's unassigned teachings and report the outcome."""
+    # 功能：按容量分桶贪心选择最小可容纳且日期不冲突的教室，可选局部搜索补排，最后一次批量写回。
+    rooms, candidates, undated = _load(year, term)
+    by_id = {candidate[0]: candidate for candidate in candidates}
+    placed: Dict[int, str] = {}
+    unplaced: List[Candidate] = []
+    for candidate in candidates:
+        teach_id, capacity, start, end = candidate
+        room_id = rooms.find(capacity, start, end)
+        if room_id is None:
+            unplaced.append(candidate)
+            continue
+        rooms.schedules[room_id].add((start, teach_id, end))
+        placed[teach_id] = room_id
+
+    relocated = 0
+    if improve and unplaced:
+        remaining: List[Candidate] = []
+        stuck: Set[int] = set()
+        for candidate in unplaced:
+            moves = _relocate(rooms, candidate, placed, by_id, stuck)
+            if moves is None:
+                remaining.append(candidate)
+                continue
+            stuck.clear()
+            for teach_id, room_id in moves:
+                _, _, start, end = by_id[teach_id]
+                if teach_id == candidate[0]:
+                    rooms.schedules[room_id].add((start, teach_id, end))
+                placed[teach_id] = room_id
+            relocated += len(moves) - 1
+        unplaced = remaining
+
+    if placed and not dry_run:
+        # 规划期间其他请求可能已订下教室：按教室顺序加锁复核，冲突的安排放弃本次分配
+        for teach_id, room_id in sorted(placed.items(), key=lambda item: (item[1], item[0])):
+            _, _, start, end = by_id[teach_id]
+            if locked_room_conflicts(db.session, room_id, start, end, exclude=teach_id):
+                del placed[teach_id]
+                unplaced.append(by_id[teach_id])
+
+    largest = rooms.capacities[-1] if rooms.capacities else 0
+    too_large = sum(1 for candidate in unplaced if candidate[1] > largest)
+    wasted = sum(rooms.capacity_of[room_id] - by_id[teach_id][1] for teach_id, room_id in placed.items())
+    if not dry_run:
+        if placed:
+            db.session.execute(
+                update(Teaching),
+                [{"teach_id": teach_id, "room_id": room_id} for teach_id, room_id in sorted(placed.items())],
+            )
+        # 即使复核后没有可写的安排也要提交，释放教室行锁
+        db.session.commit()
+    return {
+        "year": year,
+        "term": term,
+        "candidates": len(candidates),
+        "assigned": len(placed),
+        "relocated": relocated,
+        "unassigned": {
+            "no_dates": undated,
+            "too_large": too_large,
+            "no_free_room": len(unplaced) - too_large,
+        },
+        "unplaced_teach_ids": sorted(candidate[0] for candidate in unplaced),
+        "wasted_seats": wasted,
+        "assignments": [
+            {"teach_id": teach_id, "room_id": room_id, "capacity": by_id[teach_id][1]}
+            for teach_id, room_id in sorted(placed.items())
+        ],
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,355 @@
+"""Per-room interval index of ``Teaching`` bookings.
+
+A teaching books its classroom for ``StartDate``–``EndDate`` (both inclusive).
+Each worker keeps, per room, the bookings sorted by start date together with
+the running maximum of the end dates. Because that running maximum never
+decreases, both "which bookings overlap ``[start, end]``" and "which bookings
+fall inside a window" are two binary searches plus the matches themselves, so
+the write path can reject most double bookings without touching the database.
+
+The index is only a pre-check: it can miss a booking committed by another
+worker that the change bus has not delivered yet, or one committed between the
+check and the write. The database has the final word. Before every flush that
+adds or moves a dated, roomed ``Teaching``, the classroom row is locked with
+``SELECT ... FOR UPDATE`` and the room's overlapping teachings are read with a
+range query inside the same transaction, so two concurrent writers cannot
+both book the room; the second waits for the first to commit and then sees
+its row. A conflict found there raises :class:`RoomConflictError` out of the
+flush or commit.
+
+The index is loaded lazily from ``Teaching``. Commits in this process update
+it directly from the flushed objects; commits in other workers arrive through
+the change bus. Teachings without a room or without both dates are not
+indexed, since they do not occupy a known date range.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Classroom, Teaching
+from .change_bus import Change
+
+# (开始日期, 授课编号, 结束日期)；按开始日期排序，授课编号保证同日开始时顺序稳定
+Booking = Tuple[date, int, date]
+_PENDING_KEY = "_room_booking_pending"
+
+
+class RoomConflictError(Exception):
+    """Raised when a teaching would book a room already taken on overlapping dates."""
+
+    def __init__(self, room_id: str, conflicts: List[Dict[str, Any]]) -> None:
+        self.room_id = room_id
+        self.conflicts = conflicts
+        ids = ", ".join(str(item["teach_id"]) for item in conflicts)
+        super().__init__(f"Classroom {room_id} is already booked by teaching {ids}")
+
+
+def _serialize_booking(booking: Booking) -> Dict[str, Any]:
+    start, teach_id, end = booking
+    return {"teach_id": teach_id, "start_date": start.isoformat(), "end_date": end.isoformat()}
+
+
+class RoomSchedule:
+    """Bookings of one room sorted by start date with a prefix maximum of end dates."""
+
+    def __init__(self) -> None:
+        self.bookings: List[Booking] = []
+        self.starts: List[date] = []
+        self.max_end: List[date] = []
+
+    def _rebuild_from(self, index: int) -> None:
+        # 插入/删除位置之后的前缀最大值需要重算，之前的不受影响
+        del self.max_end[index:]
+        running = self.max_end[-1] if self.max_end else None
+        for _, _, end in self.bookings[index:]:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+    def add(self, booking: Booking) -> None:
+        insort(self.bookings, booking)
+        index = bisect_left(self.bookings, booking)
+        self.starts.insert(index, booking[0])
+        self._rebuild_from(index)
+
+    def remove(self, booking: Booking) -> None:
+        index = bisect_left(self.bookings, booking)
+        if index < len(self.bookings) and self.bookings[index] == booking:
+            del self.bookings[index]
+            del self.starts[index]
+            self._rebuild_from(index)
+
+    def between(self, start: date, end: date) -> List[Booking]:
+        """Bookings that overlap ``[start, end]``, in start order."""
+        # 前缀最大结束日期单调不减：第一个 >= start 的位置之前的预订都在 start 之前结束
+        low = bisect_left(self.max_end, start)
+        high = bisect_right(self.starts, end)
+        return [booking for booking in self.bookings[low:high] if booking[2] >= start]
+
+    def __len__(self) -> int:
+        return len(self.bookings)
+
+
+class RoomBookingIndex:
+    """Per-process map of room id to :class:`RoomSchedule`."""
+
+    def __init__(self, app: Flask) -> None:
+        self._app = app
+        self._rooms: Dict[str, RoomSchedule] = {}
+        self._locations: Dict[int, Tuple[str, Booking]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.reload()
+
+    def reload(self) -> int:
+        """Rebuild the whole index from ``Teaching``; return the number of indexed bookings."""
+        # 功能：一次查询读出全部有教室且起止日期齐全的授课安排，重建各教室的有序区间表。
+        with self._app.app_context():
+            rows = db.session.execute(
+                select(Teaching.teach_id, Teaching.room_id, Teaching.start_date, Teaching.end_date).where(
+                    Teaching.room_id.is_not(None),
+                    Teaching.start_date.is_not(None),
+                    Teaching.end_date.is_not(None),
+                )
+            ).all()
+        grouped: Dict[str, List[Booking]] = {}
+        locations: Dict[int, Tuple[str, Booking]] = {}
+        for teach_id, room_id, start, end in rows:
+            booking = (start, int(teach_id), end)
+            grouped.setdefault(room_id, []).append(booking)
+            locations[int(teach_id)] = (room_id, booking)
+        rooms: Dict[str, RoomSchedule] = {}
+        for room_id, bookings in grouped.items():
+            schedule = RoomSchedule()
+            schedule.bookings = sorted(bookings)
+            schedule.starts = [booking[0] for booking in schedule.bookings]
+            schedule._rebuild_from(0)
+            rooms[room_id] = schedule
+        with self._lock:
+            self._rooms = rooms
+            self._locations = locations
+            self._loaded = True
+        return len(locations)
+
+    def apply(self, updates: Iterable[Tuple[int, Optional[str], Optional[date], Optional[date]]]) -> None:
+        """Move, add or drop bookings; ``(teach_id, None, None, None)`` removes one."""
+        with self._lock:
+            if not self._loaded:
+                # 尚未加载时不维护增量，首次查询会整表读取
+                return
+            for teach_id, room_id, start, end in updates:
+                previous = self._locations.pop(teach_id, None)
+                if previous is not None:
+                    schedule = self._rooms.get(previous[0])
+                    if schedule is not None:
+                        schedule.remove(previous[1])
+                if room_id is None or start is None or end is None:
+                    continue
+                booking = (start, teach_id, end)
+                self._rooms.setdefault(room_id, RoomSchedule()).add(booking)
+                self._locations[teach_id] = (room_id, booking)
+
+    def refresh(self, teach_ids: Iterable[int]) -> None:
+        """Re-read the given teachings from the database."""
+        ids = sorted(set(teach_ids))
+        if not ids or not self._loaded:
+            return
+        with self._app.app_context():
+            rows = {
+                int(row[0]): row
+                for row in db.session.execute(
+                    select(Teaching.teach_id, Teaching.room_id, Teaching.start_date, Teaching.end_date).where(
+                        Teaching.teach_id.in_(ids)
+                    )
+                )
+            }
+        self.apply(
+            (teach_id, *rows[teach_id][1:]) if teach_id in rows else (teach_id, None, None, None)
+            for teach_id in ids
+        )
+
+    def on_changes(self, changes: List[Change]) -> None:
+        # 功能：其他 worker 提交的授课变更经变更总线到达；无主键的批量变更整表重建。
+        if any(change.key is None for change in changes):
+            with self._lock:
+                self._loaded = False
+            return
+        ids = []
+        for change in changes:
+            try:
+                ids.append(int(change.key))
+            except (TypeError, ValueError):
+                continue
+        self.refresh(ids)
+
+    def conflicts(
+        self,
+        room_id: str,
+        start: date,
+        end: date,
+        *,
+        exclude: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Bookings of ``room_id`` overlapping ``[start, end]``, skipping teaching ``exclude``."""
+        self._ensure_loaded()
+        with self._lock:
+            schedule = self._rooms.get(room_id)
+            found = schedule.between(start, end) if schedule is not None else []
+        return [_serialize_booking(booking) for booking in found if booking[1] != exclude]
+
+    def availability(self, room_id: str, start: date, end: date) -> Dict[str, Any]:
+        """Booked ranges and free windows of ``room_id`` within ``[start, end]``."""
+        # 功能：取出与查询窗口相交的预订，按开始日期合并后输出其间的空闲日期段。
+        self._ensure_loaded()
+        with self._lock:
+            schedule = self._rooms.get(room_id)
+            booked = schedule.between(start, end) if schedule is not None else []
+        free: List[Dict[str, str]] = []
+        cursor = start
+        for booking_start, _, booking_end in booked:
+            if booking_start > cursor:
+                free.append({"start": cursor.isoformat(), "end": (booking_start - timedelta(days=1)).isoformat()})
+            if booking_end >= cursor:
+                cursor = booking_end + timedelta(days=1)
+            if cursor > end:
+                break
+        if cursor <= end:
+            free.append({"start": cursor.isoformat(), "end": end.isoformat()})
+        return {
+            "room_id": room_id,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "booked": [_serialize_booking(booking) for booking in booked],
+            "free": free,
+        }
+
+
+def get_room_booking_index() -> RoomBookingIndex:
+    return current_app.extensions["room_booking_index"]
+
+
+def check_room_booking(
+    room_id: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+    *,
+    exclude: Optional[int] = None,
+) -> None:
+    """Raise :class:`RoomConflictError` if the index shows the booking overlapping another teaching.
+
+    This is the cheap pre-check for request validation; the locked re-check at
+    flush time is what actually prevents double bookings.
+    """
+    if not room_id or start is None or end is None:
+        return
+    conflicts = get_room_booking_index().conflicts(room_id, start, end, exclude=exclude)
+    if conflicts:
+        raise RoomConflictError(room_id, conflicts)
+
+
+def locked_room_conflicts(
+    session: Session,
+    room_id: str,
+    start: date,
+    end: date,
+    *,
+    exclude: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Lock ``room_id`` for the rest of the transaction and return its overlapping bookings.
+
+    The classroom row is read ``FOR UPDATE`` first, so concurrent writers to the
+    same room are serialized. The bookings are read with a locking read as well,
+    which sees rows committed after the transaction's snapshot was taken.
+    """
+    # 功能：锁定教室行后按日期区间查询该教室的授课安排，作为写入前的最终校验。
+    session.execute(select(Classroom.room_id).where(Classroom.room_id == room_id).with_for_update())
+    stmt = select(Teaching.start_date, Teaching.teach_id, Teaching.end_date).where(
+        Teaching.room_id == room_id,
+        Teaching.start_date <= end,
+        Teaching.end_date >= start,
+    )
+    if exclude is not None:
+        stmt = stmt.where(Teaching.teach_id != exclude)
+    # 加锁读取：可重复读隔离级别下普通查询看的是事务开始时的快照，会漏掉刚提交的预订
+    rows = session.execute(
+        stmt.order_by(Teaching.start_date, Teaching.teach_id).with_for_update(read=True)
+    ).all()
+    return [_serialize_booking((row_start, int(teach_id), row_end)) for row_start, teach_id, row_end in rows]
+
+
+def _booking_changed(obj: Teaching) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in ("room_id", "start_date", "end_date"))
+
+
+def _before_flush(session: Session, _flush_context: Any, _instances: Any) -> None:
+    # 功能：flush 前对新增或改动教室/日期的授课安排加锁复核，冲突时抛出 RoomConflictError 中止写入。
+    pending = [
+        obj
+        for obj in session.new.union(session.dirty)
+        if isinstance(obj, Teaching)
+        and obj.room_id
+        and obj.start_date is not None
+        and obj.end_date is not None
+        and (obj in session.new or _booking_changed(obj))
+    ]
+    # 按教室编号顺序加锁，避免并发写入互相等待形成死锁
+    for obj in sorted(pending, key=lambda item: (item.room_id, item.teach_id or 0)):
+        conflicts = locked_room_conflicts(session, obj.room_id, obj.start_date, obj.end_date, exclude=obj.teach_id)
+        if conflicts:
+            raise RoomConflictError(obj.room_id, conflicts)
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：记录本次 flush 中授课安排的教室与日期，提交后直接更新本进程的索引，无需回查数据库。
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.new.union(session.dirty):
+        if isinstance(obj, Teaching) and obj.teach_id is not None:
+            pending[obj.teach_id] = (obj.teach_id, obj.room_id, obj.start_date, obj.end_date)
+    for obj in session.deleted:
+        if isinstance(obj, Teaching) and obj.teach_id is not None:
+            pending[obj.teach_id] = (obj.teach_id, None, None, None)
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and has_app_context():
+        index = current_app.extensions.get("room_booking_index")
+        if index is not None:
+            index.apply(pending.values())
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_room_bookings(app: Flask) -> RoomBookingIndex:
+    """Create the application's room booking index.
+
+    Must be called after ``init_change_bus``: the index follows ``Teaching``
+    changes committed by other workers through the bus.
+    """
+    # 功能：创建教室预订区间索引并挂到 app.extensions 上，注册写入前加锁复核与提交监听，并订阅 Teaching 的变更。
+    index = RoomBookingIndex(app)
+    app.extensions["room_booking_index"] = index
+    for name, listener in (
+        ("before_flush", _before_flush),
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    app.extensions["change_bus"].subscribe(index.on_changes, tables=(Teaching,))
+    return index
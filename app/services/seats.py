@@ -0,0 +1,411 @@
+"""Per-offering seat counters that enforce ``Teaching.Capacity`` on enrollment.
+
+An offering is a course in one ``(YearTaken, Term)``; its capacity is the sum
+of the capacities of its ``Teaching`` rows. Enrollments with status
+``enrolled`` or ``completed`` hold a seat. Every flush that creates, deletes or
+moves a seat-holding ``Enrollment`` adjusts ``OfferingSeat.Taken`` in the same
+transaction with a conditional ``UPDATE ... WHERE Taken + n <= Capacity``, so
+concurrent registrations for a hot course contend on one counter row instead
+of running ``COUNT(*)`` over ``SC``. When the update matches nothing the flush
+raises :class:`OfferingFullError` and the whole transaction rolls back.
+
+Offerings without any ``Teaching`` row have no known capacity and are not
+limited. Counter rows are created lazily on first use and can be rebuilt from
+``SC`` with ``flask reconcile-seats``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, or_, select, tuple_, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Enrollment, OfferingSeat, Teaching
+
+OfferingKey = Tuple[str, int, str]
+
+SEAT_HOLDING_STATUSES = frozenset({"enrolled", "completed"})
+
+_SEAT_TABLE = OfferingSeat.__table__
+# 本事务内释放过名额（或容量变化）的开课，提交后供候补队列递补
+FREED_OFFERINGS_KEY = "_seats_freed_offerings"
+
+
+class OfferingFullError(Exception):
+    """Raised when an enrollment would exceed the offering's capacity."""
+
+    def __init__(self, cno: str, year: int, term: str) -> None:
+        super().__init__(f"No seats left in {cno} ({year} {term})")
+        self.cno = cno
+        self.year = year
+        self.term = term
+
+
+def _key_filter(key: OfferingKey) -> Any:
+    cno, year, term = key
+    return and_(
+        _SEAT_TABLE.c.Cno == cno,
+        _SEAT_TABLE.c.YearTaken == year,
+        _SEAT_TABLE.c.Term == term,
+    )
+
+
+def _teaching_capacity(connection: Connection, key: OfferingKey) -> Optional[int]:
+    cno, year, term = key
+    total = connection.execute(
+        select(func.sum(Teaching.capacity)).where(
+            Teaching.cno == cno, Teaching.year_offered == year, Teaching.term == term
+        )
+    ).scalar()
+    return None if total is None else int(total)
+
+
+def _holding_count(connection: Connection, key: OfferingKey) -> int:
+    cno, year, term = key
+    return int(
+        connection.execute(
+            select(func.count()).select_from(Enrollment).where(
+                Enrollment.cno == cno,
+                Enrollment.year_taken == year,
+                Enrollment.term == term,
+                Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+            )
+        ).scalar()
+        or 0
+    )
+
+
+def take_seats(connection: Connection, key: OfferingKey, count: int = 1) -> None:
+    """Claim ``count`` seats in ``key`` or raise :class:`OfferingFullError`.
+
+    Must run after the enrollment rows are flushed: a missing counter row is
+    initialised from the current ``SC`` count, which already includes them.
+    """
+    # 功能：条件 UPDATE 原子占用名额；计数行不存在时按授课容量与现有选课数初始化。
+    now = datetime.utcnow()
+    claim = (
+        update(_SEAT_TABLE)
+        .where(_key_filter(key), _SEAT_TABLE.c.Taken + count <= _SEAT_TABLE.c.Capacity)
+        .values(Taken=_SEAT_TABLE.c.Taken + count, UpdatedAt=now)
+    )
+    if connection.execute(claim).rowcount:
+        return
+    exists = connection.execute(select(_SEAT_TABLE.c.Taken).where(_key_filter(key))).first()
+    if exists is not None:
+        raise OfferingFullError(*key)
+    capacity = _teaching_capacity(connection, key)
+    if capacity is None:
+        # 没有授课安排的开课不限名额
+        return
+    taken = _holding_count(connection, key)
+    try:
+        with connection.begin_nested():
+            connection.execute(
+                insert(_SEAT_TABLE).values(
+                    Cno=key[0],
+                    YearTaken=key[1],
+                    Term=key[2],
+                    Capacity=capacity,
+                    Taken=taken,
+                    UpdatedAt=now,
+                )
+            )
+    except IntegrityError:
+        # 并发的首个选课已建好计数行（其计数可能未包含本事务的写入），改为条件递增
+        if not connection.execute(claim).rowcount:
+            raise OfferingFullError(*key) from None
+        return
+    if taken > capacity:
+        raise OfferingFullError(*key)
+
+
+def release_seats(connection: Connection, key: OfferingKey, count: int = 1) -> None:
+    """Return ``count`` seats to ``key``; a missing counter row is left to lazy init."""
+    connection.execute(
+        update(_SEAT_TABLE)
+        .where(_key_filter(key))
+        .values(
+            Taken=case(
+                (_SEAT_TABLE.c.Taken >= count, _SEAT_TABLE.c.Taken - count),
+                else_=0,
+            ),
+            UpdatedAt=datetime.utcnow(),
+        )
+    )
+
+
+def sync_capacity(connection: Connection, key: OfferingKey) -> None:
+    """Recompute ``Capacity`` of ``key`` after its ``Teaching`` rows changed."""
+    capacity = _teaching_capacity(connection, key)
+    if capacity is None:
+        connection.execute(delete(_SEAT_TABLE).where(_key_filter(key)))
+        return
+    connection.execute(
+        update(_SEAT_TABLE)
+        .where(_key_filter(key))
+        .values(Capacity=capacity, UpdatedAt=datetime.utcnow())
+    )
+
+
+def _committed(obj: Any, attr: str) -> Any:
+    # 取 flush 前数据库中的旧值：修改过的属性看历史记录，未修改的直接读取
+    history = db.inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _enrollment_seat(obj: Enrollment, *, committed: bool) -> Optional[OfferingKey]:
+    read = (lambda attr: _committed(obj, attr)) if committed else (lambda attr: getattr(obj, attr))
+    if read("status") not in SEAT_HOLDING_STATUSES:
+        return None
+    return read("cno"), int(read("year_taken")), read("term")
+
+
+def _teaching_offering(obj: Teaching, *, committed: bool) -> OfferingKey:
+    read = (lambda attr: _committed(obj, attr)) if committed else (lambda attr: getattr(obj, attr))
+    return read("cno"), int(read("year_offered")), read("term")
+
+
+def collect_seat_changes(session: Session) -> Tuple[Counter[OfferingKey], Set[OfferingKey]]:
+    """Net seat deltas per offering and the offerings whose ``Teaching`` rows changed.
+
+    Only meaningful inside ``after_flush``, while the session still lists the
+    flushed objects and their attribute history.
+    """
+    deltas: Counter[OfferingKey] = Counter()
+    capacity_keys: Set[OfferingKey] = set()
+    for obj in session.new:
+        if isinstance(obj, Enrollment):
+            key = _enrollment_seat(obj, committed=False)
+            if key is not None:
+                deltas[key] += 1
+        elif isinstance(obj, Teaching):
+            capacity_keys.add(_teaching_offering(obj, committed=False))
+    for obj in session.deleted:
+        if isinstance(obj, Enrollment):
+            key = _enrollment_seat(obj, committed=True)
+            if key is not None:
+                deltas[key] -= 1
+        elif isinstance(obj, Teaching):
+            capacity_keys.add(_teaching_offering(obj, committed=True))
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, Enrollment):
+            before = _enrollment_seat(obj, committed=True)
+            after = _enrollment_seat(obj, committed=False)
+            if before != after:
+                if before is not None:
+                    deltas[before] -= 1
+                if after is not None:
+                    deltas[after] += 1
+        elif isinstance(obj, Teaching):
+            capacity_keys.add(_teaching_offering(obj, committed=True))
+            capacity_keys.add(_teaching_offering(obj, committed=False))
+    return deltas, capacity_keys
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：根据本次 flush 中选课与授课安排的变化调整名额计数，名额不足时抛错回滚整个事务。
+    deltas, capacity_keys = collect_seat_changes(session)
+    if not deltas and not capacity_keys:
+        return
+    connection = session.connection()
+    for key in sorted(capacity_keys):
+        sync_capacity(connection, key)
+    freed = session.info.setdefault(FREED_OFFERINGS_KEY, set())
+    freed.update(capacity_keys)
+    freed.update(key for key, delta in deltas.items() if delta < 0)
+    # 先释放再占用，同一事务内换课/换学期不会因为旧名额未退而失败
+    for key, delta in sorted(deltas.items()):
+        if delta < 0:
+            release_seats(connection, key, -delta)
+    for key, delta in sorted(deltas.items()):
+        if delta > 0:
+            take_seats(connection, key, delta)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(FREED_OFFERINGS_KEY, None)
+
+
+def pop_freed_offerings(session: Session) -> List[OfferingKey]:
+    """Offerings that gained free seats in the transaction that just committed."""
+    return sorted(session.info.pop(FREED_OFFERINGS_KEY, ()))
+
+
+def register_seat_listener() -> None:
+    """Hook seat accounting into the shared Flask-SQLAlchemy session."""
+    for name, listener in (("after_flush", _after_flush), ("after_rollback", _after_rollback)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def _offerings_in_term(year: Optional[int], term: Optional[str]) -> List[OfferingKey]:
+    stmt = select(Teaching.cno, Teaching.year_offered, Teaching.term).distinct()
+    if year is not None:
+        stmt = stmt.where(Teaching.year_offered == year)
+    if term:
+        stmt = stmt.where(Teaching.term == term)
+    return [(cno, int(y), t) for cno, y, t in db.session.execute(stmt.order_by(Teaching.cno)).all()]
+
+
+def remaining_seats(
+    keys: Sequence[OfferingKey] = (),
+    *,
+    year: Optional[int] = None,
+    term: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Capacity, taken and remaining seats for ``keys`` (or every offering of a term).
+
+    Counters are read in one query; offerings without a counter row yet are
+    aggregated from ``Teaching``/``SC`` in two grouped queries, without writing.
+    Offerings with no ``Teaching`` row report ``capacity``/``remaining`` as ``None``.
+    """
+    # 功能：批量返回开课剩余名额，优先读取计数表，缺失的按授课与选课聚合补齐。
+    wanted = list(dict.fromkeys(keys)) if keys else _offerings_in_term(year, term)
+    if not wanted:
+        return []
+    found: Dict[OfferingKey, Tuple[Optional[int], int]] = {}
+    rows = db.session.execute(
+        select(
+            _SEAT_TABLE.c.Cno, _SEAT_TABLE.c.YearTaken, _SEAT_TABLE.c.Term,
+            _SEAT_TABLE.c.Capacity, _SEAT_TABLE.c.Taken,
+        ).where(
+            tuple_(_SEAT_TABLE.c.Cno, _SEAT_TABLE.c.YearTaken, _SEAT_TABLE.c.Term).in_(wanted)
+        )
+    ).all()
+    for cno, y, t, capacity, taken in rows:
+        found[(cno, int(y), t)] = (int(capacity), int(taken))
+
+    missing = [key for key in wanted if key not in found]
+    if missing:
+        capacities = dict(
+            ((cno, int(y), t), int(total))
+            for cno, y, t, total in db.session.execute(
+                select(Teaching.cno, Teaching.year_offered, Teaching.term, func.sum(Teaching.capacity))
+                .where(tuple_(Teaching.cno, Teaching.year_offered, Teaching.term).in_(missing))
+                .group_by(Teaching.cno, Teaching.year_offered, Teaching.term)
+            ).all()
+        )
+        counts = dict(
+            ((cno, int(y), t), int(total))
+            for cno, y, t, total in db.session.execute(
+                select(Enrollment.cno, Enrollment.year_taken, Enrollment.term, func.count())
+                .where(
+                    tuple_(Enrollment.cno, Enrollment.year_taken, Enrollment.term).in_(missing),
+                    Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+                )
+                .group_by(Enrollment.cno, Enrollment.year_taken, Enrollment.term)
+            ).all()
+        )
+        for key in missing:
+            found[key] = (capacities.get(key), counts.get(key, 0))
+
+    result = []
+    for key in wanted:
+        capacity, taken = found[key]
+        result.append(
+            {
+                "course_id": key[0],
+                "year": key[1],
+                "term": key[2],
+                "capacity": capacity,
+                "taken": taken,
+                "remaining": None if capacity is None else max(capacity - taken, 0),
+            }
+        )
+    return result
+
+
+def reconcile_seats(
+    *, year: Optional[int] = None, term: Optional[str] = None, dry_run: bool = False
+) -> Dict[str, int]:
+    """Rebuild counters from ``Teaching`` and ``SC``; return how many rows changed."""
+    # 功能：按授课容量之和与占用名额的选课数重算计数表，修正因导入或手工 SQL 造成的偏差。
+    teaching_filter: List[Any] = []
+    enrollment_filter: List[Any] = [Enrollment.status.in_(SEAT_HOLDING_STATUSES)]
+    seat_filter: List[Any] = []
+    if year is not None:
+        teaching_filter.append(Teaching.year_offered == year)
+        enrollment_filter.append(Enrollment.year_taken == year)
+        seat_filter.append(_SEAT_TABLE.c.YearTaken == year)
+    if term:
+        teaching_filter.append(Teaching.term == term)
+        enrollment_filter.append(Enrollment.term == term)
+        seat_filter.append(_SEAT_TABLE.c.Term == term)
+
+    capacities = {
+        (cno, int(y), t): int(total)
+        for cno, y, t, total in db.session.execute(
+            select(Teaching.cno, Teaching.year_offered, Teaching.term, func.sum(Teaching.capacity))
+            .where(*teaching_filter)
+            .group_by(Teaching.cno, Teaching.year_offered, Teaching.term)
+        ).all()
+    }
+    counts = {
+        (cno, int(y), t): int(total)
+        for cno, y, t, total in db.session.execute(
+            select(Enrollment.cno, Enrollment.year_taken, Enrollment.term, func.count())
+            .where(*enrollment_filter)
+            .group_by(Enrollment.cno, Enrollment.year_taken, Enrollment.term)
+        ).all()
+    }
+    current = {
+        (cno, int(y), t): (int(capacity), int(taken))
+        for cno, y, t, capacity, taken in db.session.execute(
+            select(
+                _SEAT_TABLE.c.Cno, _SEAT_TABLE.c.YearTaken, _SEAT_TABLE.c.Term,
+                _SEAT_TABLE.c.Capacity, _SEAT_TABLE.c.Taken,
+            ).where(*seat_filter)
+        ).all()
+    }
+
+    now = datetime.utcnow()
+    inserts = []
+    updates = []
+    for key, capacity in capacities.items():
+        expected = (capacity, counts.get(key, 0))
+        if key not in current:
+            inserts.append(key + expected)
+        elif current[key] != expected:
+            updates.append(key + expected)
+    stale = [key for key in current if key not in capacities]
+    over = sum(1 for key, capacity in capacities.items() if counts.get(key, 0) > capacity)
+
+    if not dry_run:
+        connection = db.session.connection()
+        if inserts:
+            connection.execute(
+                insert(_SEAT_TABLE),
+                [
+                    {"Cno": c, "YearTaken": y, "Term": t, "Capacity": cap, "Taken": n, "UpdatedAt": now}
+                    for c, y, t, cap, n in inserts
+                ],
+            )
+        for c, y, t, cap, n in updates:
+            connection.execute(
+                update(_SEAT_TABLE)
+                .where(_key_filter((c, y, t)))
+                .values(Capacity=cap, Taken=n, UpdatedAt=now)
+            )
+        if stale:
+            connection.execute(
+                delete(_SEAT_TABLE).where(
+                    or_(*(_key_filter(key) for key in stale))
+                )
+            )
+        db.session.commit()
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(stale),
+        "over_capacity": over,
+    }
@@ -0,0 +1,145 @@
+"""Per-table change versions used to build API ETags.
+
+Writes only record which tables they touched. The counters are incremented
+after the writer's transaction commits, in a short transaction of their own,
+so concurrent writers never queue on a ``TableVersion`` row lock while their
+own transaction is open. A reader may briefly see the old version right
+after a commit; the ETag catches up once the bump lands.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Iterable, List, Sequence, Set
+
+from flask import has_app_context
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import TableVersion
+
+logger = logging.getLogger(__name__)
+
+_VERSION_TABLE = TableVersion.__table__
+_PENDING_KEY = "_table_version_pending"
+
+
+def _touched_tables(session: Session) -> Set[str]:
+    # 功能：收集本次 flush 中新增、修改或删除的对象所属的数据表名。
+    tables: Set[str] = set()
+    for obj in session.new:
+        tables.add(obj.__table__.name)
+    for obj in session.deleted:
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+    tables.discard(_VERSION_TABLE.name)
+    return tables
+
+
+def bump_table_versions(session: Session, tables: Iterable[str]) -> None:
+    """Mark ``tables`` as written; their counters are incremented once the session commits."""
+    session.info.setdefault(_PENDING_KEY, set()).update(tables)
+
+
+def _increment(connection: Connection, tables: Iterable[str]) -> None:
+    # 功能：递增写入计数，缺少计数行时补插一行。
+    now = datetime.utcnow()
+    for name in sorted(set(tables)):
+        stmt = (
+            update(_VERSION_TABLE)
+            .where(_VERSION_TABLE.c.TableName == name)
+            .values(Version=_VERSION_TABLE.c.Version + 1, UpdatedAt=now)
+        )
+        if connection.execute(stmt).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(
+                    insert(_VERSION_TABLE).values(TableName=name, Version=1, UpdatedAt=now)
+                )
+        except IntegrityError:
+            # 并发写入方已插入计数行，改为递增
+            connection.execute(stmt)
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    tables = _touched_tables(session)
+    if tables:
+        bump_table_versions(session, tables)
+
+
+def _after_commit(session: Session) -> None:
+    # 功能：提交之后在独立的短事务中递增表版本，写入方的事务不再持有 TableVersion 行锁。
+    tables = session.info.pop(_PENDING_KEY, None)
+    if not tables or not has_app_context():
+        return
+    try:
+        with db.engine.begin() as connection:
+            _increment(connection, tables)
+    except SQLAlchemyError:
+        # 业务数据已提交，计数失败只会让 ETag 暂时偏旧，不能让请求失败
+        logger.exception("Failed to bump table versions for %s", ", ".join(sorted(tables)))
+
+
+def _after_rollback(session: Session) -> None:
+    # 保存点回滚时外层事务仍可能提交，保留已记录的表
+    if not session.in_nested_transaction():
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _do_orm_execute(orm_execute_state: Any) -> None:
+    # ORM 批量 insert/update/delete 不经过 flush，需要单独计数
+    if not (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.local_table is _VERSION_TABLE:
+        return
+    bump_table_versions(orm_execute_state.session, [mapper.local_table.name])
+
+
+def register_table_version_listener() -> None:
+    """Hook the write counters into the shared Flask-SQLAlchemy session."""
+    # 功能：为全局会话注册 flush 与批量语句监听，使仓储层和页面路由的写入都会在提交后递增表版本。
+    for name, listener in (
+        ("after_flush", _after_flush),
+        ("do_orm_execute", _do_orm_execute),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def table_version_token(models: Sequence[Any]) -> str:
+    """Return a digest of the write counters and max ``UpdatedAt`` of ``models``.
+
+    Everything is read in a single ``SELECT`` of scalar subqueries. ``UpdatedAt``
+    also catches writes made outside the ORM session (imports, manual SQL).
+    """
+    columns: List[Any] = []
+    for model in models:
+        table = model.__table__
+        columns.append(
+            select(_VERSION_TABLE.c.Version)
+            .where(_VERSION_TABLE.c.TableName == table.name)
+            .scalar_subquery()
+            .label(f"v_{table.name}")
+        )
+        if "UpdatedAt" in table.c:
+            columns.append(
+                select(func.max(table.c.UpdatedAt)).scalar_subquery().label(f"u_{table.name}")
+            )
+    row = db.session.execute(select(*columns)).one()
+    parts = [model.__table__.name for model in models]
+    parts.extend("" if value is None else str(value) for value in row)
+    raw = "|".join(parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
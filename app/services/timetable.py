@@ -0,0 +1,262 @@
+"""Weekly timetables as bitmasks for clash detection.
+
+Each ``TeachingSlot`` is one period on one weekday and maps to one bit of an
+integer (``7 * PERIODS_PER_DAY`` bits per week). Every ``Teaching`` row is one
+section of its offering (course + year + term) with its own mask. ``SC`` does
+not record which section a student attends, so two offerings clash only when
+no choice of sections keeps them apart: a new enrollment is rejected when every
+section of the new offering overlaps every section of some offering the
+student already holds. A section without slots never clashes. The slots a
+student occupies for certain are, per held offering, those common to all of
+its sections.
+
+Section masks are built once per term with a single query and reused until
+the write versions of ``Teaching`` or ``TeachingSlot`` change. The clash check
+is a read followed by a write, so callers that enroll pass ``lock=True``: the
+student's row is locked ``FOR UPDATE`` and the held courses are read with a
+locking read, which serializes concurrent enrollments of the same student
+until the writing transaction commits.
+"""
+
+from __future__ import annotations
+
+from functools import reduce
+from itertools import groupby
+from operator import and_, or_
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from ..extensions import db
+from ..models import Enrollment, Student, Teaching, TeachingSlot
+from .seats import SEAT_HOLDING_STATUSES
+from .table_versions import table_version_token
+
+WEEKDAYS = 7
+PERIODS_PER_DAY = 12
+
+# (授课编号, 该班节次位掩码)
+Section = Tuple[int, int]
+
+
+class TimetableClashError(Exception):
+    """Raised when an enrollment would overlap the student's existing timetable."""
+
+    def __init__(self, sno: str, cno: str, clashes: List[Dict[str, Any]]) -> None:
+        self.sno = sno
+        self.cno = cno
+        self.clashes = clashes
+        courses = ", ".join(item["course_id"] for item in clashes)
+        super().__init__(f"Course {cno} clashes with {courses} in student {sno}'s timetable")
+
+
+def slot_bit(weekday: int, period: int) -> int:
+    if not (1 <= weekday <= WEEKDAYS and 1 <= period <= PERIODS_PER_DAY):
+        raise ValueError(f"Invalid slot: weekday {weekday}, period {period}")
+    return 1 << ((weekday - 1) * PERIODS_PER_DAY + period - 1)
+
+
+def mask_slots(mask: int) -> List[Dict[str, int]]:
+    """Expand a mask back into ``{"weekday", "period"}`` items in week order."""
+    slots: List[Dict[str, int]] = []
+    while mask:
+        low = mask & -mask
+        position = low.bit_length() - 1
+        slots.append({"weekday": position // PERIODS_PER_DAY + 1, "period": position % PERIODS_PER_DAY + 1})
+        mask ^= low
+    return slots
+
+
+def section_masks(year: int, term: str) -> Dict[str, List[Section]]:
+    """Weekly slot mask of every section in the term, grouped by course id."""
+    # 功能：按表版本缓存整学期各班的位掩码；授课安排或节次有写入时才重新聚合。
+    cache: Dict[Tuple[int, str], Tuple[str, Dict[str, List[Section]]]] = current_app.extensions.setdefault(
+        "timetable_masks", {}
+    )
+    token = table_version_token([Teaching, TeachingSlot])
+    cached = cache.get((year, term))
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    by_teaching: Dict[int, Tuple[str, int]] = {}
+    rows = db.session.execute(
+        select(Teaching.teach_id, Teaching.cno, TeachingSlot.weekday, TeachingSlot.period)
+        .outerjoin(TeachingSlot, TeachingSlot.teach_id == Teaching.teach_id)
+        .where(Teaching.year_offered == year, Teaching.term == term)
+    )
+    # 没有节次的班也要保留（掩码为 0），它让所在开课总有一个不冲突的选择
+    for teach_id, cno, weekday, period in rows:
+        mask = by_teaching.get(teach_id, (cno, 0))[1]
+        if weekday is not None:
+            mask |= slot_bit(weekday, period)
+        by_teaching[teach_id] = (cno, mask)
+    masks: Dict[str, List[Section]] = {}
+    for teach_id, (cno, mask) in sorted(by_teaching.items()):
+        masks.setdefault(cno, []).append((teach_id, mask))
+    cache[(year, term)] = (token, masks)
+    return masks
+
+
+def fixed_mask(sections: Sequence[Section]) -> int:
+    """Slots occupied whichever section is attended (0 when any section has no slots)."""
+    return reduce(and_, (mask for _, mask in sections)) if sections else 0
+
+
+def _overlap(sections: Sequence[Section], others: Sequence[Section]) -> int:
+    """Slots where the two offerings meet if no section pair is disjoint, else 0."""
+    if not sections or not others:
+        return 0
+    overlaps = [mask & other for _, mask in sections for _, other in others]
+    return reduce(or_, overlaps) if all(overlaps) else 0
+
+
+def clashes_with(sections: Sequence[Section], held: Iterable[Sequence[Section]]) -> bool:
+    """True when every section in ``sections`` clashes with one of the ``held`` offerings."""
+    held = [other for other in held if other]
+    return bool(sections) and all(any(_overlap([section], other) for other in held) for section in sections)
+
+
+def _held_courses(sno: str, year: int, term: str, *, lock: bool = False) -> List[str]:
+    stmt = select(Enrollment.cno).where(
+        Enrollment.sno == sno,
+        Enrollment.year_taken == year,
+        Enrollment.term == term,
+        Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+    )
+    if lock:
+        # 加锁读取：可重复读隔离级别下普通查询看不到锁等待期间其他事务刚提交的选课
+        db.session.execute(select(Student.sno).where(Student.sno == sno).with_for_update())
+        stmt = stmt.with_for_update(read=True)
+    return list(db.session.scalars(stmt))
+
+
+def student_timetable(sno: str, year: int, term: str) -> Dict[str, Any]:
+    """The student's weekly slots for the term, per course and per section.
+
+    ``slots`` of a course and the overall ``occupied`` list only contain the
+    slots shared by all of a course's sections, since the section attended is
+    not recorded.
+    """
+    masks = section_masks(year, term)
+    combined = 0
+    courses: List[Dict[str, Any]] = []
+    for cno in sorted(_held_courses(sno, year, term)):
+        sections = masks.get(cno, [])
+        fixed = fixed_mask(sections)
+        combined |= fixed
+        courses.append(
+            {
+                "course_id": cno,
+                "slots": mask_slots(fixed),
+                "sections": [{"teach_id": teach_id, "slots": mask_slots(mask)} for teach_id, mask in sections],
+            }
+        )
+    return {
+        "student_id": sno,
+        "year": year,
+        "term": term,
+        "courses": courses,
+        "occupied": mask_slots(combined),
+    }
+
+
+def check_timetable(sno: str, cno: str, year: int, term: str, *, lock: bool = False) -> None:
+    """Raise :class:`TimetableClashError` if every section of ``cno`` clashes with a held course.
+
+    With ``lock=True`` the student's row stays locked until the caller's
+    transaction ends; pass it when the enrollment is written in the same
+    transaction.
+    """
+    # 功能：逐班检查新开课，只要有一个班不与任何已选课程必然冲突就放行；全部冲突时汇总冲突课程与节次。
+    held = _held_courses(sno, year, term, lock=lock)
+    masks = section_masks(year, term)
+    sections = masks.get(cno, [])
+    if not sections:
+        return
+    blocking: Dict[str, int] = {}
+    for section in sections:
+        found: Dict[str, int] = {}
+        for other in held:
+            overlap = _overlap([section], masks.get(other, [])) if other != cno else 0
+            if overlap:
+                found[other] = overlap
+        if not found:
+            return
+        for other, mask in found.items():
+            blocking[other] = blocking.get(other, 0) | mask
+    raise TimetableClashError(
+        sno,
+        cno,
+        [{"course_id": other, "slots": mask_slots(mask)} for other, mask in sorted(blocking.items())],
+    )
+
+
+def term_clash_report(year: int, term: str) -> Dict[str, Any]:
+    """Every pair of courses that clash, whatever sections are attended, in some student's timetable."""
+    # 功能：一次读取本学期占名额的选课记录，按学生累计各课所有班的并集掩码，只有相交时才逐对比较各班。
+    masks = section_masks(year, term)
+    rows = db.session.execute(
+        select(Enrollment.sno, Enrollment.cno)
+        .where(
+            Enrollment.year_taken == year,
+            Enrollment.term == term,
+            Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+        )
+        .order_by(Enrollment.sno, Enrollment.cno)
+    ).all()
+    spans = {cno: reduce(or_, (mask for _, mask in sections), 0) for cno, sections in masks.items()}
+    clashes: List[Dict[str, Any]] = []
+    students = 0
+    clashing_students = 0
+    for sno, group in groupby(rows, key=lambda row: row[0]):
+        students += 1
+        combined = 0
+        seen: List[Tuple[str, int]] = []
+        found = False
+        for _, cno in group:
+            span = spans.get(cno, 0)
+            if combined & span:
+                for other, other_span in seen:
+                    if not other_span & span:
+                        continue
+                    overlap = _overlap(masks[other], masks[cno])
+                    if overlap:
+                        found = True
+                        clashes.append({"student_id": sno, "courses": [other, cno], "slots": mask_slots(overlap)})
+            if span:
+                combined |= span
+                seen.append((cno, span))
+        clashing_students += found
+    return {
+        "year": year,
+        "term": term,
+        "students": students,
+        "students_with_clashes": clashing_students,
+        "clashes": clashes,
+    }
+
+
+def teaching_slots(teach_id: int) -> List[Dict[str, int]]:
+    rows = db.session.execute(
+        select(TeachingSlot.weekday, TeachingSlot.period)
+        .where(TeachingSlot.teach_id == teach_id)
+        .order_by(TeachingSlot.weekday, TeachingSlot.period)
+    )
+    return [{"weekday": weekday, "period": period} for weekday, period in rows]
+
+
+def replace_teaching_slots(teach_id: int, slots: Iterable[Tuple[int, int]]) -> List[Dict[str, int]]:
+    """Replace the weekly slots of one teaching; raises ``ValueError`` on an invalid slot."""
+    unique = sorted(set(slots))
+    for weekday, period in unique:
+        slot_bit(weekday, period)
+    session = db.session
+    session.execute(delete(TeachingSlot).where(TeachingSlot.teach_id == teach_id))
+    if unique:
+        session.execute(
+            insert(TeachingSlot),
+            [{"teach_id": teach_id, "weekday": weekday, "period": period} for weekday, period in unique],
+        )
+    session.commit()
+    return teaching_slots(teach_id)
+
@@ -0,0 +1,192 @@
+"""Classroom utilization metrics for one term.
+
+Two ratios are reported per classroom:
+
+* seat utilization: students in the room's teachings divided by the seats
+  those teachings could have filled (room capacity times teachings);
+* day utilization: days on which the room is booked divided by the days of
+  the term, where the term spans the earliest ``StartDate`` to the latest
+  ``EndDate`` of its teachings.
+
+``SC`` does not record a section, so an offering's students are split across
+its teachings in proportion to ``Teaching.Capacity``. Everything is loaded in
+three grouped or narrow queries. The rest is arithmetic over per-room
+columns: building roll-ups, percentiles and the list of under-used rooms.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from math import floor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from ..extensions import db
+from ..models import Classroom, Enrollment, Teaching
+from .seats import SEAT_HOLDING_STATUSES
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of already sorted values (0 for an empty sequence)."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _booked_days(ranges: List[Tuple[date, date]], start: date, end: date) -> int:
+    # 功能：把教室的预订日期段裁剪到学期范围内后合并，返回被占用的天数。
+    days = 0
+    cursor: Optional[date] = None
+    for begin, finish in sorted(ranges):
+        begin, finish = max(begin, start), min(finish, end)
+        if finish < begin:
+            continue
+        if cursor is not None and begin <= cursor:
+            if finish > cursor:
+                days += (finish - cursor).days
+                cursor = finish
+            continue
+        days += (finish - begin).days + 1
+        cursor = finish
+    return days
+
+
+def classroom_utilization(year: int, term: str, *, underused_threshold: float = 0.3) -> Dict[str, Any]:
+    """Per-room and per-building utilization of ``(year, term)`` with percentiles and under-used rooms."""
+    # 功能：三条查询取出教室、本学期授课安排与各开课选课人数，按教室列计算座位与日期利用率。
+    classrooms = db.session.execute(
+        select(Classroom.room_id, Classroom.building, Classroom.capacity).order_by(Classroom.room_id)
+    ).all()
+    teachings = db.session.execute(
+        select(Teaching.room_id, Teaching.cno, Teaching.capacity, Teaching.start_date, Teaching.end_date).where(
+            Teaching.year_offered == year, Teaching.term == term
+        )
+    ).all()
+    enrolled = dict(
+        db.session.execute(
+            select(Enrollment.cno, func.count())
+            .where(
+                Enrollment.year_taken == year,
+                Enrollment.term == term,
+                Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+            )
+            .group_by(Enrollment.cno)
+        ).all()
+    )
+
+    offering_capacity: Dict[str, int] = {}
+    for _, cno, capacity, _, _ in teachings:
+        offering_capacity[cno] = offering_capacity.get(cno, 0) + int(capacity or 0)
+    dated = [(start, end) for _, _, _, start, end in teachings if start and end and end >= start]
+    term_start = min((start for start, _ in dated), default=None)
+    term_end = max((end for _, end in dated), default=None)
+    term_days = (term_end - term_start).days + 1 if term_start and term_end else 0
+
+    # 按教室顺序排列的列：授课数、学生数（按容量比例分摊）、被占用日期段
+    index = {room_id: position for position, (room_id, _, _) in enumerate(classrooms)}
+    count = len(classrooms)
+    sessions = array("l", bytes(array("l").itemsize * count))
+    students = array("d", bytes(array("d").itemsize * count))
+    ranges: List[List[Tuple[date, date]]] = [[] for _ in range(count)]
+    for room_id, cno, capacity, start, end in teachings:
+        position = index.get(room_id)
+        if position is None:
+            continue
+        sessions[position] += 1
+        total = offering_capacity.get(cno) or 0
+        if total:
+            students[position] += enrolled.get(cno, 0) * int(capacity or 0) / total
+        if start and end and end >= start:
+            ranges[position].append((start, end))
+
+    capacities = array("l", (int(capacity) for _, _, capacity in classrooms))
+    seat_ratio = array(
+        "d",
+        (
+            students[i] / (capacities[i] * sessions[i]) if sessions[i] and capacities[i] else 0.0
+            for i in range(count)
+        ),
+    )
+    booked = array(
+        "l",
+        (_booked_days(ranges[i], term_start, term_end) if term_days else 0 for i in range(count)),
+    )
+    day_ratio = array("d", (booked[i] / term_days if term_days else 0.0 for i in range(count)))
+
+    rooms = [
+        {
+            "room_id": room_id,
+            "building": building,
+            "capacity": capacities[i],
+            "teachings": sessions[i],
+            "students": round(students[i], 2),
+            "seat_utilization": round(seat_ratio[i], 4),
+            "booked_days": booked[i],
+            "day_utilization": round(day_ratio[i], 4),
+        }
+        for i, (room_id, building, _) in enumerate(classrooms)
+    ]
+
+    buildings: Dict[str, Dict[str, float]] = {}
+    for i, (_, building, _) in enumerate(classrooms):
+        totals = buildings.setdefault(
+            building, {"rooms": 0, "capacity": 0, "teachings": 0, "students": 0.0, "seats": 0, "booked_days": 0}
+        )
+        totals["rooms"] += 1
+        totals["capacity"] += capacities[i]
+        totals["teachings"] += sessions[i]
+        totals["students"] += students[i]
+        totals["seats"] += capacities[i] * sessions[i]
+        totals["booked_days"] += booked[i]
+    building_rows = [
+        {
+            "building": building,
+            "rooms": int(totals["rooms"]),
+            "capacity": int(totals["capacity"]),
+            "teachings": int(totals["teachings"]),
+            "students": round(totals["students"], 2),
+            "seat_utilization": round(totals["students"] / totals["seats"], 4) if totals["seats"] else 0.0,
+            "day_utilization": (
+                round(totals["booked_days"] / (totals["rooms"] * term_days), 4) if term_days else 0.0
+            ),
+        }
+        for building, totals in sorted(buildings.items())
+    ]
+
+    seat_sorted = sorted(seat_ratio)
+    day_sorted = sorted(day_ratio)
+    underused = sorted(
+        (
+            {
+                "room_id": room["room_id"],
+                "building": room["building"],
+                "seat_utilization": room["seat_utilization"],
+                "day_utilization": room["day_utilization"],
+            }
+            for i, room in enumerate(rooms)
+            if seat_ratio[i] < underused_threshold or day_ratio[i] < underused_threshold
+        ),
+        key=lambda item: (min(item["seat_utilization"], item["day_utilization"]), item["room_id"]),
+    )
+    return {
+        "year": year,
+        "term": term,
+        "term_start": term_start.isoformat() if term_start else None,
+        "term_end": term_end.isoformat() if term_end else None,
+        "term_days": term_days,
+        "rooms": rooms,
+        "buildings": building_rows,
+        "percentiles": {
+            "seat_utilization": {f"p{q}": round(percentile(seat_sorted, q), 4) for q in PERCENTILES},
+            "day_utilization": {f"p{q}": round(percentile(day_sorted, q), 4) for q in PERCENTILES},
+        },
+        "underused_threshold": underused_threshold,
+        "underused": underused,
+    }
@@ -0,0 +1,334 @@
+"""FIFO waitlists for full offerings and the worker that promotes from them.
+
+Students queue for an offering (course + year + term) instead of retrying
+``POST /api/v1/enrollments/``. A student's place is the order of its
+``WaitID``; the position is a range count on ``idx_waitlist_offering``, so it
+costs an index seek rather than a scan of the queue.
+
+When a transaction commits that released seats (a drop, a delete, a move to
+another term, or a capacity increase on ``Teaching``), the affected offerings
+are handed to the per-process :class:`WaitlistPromoter`. It takes the head of
+the queue in batches and applies the same rules as ``create_enrollment``:
+prerequisites for the whole batch in one query, then each candidate's weekly
+timetable, checked under a lock on the student's row. It converts as many eligible students as there are free seats into
+enrollments in a single transaction. The seat counters still guard the insert, so a promotion
+racing a direct enrollment simply retries with the new remaining count. A
+periodic sweep picks up offerings freed by other workers.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Course, Enrollment, OfferingSeat, Waitlist
+from .seats import (
+    SEAT_HOLDING_STATUSES,
+    OfferingFullError,
+    OfferingKey,
+    pop_freed_offerings,
+    remaining_seats,
+)
+from .timetable import TimetableClashError, check_timetable
+
+logger = logging.getLogger(__name__)
+
+
+def _offering_filter(key: OfferingKey) -> List[Any]:
+    cno, year, term = key
+    return [Waitlist.cno == cno, Waitlist.year_taken == year, Waitlist.term == term]
+
+
+def queue_length(key: OfferingKey) -> int:
+    return int(db.session.scalar(select(func.count()).where(*_offering_filter(key))) or 0)
+
+
+def waitlist_position(sno: str, cno: str) -> Optional[Dict[str, Any]]:
+    """Position (1-based) of ``sno`` in the queue it joined for ``cno``, or ``None``."""
+    # 功能：按唯一键找到候补记录，再以索引范围计数得到其在队列中的名次。
+    entry = db.session.execute(
+        select(Waitlist).where(Waitlist.sno == sno, Waitlist.cno == cno)
+    ).scalar_one_or_none()
+    if entry is None:
+        return None
+    key = (entry.cno, entry.year_taken, entry.term)
+    position = db.session.scalar(
+        select(func.count()).where(*_offering_filter(key), Waitlist.wait_id <= entry.wait_id)
+    )
+    return {
+        "student_id": entry.sno,
+        "course_id": entry.cno,
+        "year": entry.year_taken,
+        "term": entry.term,
+        "position": int(position or 0),
+        "length": queue_length(key),
+        "joined_at": entry.joined_at.isoformat() if entry.joined_at else None,
+    }
+
+
+def join_waitlist(sno: str, cno: str, year: int, term: str) -> Dict[str, Any]:
+    """Append ``sno`` to the offering's queue; raises ``IntegrityError`` if already queued."""
+    db.session.add(Waitlist(sno=sno, cno=cno, year_taken=year, term=term))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise
+    return waitlist_position(sno, cno)
+
+
+def leave_waitlist(sno: str, cno: str) -> bool:
+    removed = db.session.execute(
+        delete(Waitlist).where(Waitlist.sno == sno, Waitlist.cno == cno)
+    ).rowcount
+    db.session.commit()
+    return bool(removed)
+
+
+def _students_meeting_prerequisite(snos: List[str], course: Course) -> Set[str]:
+    # 与 EnrollmentRepository.prerequisite_satisfied 的判定一致，但一次查询整批学生
+    if not course.prereq_cno or db.session.get(Course, course.prereq_cno) is None:
+        return set(snos)
+    return set(
+        db.session.scalars(
+            select(Enrollment.sno).where(
+                Enrollment.sno.in_(snos),
+                Enrollment.cno == course.prereq_cno,
+                Enrollment.status == "completed",
+                Enrollment.grade.is_not(None),
+                Enrollment.grade >= Decimal("60"),
+            )
+        )
+    )
+
+
+def _fits_timetable(sno: str, key: OfferingKey) -> bool:
+    try:
+        check_timetable(sno, *key, lock=True)
+    except TimetableClashError:
+        return False
+    return True
+
+
+def _free_seats(key: OfferingKey, batch_size: int) -> int:
+    remaining = remaining_seats([key])[0]["remaining"]
+    # 没有授课安排的开课不限名额，每次按批量上限递补
+    return batch_size if remaining is None else min(remaining, batch_size)
+
+
+def _promote_batch(key: OfferingKey, course: Course, free: int, batch_size: int) -> List[str]:
+    # 功能：从队首起挑出至多 free 名符合条件的学生加入会话，返回其学号；不提交。
+    chosen: List[str] = []
+    after = 0
+    while len(chosen) < free:
+        window = db.session.scalars(
+            select(Waitlist)
+            .where(*_offering_filter(key), Waitlist.wait_id > after)
+            .order_by(Waitlist.wait_id)
+            .limit(batch_size)
+        ).all()
+        if not window:
+            break
+        after = window[-1].wait_id
+        snos = [entry.sno for entry in window]
+        existing = {
+            row.sno: row
+            for row in db.session.scalars(
+                select(Enrollment).where(Enrollment.cno == key[0], Enrollment.sno.in_(snos))
+            )
+        }
+        eligible = _students_meeting_prerequisite(snos, course)
+        for entry in window:
+            current = existing.get(entry.sno)
+            if current is not None and current.status in SEAT_HOLDING_STATUSES:
+                db.session.delete(entry)
+                continue
+            if entry.sno not in eligible or len(chosen) >= free:
+                continue
+            if not _fits_timetable(entry.sno, key):
+                continue
+            if current is None:
+                db.session.add(
+                    Enrollment(
+                        sno=entry.sno,
+                        cno=key[0],
+                        year_taken=key[1],
+                        term=key[2],
+                        status="enrolled",
+                    )
+                )
+            else:
+                # 退课记录与选课共用主键，递补时恢复为本学期的在读状态
+                current.year_taken = key[1]
+                current.term = key[2]
+                current.status = "enrolled"
+                current.grade = None
+                current.enroll_date = datetime.utcnow()
+            db.session.delete(entry)
+            chosen.append(entry.sno)
+    return chosen
+
+
+def promote_waitlist(key: OfferingKey, *, batch_size: int = 50, attempts: int = 3) -> List[str]:
+    """Enroll the head of ``key``'s queue into free seats; return the promoted student ids.
+
+    Students who fail the prerequisite or whose timetable clashes with the
+    offering keep their place and are skipped; students who already hold a
+    seat in the course are removed from the queue. A batch that loses a race
+    (seats gone, duplicate row, lock deadlock) is rolled back and rebuilt from
+    the current state, up to ``attempts`` times.
+    """
+    # 功能：按先进先出分批取候补学生，按直接选课的规则校验先修课与课表冲突后在同一事务内转为选课。
+    course = db.session.get(Course, key[0])
+    if course is None:
+        return []
+    promoted: List[str] = []
+    for _ in range(attempts):
+        free = _free_seats(key, batch_size)
+        if free <= 0:
+            break
+        # 挑选过程中的查询会自动 flush 已加入的选课，名额不足或死锁可能在提交前就抛出，整批都要在重试范围内
+        try:
+            chosen = _promote_batch(key, course, free, batch_size)
+            db.session.commit()
+        except (OfferingFullError, IntegrityError, OperationalError):
+            # 与直接选课或其他 worker 的递补竞争失败（含学生行锁与名额行锁交错导致的死锁），整批回滚后按最新状态重试
+            db.session.rollback()
+            continue
+        promoted.extend(chosen)
+        if len(chosen) < free:
+            break
+    return promoted
+
+
+class WaitlistPromoter:
+    """Per-process worker that promotes waitlisted students when seats free up."""
+
+    def __init__(
+        self,
+        app: Flask,
+        *,
+        batch_size: int = 50,
+        sweep_interval: float = 60.0,
+    ) -> None:
+        self._app = app
+        self.batch_size = max(batch_size, 1)
+        self.sweep_interval = sweep_interval
+        self._pending: Set[OfferingKey] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def enqueue(self, keys: List[OfferingKey]) -> None:
+        if not keys:
+            return
+        with self._lock:
+            self._pending.update(keys)
+        self.ensure_started()
+        self._wakeup.set()
+
+    def ensure_started(self) -> None:
+        # 预加载应用后 fork 出的 worker 不会继承线程，按进程号懒启动
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="waitlist-promoter", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            woken = self._wakeup.wait(self.sweep_interval)
+            self._wakeup.clear()
+            try:
+                if woken:
+                    self.run_pending()
+                else:
+                    self.sweep()
+            except Exception:  # pragma: no cover - background thread guard
+                logger.exception("Failed to promote waitlisted students")
+
+    def run_pending(self) -> Dict[OfferingKey, List[str]]:
+        with self._lock:
+            keys = sorted(self._pending)
+            self._pending.clear()
+        return self.promote(keys)
+
+    def promote(self, keys: List[OfferingKey]) -> Dict[OfferingKey, List[str]]:
+        results: Dict[OfferingKey, List[str]] = {}
+        for key in keys:
+            # 单个开课失败只记录日志，不影响本轮其余开课的递补
+            try:
+                with self._app.app_context():
+                    promoted = promote_waitlist(key, batch_size=self.batch_size)
+            except Exception:
+                logger.exception("Failed to promote waitlist of %s", key)
+                continue
+            if promoted:
+                results[key] = promoted
+        return results
+
+    def sweep(self) -> Dict[OfferingKey, List[str]]:
+        """Promote in every offering that has both a queue and free seats."""
+        # 功能：兜底扫描，处理其他 worker 释放的名额或进程重启前遗漏的递补。
+        with self._app.app_context():
+            rows = db.session.execute(
+                select(Waitlist.cno, Waitlist.year_taken, Waitlist.term)
+                .distinct()
+                .outerjoin(
+                    OfferingSeat,
+                    (OfferingSeat.cno == Waitlist.cno)
+                    & (OfferingSeat.year_taken == Waitlist.year_taken)
+                    & (OfferingSeat.term == Waitlist.term),
+                )
+                .where(OfferingSeat.cno.is_(None) | (OfferingSeat.taken < OfferingSeat.capacity))
+            ).all()
+        return self.promote([(cno, int(year), term) for cno, year, term in rows])
+
+
+def _after_commit(session: Session) -> None:
+    freed = pop_freed_offerings(session)
+    if freed and has_app_context():
+        promoter = current_app.extensions.get("waitlist_promoter")
+        if promoter is not None:
+            promoter.enqueue(freed)
+
+
+def get_waitlist_promoter() -> WaitlistPromoter:
+    return current_app.extensions["waitlist_promoter"]
+
+
+def init_waitlist(app: Flask) -> WaitlistPromoter:
+    """Create the application's waitlist promoter from ``WAITLIST_*`` settings.
+
+    Must be called after ``register_seat_listener``, which records the
+    offerings whose seats were released by each transaction.
+    """
+    # 功能：创建递补后台任务并挂到 app.extensions 上，注册提交监听把释放名额的开课交给它，
+    # 并在每个请求前确保定期扫描的线程已启动。
+    promoter = WaitlistPromoter(
+        app,
+        batch_size=app.config.get("WAITLIST_PROMOTION_BATCH", 50),
+        sweep_interval=app.config.get("WAITLIST_SWEEP_INTERVAL", 60.0),
+    )
+    app.extensions["waitlist_promoter"] = promoter
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+    app.before_request(promoter.ensure_started)
+    return promoter
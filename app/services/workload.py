@@ -0,0 +1,382 @@
+"""Per-teacher, per-term workload totals kept current on every write.
+
+``TeacherWorkload`` holds, for each teacher and ``(YearOffered, Term)``, the
+number of teachings, the credits and contact hours of their courses, and the
+students holding a seat in the offerings they teach. ``SC`` does not record a
+section, so every teacher of an offering counts all of its students.
+
+The flush that writes a ``Teaching`` row (or changes a course's credits or
+hours) recomputes the affected rows with one aggregate over that teacher's
+term. Enrollment writes only add the net seat change of each offering to its
+teachers' rows, in the same transaction, so registration traffic never
+re-aggregates ``SC``. Rows for data loaded outside the ORM are rebuilt with
+``flask rebuild-workload``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Course, Department, Enrollment, Teacher, TeacherWorkload, Teaching
+from .seats import SEAT_HOLDING_STATUSES, OfferingKey, collect_seat_changes
+from .table_versions import bump_table_versions
+
+# (教师号, 学年, 学期)
+WorkloadKey = Tuple[str, int, str]
+
+_METRIC_COLUMNS = {
+    "offerings": "Offerings",
+    "credit_hours": "CreditHours",
+    "contact_hours": "ContactHours",
+    "enrolled_students": "EnrolledStudents",
+}
+WORKLOAD_METRICS = tuple(_METRIC_COLUMNS)
+
+_WORKLOAD_TABLE = TeacherWorkload.__table__
+_TEACHING_KEY_ATTRS = ("tno", "cno", "year_offered", "term")
+
+
+def _key_filter(key: WorkloadKey) -> Any:
+    tno, year, term = key
+    return and_(
+        _WORKLOAD_TABLE.c.Tno == tno,
+        _WORKLOAD_TABLE.c.YearOffered == year,
+        _WORKLOAD_TABLE.c.Term == term,
+    )
+
+
+def _measure(connection: Connection, key: WorkloadKey) -> Tuple[int, int, int, int]:
+    tno, year, term = key
+    in_term = (Teaching.tno == tno, Teaching.year_offered == year, Teaching.term == term)
+    offerings, credits, hours = connection.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Course.credits), 0),
+            func.coalesce(func.sum(Course.hours), 0),
+        )
+        .select_from(Teaching)
+        .join(Course, Course.cno == Teaching.cno)
+        .where(*in_term)
+    ).one()
+    enrolled = connection.execute(
+        select(func.count())
+        .select_from(Enrollment)
+        .where(
+            Enrollment.cno.in_(select(Teaching.cno).where(*in_term)),
+            Enrollment.year_taken == year,
+            Enrollment.term == term,
+            Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+        )
+    ).scalar()
+    return int(offerings), int(credits), int(hours), int(enrolled or 0)
+
+
+def recompute_workload(connection: Connection, key: WorkloadKey) -> None:
+    """Rewrite one teacher's row for a term from ``Teaching``, ``Course`` and ``SC``."""
+    # 功能：重算单个教师单学期的工作量并写回，没有授课安排时删除该行。
+    offerings, credits, hours, enrolled = _measure(connection, key)
+    if not offerings:
+        connection.execute(delete(_WORKLOAD_TABLE).where(_key_filter(key)))
+        return
+    values = {
+        "Offerings": offerings,
+        "CreditHours": credits,
+        "ContactHours": hours,
+        "EnrolledStudents": enrolled,
+        "UpdatedAt": datetime.utcnow(),
+    }
+    stmt = update(_WORKLOAD_TABLE).where(_key_filter(key)).values(**values)
+    if connection.execute(stmt).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(
+                insert(_WORKLOAD_TABLE).values(Tno=key[0], YearOffered=key[1], Term=key[2], **values)
+            )
+    except IntegrityError:
+        # 并发事务已插入该行，改为覆盖更新
+        connection.execute(stmt)
+
+
+def adjust_enrolled(connection: Connection, key: OfferingKey, delta: int) -> None:
+    """Add ``delta`` seat-holding students to every teacher of the offering ``key``."""
+    cno, year, term = key
+    connection.execute(
+        update(_WORKLOAD_TABLE)
+        .where(
+            _WORKLOAD_TABLE.c.YearOffered == year,
+            _WORKLOAD_TABLE.c.Term == term,
+            _WORKLOAD_TABLE.c.Tno.in_(
+                select(Teaching.tno).where(
+                    Teaching.cno == cno, Teaching.year_offered == year, Teaching.term == term
+                )
+            ),
+        )
+        .values(
+            EnrolledStudents=case(
+                (_WORKLOAD_TABLE.c.EnrolledStudents + delta >= 0, _WORKLOAD_TABLE.c.EnrolledStudents + delta),
+                else_=0,
+            ),
+            UpdatedAt=datetime.utcnow(),
+        )
+    )
+
+
+def _teaching_keys(obj: Teaching, state: str) -> List[WorkloadKey]:
+    current = (obj.tno, int(obj.year_offered), obj.term)
+    if state != "dirty":
+        return [current]
+    attrs = db.inspect(obj).attrs
+    if not any(attrs[name].history.has_changes() for name in _TEACHING_KEY_ATTRS):
+        return []
+
+    def committed(name: str) -> Any:
+        history = attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(obj, name)
+
+    return [current, (committed("tno"), int(committed("year_offered")), committed("term"))]
+
+
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    # 功能：选课变化按开课净增减调整教师的选课人数；授课安排或课程学分/学时变化时重算受影响的行。
+    deltas, _ = collect_seat_changes(session)
+    keys: Set[WorkloadKey] = set()
+    changed_courses: Set[str] = set()
+    for state, objects in (("new", session.new), ("deleted", session.deleted), ("dirty", session.dirty)):
+        for obj in objects:
+            if isinstance(obj, Teaching):
+                keys.update(_teaching_keys(obj, state))
+            elif isinstance(obj, Course) and state == "dirty":
+                attrs = db.inspect(obj).attrs
+                if attrs["credits"].history.has_changes() or attrs["hours"].history.has_changes():
+                    changed_courses.add(obj.cno)
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas and not keys and not changed_courses:
+        return
+    connection = session.connection()
+    if changed_courses:
+        keys.update(
+            (tno, int(year), term)
+            for tno, year, term in connection.execute(
+                select(Teaching.tno, Teaching.year_offered, Teaching.term)
+                .where(Teaching.cno.in_(sorted(changed_courses)))
+                .distinct()
+            )
+        )
+    for key, delta in sorted(deltas.items()):
+        adjust_enrolled(connection, key, delta)
+    # 重算写入的是绝对值，放在增量之后，同一 flush 内两者都涉及的行不会重复计数
+    for key in sorted(keys):
+        recompute_workload(connection, key)
+
+
+def register_workload_listener() -> None:
+    """Hook workload accounting into the shared Flask-SQLAlchemy session."""
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+
+
+def _serialize_row(row: Any) -> Dict[str, Any]:
+    return {
+        "year": row.YearOffered,
+        "term": row.Term,
+        "offerings": row.Offerings,
+        "credit_hours": row.CreditHours,
+        "contact_hours": row.ContactHours,
+        "enrolled_students": row.EnrolledStudents,
+    }
+
+
+def teacher_workload(tno: str, *, year: Optional[int] = None, term: Optional[str] = None) -> Dict[str, Any]:
+    """A teacher's workload per term (newest first) and the totals over those terms."""
+    stmt = select(_WORKLOAD_TABLE).where(_WORKLOAD_TABLE.c.Tno == tno)
+    if year is not None:
+        stmt = stmt.where(_WORKLOAD_TABLE.c.YearOffered == year)
+    if term:
+        stmt = stmt.where(_WORKLOAD_TABLE.c.Term == term)
+    terms = [
+        _serialize_row(row)
+        for row in db.session.execute(
+            stmt.order_by(_WORKLOAD_TABLE.c.YearOffered.desc(), _WORKLOAD_TABLE.c.Term.desc())
+        )
+    ]
+    return {
+        "teacher_id": tno,
+        "terms": terms,
+        "totals": {metric: sum(item[metric] for item in terms) for metric in WORKLOAD_METRICS},
+    }
+
+
+def workload_ranking(
+    *,
+    year: Optional[int] = None,
+    term: Optional[str] = None,
+    metric: str = "contact_hours",
+    dno: Optional[str] = None,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """Departments ranked by total ``metric`` and the top teachers, all from ``TeacherWorkload``.
+
+    With ``dno`` the teacher ranking is limited to that department.
+    """
+    # 功能：直接读取工作量汇总表，按院系汇总排名并给出教师排名，不再联结授课与课程表。
+    if metric not in WORKLOAD_METRICS:
+        raise ValueError(f"metric must be one of {', '.join(WORKLOAD_METRICS)}")
+    column = _WORKLOAD_TABLE.c[_METRIC_COLUMNS[metric]]
+    filters: List[Any] = []
+    if year is not None:
+        filters.append(_WORKLOAD_TABLE.c.YearOffered == year)
+    if term:
+        filters.append(_WORKLOAD_TABLE.c.Term == term)
+
+    per_teacher = (
+        select(_WORKLOAD_TABLE.c.Tno, func.sum(column).label("value"))
+        .where(*filters)
+        .group_by(_WORKLOAD_TABLE.c.Tno)
+        .subquery()
+    )
+    department_rows = db.session.execute(
+        select(
+            Teacher.dno,
+            Department.dname,
+            func.count().label("teachers"),
+            func.sum(per_teacher.c.value).label("total"),
+            func.max(per_teacher.c.value).label("highest"),
+        )
+        .select_from(per_teacher)
+        .join(Teacher, Teacher.tno == per_teacher.c.Tno)
+        .outerjoin(Department, Department.dno == Teacher.dno)
+        .group_by(Teacher.dno, Department.dname)
+        .order_by(func.sum(per_teacher.c.value).desc(), Teacher.dno)
+    ).all()
+    teacher_stmt = (
+        select(Teacher.tno, Teacher.tname, Teacher.dno, per_teacher.c.value)
+        .join(per_teacher, per_teacher.c.Tno == Teacher.tno)
+        .order_by(per_teacher.c.value.desc(), Teacher.tno)
+        .limit(limit)
+    )
+    if dno:
+        teacher_stmt = teacher_stmt.where(Teacher.dno == dno)
+    teacher_rows = db.session.execute(teacher_stmt).all()
+    return {
+        "metric": metric,
+        "year": year,
+        "term": term,
+        "departments": [
+            {
+                "rank": rank,
+                "department_id": row.dno,
+                "department_name": row.dname,
+                "teachers": int(row.teachers),
+                "total": int(row.total or 0),
+                "average": round(float(row.total or 0) / row.teachers, 2) if row.teachers else 0,
+                "highest": int(row.highest or 0),
+            }
+            for rank, row in enumerate(department_rows, start=1)
+        ],
+        "teachers": [
+            {
+                "rank": rank,
+                "teacher_id": row.tno,
+                "teacher_name": row.tname,
+                "department_id": row.dno,
+                "value": int(row.value or 0),
+            }
+            for rank, row in enumerate(teacher_rows, start=1)
+        ],
+    }
+
+
+def rebuild_workload(
+    *, year: Optional[int] = None, term: Optional[str] = None, dry_run: bool = False
+) -> Dict[str, int]:
+    """Recompute ``TeacherWorkload`` from ``Teaching``, ``Course`` and ``SC``; return rows changed."""
+    # 功能：以两条分组聚合重算工作量汇总表，修正导入或手工 SQL 造成的偏差。
+    teaching_filter: List[Any] = []
+    workload_filter: List[Any] = []
+    if year is not None:
+        teaching_filter.append(Teaching.year_offered == year)
+        workload_filter.append(_WORKLOAD_TABLE.c.YearOffered == year)
+    if term:
+        teaching_filter.append(Teaching.term == term)
+        workload_filter.append(_WORKLOAD_TABLE.c.Term == term)
+
+    expected: Dict[WorkloadKey, List[int]] = {
+        (tno, int(y), t): [int(count), int(credits or 0), int(hours or 0), 0]
+        for tno, y, t, count, credits, hours in db.session.execute(
+            select(
+                Teaching.tno,
+                Teaching.year_offered,
+                Teaching.term,
+                func.count(),
+                func.sum(Course.credits),
+                func.sum(Course.hours),
+            )
+            .join(Course, Course.cno == Teaching.cno)
+            .where(*teaching_filter)
+            .group_by(Teaching.tno, Teaching.year_offered, Teaching.term)
+        )
+    }
+    taught = (
+        select(Teaching.tno, Teaching.cno, Teaching.year_offered, Teaching.term)
+        .where(*teaching_filter)
+        .distinct()
+        .subquery()
+    )
+    for tno, y, t, enrolled in db.session.execute(
+        select(taught.c.tno, taught.c.year_offered, taught.c.term, func.count())
+        .join(
+            Enrollment,
+            (Enrollment.cno == taught.c.cno)
+            & (Enrollment.year_taken == taught.c.year_offered)
+            & (Enrollment.term == taught.c.term),
+        )
+        .where(Enrollment.status.in_(SEAT_HOLDING_STATUSES))
+        .group_by(taught.c.tno, taught.c.year_offered, taught.c.term)
+    ):
+        expected[(tno, int(y), t)][3] = int(enrolled)
+
+    current = {
+        (row.Tno, int(row.YearOffered), row.Term): [
+            row.Offerings, row.CreditHours, row.ContactHours, row.EnrolledStudents
+        ]
+        for row in db.session.execute(select(_WORKLOAD_TABLE).where(*workload_filter))
+    }
+    inserts = [key for key in expected if key not in current]
+    updates = [key for key in expected if key in current and current[key] != expected[key]]
+    stale = [key for key in current if key not in expected]
+
+    if not dry_run:
+        now = datetime.utcnow()
+        connection = db.session.connection()
+
+        def values(key: WorkloadKey) -> Dict[str, Any]:
+            offerings, credits, hours, enrolled = expected[key]
+            return {
+                "Offerings": offerings,
+                "CreditHours": credits,
+                "ContactHours": hours,
+                "EnrolledStudents": enrolled,
+                "UpdatedAt": now,
+            }
+
+        if inserts:
+            connection.execute(
+                insert(_WORKLOAD_TABLE),
+                [{"Tno": key[0], "YearOffered": key[1], "Term": key[2], **values(key)} for key in inserts],
+            )
+        for key in updates:
+            connection.execute(update(_WORKLOAD_TABLE).where(_key_filter(key)).values(**values(key)))
+        if stale:
+            connection.execute(delete(_WORKLOAD_TABLE).where(or_(*(_key_filter(key) for key in stale))))
+        if inserts or updates or stale:
+            bump_table_versions(db.session, [_WORKLOAD_TABLE.name])
+        db.session.commit()
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(stale)}
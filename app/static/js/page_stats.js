@@ -0,0 +1,24 @@
+// 管理页的统计卡片与图表数据在首屏渲染后异步获取：
+// 表格随 HTML 直接输出，统计接口返回的字段按 data-stat 名称回填到占位元素。
+(function (window, document) {
+  function fillStats(stats) {
+    document.querySelectorAll('[data-stat]').forEach(function (el) {
+      var key = el.getAttribute('data-stat');
+      if (Object.prototype.hasOwnProperty.call(stats, key)) {
+        el.textContent = stats[key];
+      }
+    });
+  }
+
+  window.loadPageStats = function (url) {
+    return fetch(url, { headers: { Accept: 'application/json' }, credentials: 'same-origin' })
+      .then(function (res) {
+        if (!res.ok) throw new Error('统计数据加载失败：HTTP ' + res.status);
+        return res.json();
+      })
+      .then(function (stats) {
+        fillStats(stats);
+        return stats;
+      });
+  };
+})(window, document);
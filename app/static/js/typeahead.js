@@ -0,0 +1,67 @@
+// 下拉联想：带 data-typeahead="<接口地址>" 的输入框在输入时按前缀查询候选项，
+// 结果写入自动创建的 <datalist>，提交的仍是输入框里的主键值。
+(function (window, document) {
+  var DEBOUNCE_MS = 200;
+  var seq = 0;
+
+  function attach(input) {
+    var url = input.getAttribute('data-typeahead');
+    if (!url || input.dataset.typeaheadReady) return;
+    input.dataset.typeaheadReady = '1';
+
+    var list = document.createElement('datalist');
+    list.id = 'typeahead-' + (++seq);
+    input.insertAdjacentElement('afterend', list);
+    input.setAttribute('list', list.id);
+    input.setAttribute('autocomplete', 'off');
+
+    var timer = null;
+    var lastQuery = null;
+    var controller = null;
+
+    function render(items) {
+      list.innerHTML = '';
+      items.forEach(function (item) {
+        var option = document.createElement('option');
+        option.value = item.value;
+        option.label = item.label;
+        option.textContent = item.label;
+        list.appendChild(option);
+      });
+    }
+
+    function search() {
+      var q = input.value.trim();
+      if (q === lastQuery) return;
+      lastQuery = q;
+      if (controller) controller.abort();
+      controller = window.AbortController ? new AbortController() : null;
+      var sep = url.indexOf('?') === -1 ? '?' : '&';
+      fetch(url + sep + 'q=' + encodeURIComponent(q), {
+        headers: { Accept: 'application/json' },
+        credentials: 'same-origin',
+        signal: controller ? controller.signal : undefined
+      })
+        .then(function (res) { return res.ok ? res.json() : { items: [] }; })
+        .then(function (payload) { render(payload.items || []); })
+        .catch(function (err) { if (err.name !== 'AbortError') console.error(err); });
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(search, DEBOUNCE_MS);
+    });
+    input.addEventListener('focus', search, { once: true });
+  }
+
+  function init(root) {
+    (root || document).querySelectorAll('input[data-typeahead]').forEach(attach);
+  }
+
+  window.initTypeahead = init;
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', function () { init(); });
+  } else {
+    init();
+  }
+})(window, document);
@@ -1,4 +1,4 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listClassrooms = ({
   page = 1,
@@ -8,7 +8,7 @@ export const listClassrooms = ({
   roomNo,
   keyword,
 } = {}) =>
-  request('/api/v1/classrooms/', {
+  batchedRequest('/api/v1/classrooms/', {
     params: {
       page,
       per_page: perPage,
@@ -28,4 +28,4 @@ export const updateClassroom = (roomId, payload) =>
 export const deleteClassroom = (roomId) =>
   request(`/api/v1/classrooms/${roomId}`, { method: 'DELETE' })
 
-export const fetchClassroomMeta = () => request('/api/v1/classrooms/meta')
+export const fetchClassroomMeta = () => batchedRequest('/api/v1/classrooms/meta')
@@ -21,7 +21,7 @@ if (absoluteBase && typeof window !== 'undefined') {
   }
 }
 
-const buildUrl = (path, params = {}) => {
+export const buildUrl = (path, params = {}) => {
   const normalizedPath = path.startsWith('/') ? path : `/${path}`
   const prefix = rawBase ? `${rawBase}${normalizedPath}` : normalizedPath
   const url = absoluteBase ? new URL(prefix) : new URL(prefix, window.location.origin)
@@ -38,6 +38,23 @@ const buildUrl = (path, params = {}) => {
 
 export const getApiBase = () => rawBase || ''
 
+const toRequestError = (payload) => {
+  const message =
+    (payload && payload.error) ||
+    (payload && payload.message) ||
+    (typeof payload === 'string' && payload) ||
+    '请求失败'
+  const normalized = typeof message === 'string' ? message.trimStart() : ''
+  if (
+    normalized.startsWith(INTEGRITY_VIOLATION_PREFIX) &&
+    typeof window !== 'undefined' &&
+    typeof window.alert === 'function'
+  ) {
+    window.alert(message)
+  }
+  return new Error(message)
+}
+
 export async function request(path, options = {}) {
   const { method = 'GET', params, data, headers, signal } = options
   const url = buildUrl(path, params)
@@ -62,21 +79,72 @@ export async function request(path, options = {}) {
   const payload = isJson ? await response.json() : await response.text()
 
   if (!response.ok) {
-    const message =
-      (payload && payload.error) ||
-      (payload && payload.message) ||
-      (typeof payload === 'string' && payload) ||
-      '请求失败'
-    const normalized = typeof message === 'string' ? message.trimStart() : ''
-    if (
-      normalized.startsWith(INTEGRITY_VIOLATION_PREFIX) &&
-      typeof window !== 'undefined' &&
-      typeof window.alert === 'function'
-    ) {
-      window.alert(message)
-    }
-    throw new Error(message)
+    throw toRequestError(payload)
   }
 
   return payload
 }
+
+const BATCH_PATH = '/api/v1/batch'
+let pendingBatch = null
+
+const compactParams = (params = {}) =>
+  Object.fromEntries(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== ''),
+  )
+
+const flushBatch = async (queue) => {
+  if (queue.length === 1) {
+    const [entry] = queue
+    request(entry.path, entry.options).then(entry.resolve, entry.reject)
+    return
+  }
+
+  try {
+    const payload = await request(BATCH_PATH, {
+      method: 'POST',
+      data: {
+        requests: queue.map((entry) => ({
+          method: 'GET',
+          path: entry.path,
+          params: compactParams(entry.options.params),
+        })),
+      },
+    })
+    payload.responses.forEach((result, index) => {
+      const entry = queue[index]
+      if (result.status >= 200 && result.status < 300) {
+        entry.resolve(result.body)
+      } else {
+        entry.reject(toRequestError(result.body))
+      }
+    })
+  } catch (err) {
+    queue.forEach((entry) => entry.reject(err))
+  }
+}
+
+// 同一事件循环内发起的 GET 请求合并为一次 /api/v1/batch 调用；写请求与可取消请求照常单独发送
+export function batchedRequest(path, options = {}) {
+  const { method = 'GET', signal } = options
+  if (method !== 'GET' || signal) {
+    return request(path, options)
+  }
+
+  return new Promise((resolve, reject) => {
+    if (!pendingBatch) {
+      const queue = []
+      pendingBatch = queue
+      setTimeout(() => {
+        pendingBatch = null
+        flushBatch(queue)
+      }, 0)
+    }
+    pendingBatch.push({
+      path: path.startsWith('/') ? path : `/${path}`,
+      options,
+      resolve,
+      reject,
+    })
+  })
+}
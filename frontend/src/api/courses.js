@@ -1,4 +1,4 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listCourses = ({
   page = 1,
@@ -8,7 +8,7 @@ export const listCourses = ({
   name,
   includeInactive = false,
 } = {}) => {
-  return request('/api/v1/courses/', {
+  return batchedRequest('/api/v1/courses/', {
     params: {
       page,
       per_page: perPage,
@@ -20,7 +20,7 @@ export const listCourses = ({
   })
 }
 
-export const getCourse = (cno) => request(`/api/v1/courses/${cno}`)
+export const getCourse = (cno) => batchedRequest(`/api/v1/courses/${cno}`)
 
 export const createCourse = (payload) => request('/api/v1/courses/', { method: 'POST', data: payload })
 
@@ -29,4 +29,4 @@ export const updateCourse = (cno, payload) =>
 
 export const deleteCourse = (cno) => request(`/api/v1/courses/${cno}`, { method: 'DELETE' })
 
-export const fetchCourseMeta = () => request('/api/v1/courses/meta')
+export const fetchCourseMeta = () => batchedRequest('/api/v1/courses/meta')
@@ -1,3 +1,10 @@
-import { request } from './client'
+import { batchedRequest, buildUrl } from './client'
 
-export const fetchDashboardSummary = () => request('/api/v1/analytics/dashboard')
+export const fetchDashboardSummary = () => batchedRequest('/api/v1/analytics/dashboard')
+
+// 增删改查热力图单独取数：操作汇总每次请求都会变化，不随仪表盘统计一起协商缓存
+export const fetchOperationHeatmap = () => batchedRequest('/api/v1/analytics/heatmap')
+
+// 选课变更的 SSE 推送：先收到 snapshot（最近选课），之后每次变更推送一条 enrollment 事件
+export const openEnrollmentStream = () =>
+  new EventSource(buildUrl('/api/v1/analytics/stream'), { withCredentials: true })
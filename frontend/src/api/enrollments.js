@@ -1,4 +1,4 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listEnrollments = ({
   page = 1,
@@ -10,7 +10,7 @@ export const listEnrollments = ({
   term,
   keyword,
 } = {}) => {
-  return request('/api/v1/enrollments/', {
+  return batchedRequest('/api/v1/enrollments/', {
     params: {
       page,
       per_page: perPage,
@@ -25,7 +25,7 @@ export const listEnrollments = ({
 }
 
 export const getEnrollment = (studentId, courseId) =>
-  request(`/api/v1/enrollments/${studentId}/${courseId}`)
+  batchedRequest(`/api/v1/enrollments/${studentId}/${courseId}`)
 
 export const createEnrollment = (payload) =>
   request('/api/v1/enrollments/', { method: 'POST', data: payload })
@@ -36,4 +36,4 @@ export const updateEnrollment = (studentId, courseId, payload) =>
 export const deleteEnrollment = (studentId, courseId) =>
   request(`/api/v1/enrollments/${studentId}/${courseId}`, { method: 'DELETE' })
 
-export const fetchEnrollmentMeta = () => request('/api/v1/enrollments/meta')
+export const fetchEnrollmentMeta = () => batchedRequest('/api/v1/enrollments/meta')
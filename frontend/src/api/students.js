@@ -1,4 +1,4 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listStudents = ({
   page = 1,
@@ -9,7 +9,7 @@ export const listStudents = ({
   name,
   keyword,
 } = {}) => {
-  return request('/api/v1/students/', {
+  return batchedRequest('/api/v1/students/', {
     params: {
       page,
       per_page: perPage,
@@ -22,7 +22,7 @@ export const listStudents = ({
   })
 }
 
-export const getStudent = (sno) => request(`/api/v1/students/${sno}`)
+export const getStudent = (sno) => batchedRequest(`/api/v1/students/${sno}`)
 
 export const createStudent = (payload) => request('/api/v1/students/', { method: 'POST', data: payload })
 
@@ -31,4 +31,4 @@ export const updateStudent = (sno, payload) =>
 
 export const deleteStudent = (sno) => request(`/api/v1/students/${sno}`, { method: 'DELETE' })
 
-export const fetchStudentMeta = () => request('/api/v1/students/meta')
+export const fetchStudentMeta = () => batchedRequest('/api/v1/students/meta')
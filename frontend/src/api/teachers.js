@@ -1,4 +1,4 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listTeachers = ({
   page = 1,
@@ -10,7 +10,7 @@ export const listTeachers = ({
   phone,
   keyword,
 } = {}) =>
-  request('/api/v1/teachers/', {
+  batchedRequest('/api/v1/teachers/', {
     params: {
       page,
       per_page: perPage,
@@ -30,4 +30,4 @@ export const updateTeacher = (tno, payload) =>
 
 export const deleteTeacher = (tno) => request(`/api/v1/teachers/${tno}`, { method: 'DELETE' })
 
-export const fetchTeacherMeta = () => request('/api/v1/teachers/meta')
+export const fetchTeacherMeta = () => batchedRequest('/api/v1/teachers/meta')
@@ -1,7 +1,7 @@
-import { request } from './client'
+import { batchedRequest, request } from './client'
 
 export const listTeachings = ({ page = 1, perPage = 20, course, teacher, term, year } = {}) =>
-  request('/api/v1/teachings/', {
+  batchedRequest('/api/v1/teachings/', {
     params: {
       page,
       per_page: perPage,
@@ -21,4 +21,4 @@ export const updateTeaching = (teachId, payload) =>
 export const deleteTeaching = (teachId) =>
   request(`/api/v1/teachings/${teachId}`, { method: 'DELETE' })
 
-export const fetchTeachingMeta = () => request('/api/v1/teachings/meta')
+export const fetchTeachingMeta = () => batchedRequest('/api/v1/teachings/meta')
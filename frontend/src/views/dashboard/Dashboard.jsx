@@ -19,7 +19,11 @@ import CIcon from '@coreui/icons-react'
 import { cilBuilding, cilBook, cilPeople, cilSpreadsheet } from '@coreui/icons'
 import { CChartBar, CChartDoughnut } from '@coreui/react-chartjs'
 
-import { fetchDashboardSummary } from 'src/api/dashboard'
+import {
+  fetchDashboardSummary,
+  fetchOperationHeatmap,
+  openEnrollmentStream,
+} from 'src/api/dashboard'
 
 const statCards = [
   { key: 'students', label: '学生总数', icon: cilPeople },
@@ -42,10 +46,27 @@ const heatmapColumns = [
   { key: 'delete', label: '删' },
 ]
 
+const RECENT_LIMIT = 8
+
+// 把一条推送的选课事件合并进最近选课列表：同一学生-课程原地更新状态，删除则移除；
+// 列表与后端一致按选课日期倒序，改成绩、退课不会把旧记录顶到最前
+const mergeRecentEnrollment = (list, event) => {
+  const { kind, ...item } = event
+  const rest = list.filter(
+    (row) => row.student_id !== item.student_id || row.course_id !== item.course_id,
+  )
+  if (kind === 'deleted') return rest
+  return [item, ...rest]
+    .sort((a, b) => (b.enroll_date ?? '').localeCompare(a.enroll_date ?? ''))
+    .slice(0, RECENT_LIMIT)
+}
+
 const Dashboard = () => {
   const [summary, setSummary] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [liveRecent, setLiveRecent] = useState(null)
+  const [crudHeatmap, setCrudHeatmap] = useState([])
 
   useEffect(() => {
     const load = async () => {
@@ -64,6 +85,26 @@ const Dashboard = () => {
     load()
   }, [])
 
+  useEffect(() => {
+    // 热力图失败不影响仪表盘其余部分，保持空表
+    fetchOperationHeatmap()
+      .then((data) => setCrudHeatmap(data?.crud_heatmap ?? []))
+      .catch(() => setCrudHeatmap([]))
+  }, [])
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined
+    const source = openEnrollmentStream()
+    source.addEventListener('snapshot', (event) => {
+      setLiveRecent(JSON.parse(event.data).recent_enrollments ?? [])
+    })
+    source.addEventListener('enrollment', (event) => {
+      const item = JSON.parse(event.data)
+      setLiveRecent((prev) => mergeRecentEnrollment(prev ?? [], item))
+    })
+    return () => source.close()
+  }, [])
+
   const courseChartData = useMemo(() => {
     const labels = summary?.top_courses?.labels ?? []
     const values = summary?.top_courses?.values ?? []
@@ -117,7 +158,6 @@ const Dashboard = () => {
     }))
   }, [summary])
 
-  const crudHeatmap = summary?.crud_heatmap ?? []
   const heatmapMax = useMemo(() => {
     if (crudHeatmap.length === 0) return 0
     return crudHeatmap.reduce((max, row) => {
@@ -172,7 +212,7 @@ const Dashboard = () => {
   const totals = summary?.totals ?? {}
   const activeTerms = summary?.active_terms ?? []
   const topCourses = summary?.top_courses?.rows ?? []
-  const recentEnrollments = summary?.recent_enrollments ?? []
+  const recentEnrollments = liveRecent ?? summary?.recent_enrollments ?? []
 
   return (
     <>
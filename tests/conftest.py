@@ -0,0 +1,33 @@
+"""Shared fixtures: an application bound to a throwaway SQLite database."""
+
+from __future__ import annotations
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+
+@pytest.fixture()
+def app(tmp_path):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SWR_CACHE_BACKEND = "memory"
+        AUDIT_LOG_ENABLED = False
+        COMPRESS_MIN_SIZE = 0
+        ENROLLMENT_STREAM_MAX_SECONDS = 30.0
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
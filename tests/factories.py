@@ -0,0 +1,65 @@
+"""Minimal row builders shared by the tests; each adds to ``db.session`` without committing."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Optional, Tuple
+
+from app.extensions import db
+from app.models import Classroom, Course, Student, Teacher, Teaching, TeachingSlot, TermDict
+
+
+def term(code: str = "2024FAL", name: str = "2024 Fall") -> str:
+    db.session.add(TermDict(term_code=code, term_name=name))
+    return code
+
+
+def course(cno: str, *, credits: int = 3, hours: int = 48, prereq: Optional[str] = None) -> Course:
+    obj = Course(cno=cno, cname=f"Course {cno}", credits=credits, hours=hours, prereq_cno=prereq)
+    db.session.add(obj)
+    return obj
+
+
+def student(sno: str) -> Student:
+    obj = Student(sno=sno, sname=f"Student {sno}", gender="Other", enroll_year=2024)
+    db.session.add(obj)
+    return obj
+
+
+def teacher(tno: str = "T001") -> Teacher:
+    obj = Teacher(tno=tno, tname=f"Teacher {tno}", title="Lecturer")
+    db.session.add(obj)
+    return obj
+
+
+def classroom(room_id: str, capacity: int = 60) -> Classroom:
+    obj = Classroom(room_id=room_id, building="Main", room_no=room_id, capacity=capacity)
+    db.session.add(obj)
+    return obj
+
+
+def teaching(
+    cno: str,
+    *,
+    tno: str = "T001",
+    year: int = 2024,
+    term_code: str = "2024FAL",
+    capacity: int = 30,
+    room_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    slots: Iterable[Tuple[int, int]] = (),
+) -> Teaching:
+    obj = Teaching(
+        cno=cno,
+        tno=tno,
+        year_offered=year,
+        term=term_code,
+        capacity=capacity,
+        room_id=room_id,
+        start_date=start,
+        end_date=end,
+    )
+    obj.slots = [TeachingSlot(weekday=weekday, period=period) for weekday, period in slots]
+    db.session.add(obj)
+    return obj
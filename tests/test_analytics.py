@@ -0,0 +1,30 @@
+"""Tests for the analytics endpoints."""
+
+from __future__ import annotations
+
+
+def test_dashboard_etag_survives_logged_reads(app, client):
+    app.config["AUDIT_LOG_ENABLED"] = True
+    from app.services import init_operation_log
+
+    writer = init_operation_log(app)
+    first = client.get("/api/v1/analytics/dashboard")
+    assert first.status_code == 200
+    assert "crud_heatmap" not in first.get_json()
+    etag = first.headers["ETag"]
+
+    # 读取会写入操作日志与小时汇总，但不应改变仪表盘的 ETag
+    client.get("/api/v1/classrooms/")
+    writer.flush()
+    again = client.get("/api/v1/analytics/dashboard", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    writer.close()
+
+
+def test_heatmap_is_short_lived_without_etag(app, client):
+    response = client.get("/api/v1/analytics/heatmap")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.headers["Cache-Control"] == f"private, max-age={app.config['AUDIT_HEATMAP_MAX_AGE']}"
+    tables = [row["table"] for row in response.get_json()["crud_heatmap"]]
+    assert tables == ["学生", "课程", "教师", "教室", "选课", "授课安排"]
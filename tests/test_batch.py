@@ -0,0 +1,50 @@
+"""Tests for the ``/api/v1/batch`` endpoint."""
+
+from __future__ import annotations
+
+import time
+
+
+def test_streaming_sub_request_is_rejected_without_draining(client):
+    started = time.monotonic()
+    response = client.post(
+        "/api/v1/batch",
+        json={"requests": [{"id": "sse", "path": "/api/v1/analytics/stream"}, {"path": "/api/v1/classrooms/"}]},
+    )
+    assert time.monotonic() - started < 5
+    assert response.status_code == 200
+    stream, classrooms = response.get_json()["responses"]
+    assert stream["id"] == "sse"
+    assert stream["status"] == 400
+    assert "Streaming" in stream["body"]["error"]
+    assert classrooms["status"] == 200
+
+
+def test_sub_request_accept_encoding_is_ignored(client):
+    response = client.post(
+        "/api/v1/batch",
+        json={"requests": [{"path": "/api/v1/classrooms/", "headers": {"Accept-Encoding": "gzip, br"}}]},
+    )
+    assert response.status_code == 200
+    (entry,) = response.get_json()["responses"]
+    assert entry["status"] == 200
+    assert entry["body"] is not None
+    assert "Content-Encoding" not in entry["headers"]
+
+
+def test_parallel_sub_requests_ignore_accept_encoding(client):
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "parallel": True,
+            "requests": [
+                {"path": "/api/v1/classrooms/", "headers": {"accept-encoding": "gzip"}},
+                {"path": "/api/v1/courses/", "headers": {"accept-encoding": "gzip"}},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    for entry in response.get_json()["responses"]:
+        assert entry["status"] == 200
+        assert entry["body"] is not None
+        assert "Content-Encoding" not in entry["headers"]
@@ -0,0 +1,24 @@
+"""Tests for the classroom endpoints."""
+
+from __future__ import annotations
+
+from app.extensions import db
+from tests import factories
+
+
+def test_classroom_etag_changes_when_a_teaching_is_added(app, client):
+    with app.app_context():
+        factories.term()
+        factories.teacher()
+        factories.course("C100")
+        factories.classroom("R1")
+        db.session.commit()
+    first = client.get("/api/v1/classrooms/R1")
+    assert first.get_json()["teaching_count"] == 0
+
+    with app.app_context():
+        factories.teaching("C100", room_id="R1")
+        db.session.commit()
+    again = client.get("/api/v1/classrooms/R1", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 200
+    assert again.get_json()["teaching_count"] == 1
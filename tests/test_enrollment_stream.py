@@ -0,0 +1,70 @@
+"""Tests for the dashboard's recent enrollments served by :class:`EnrollmentFeed`."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Course, Enrollment, Student, TermDict
+from app.services import get_enrollment_feed
+
+
+def _seed(count: int) -> None:
+    db.session.add(TermDict(term_code="2024FAL", term_name="2024 Fall"))
+    db.session.add(Course(cno="C001", cname="Databases", credits=3, hours=48))
+    start = datetime(2024, 9, 1)
+    for index in range(count):
+        sno = f"S{index:03d}"
+        db.session.add(Student(sno=sno, sname=f"Student {index}", gender="Other", enroll_year=2024))
+        db.session.add(
+            Enrollment(
+                sno=sno,
+                cno="C001",
+                year_taken=2024,
+                term="2024FAL",
+                status="enrolled",
+                enroll_date=start + timedelta(days=index),
+            )
+        )
+    db.session.commit()
+
+
+def _ids(rows):
+    return [row["student_id"] for row in rows]
+
+
+def test_recent_keeps_enroll_date_order_after_updates(app):
+    with app.app_context():
+        _seed(5)
+        feed = get_enrollment_feed()
+        assert _ids(feed.recent(3)) == ["S004", "S003", "S002"]
+
+        # 给最早的选课记录改成绩、退课都不应把它顶到最前
+        oldest = db.session.get(Enrollment, ("S000", "C001"))
+        oldest.grade = 95
+        db.session.commit()
+        newest = db.session.get(Enrollment, ("S004", "C001"))
+        newest.status = "dropped"
+        db.session.commit()
+        feed.poll()
+
+        recent = feed.recent(3)
+        assert _ids(recent) == ["S004", "S003", "S002"]
+        assert recent[0]["status"] == "dropped"
+        assert _ids(feed.recent(5))[-1] == "S000"
+        assert feed.recent(5)[-1]["grade"] == 95.0
+
+
+def test_recent_refills_after_deletes(app):
+    app.config["ENROLLMENT_STREAM_BUFFER"] = 2
+    with app.app_context():
+        _seed(4)
+        feed = get_enrollment_feed()
+        feed.capacity = 2
+        assert _ids(feed.recent(2)) == ["S003", "S002"]
+
+        db.session.delete(db.session.get(Enrollment, ("S003", "C001")))
+        db.session.commit()
+        feed.poll()
+
+        assert _ids(feed.recent(2)) == ["S002", "S001"]
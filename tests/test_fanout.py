@@ -0,0 +1,51 @@
+"""Tests for :func:`app.services.fanout.fan_out`."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.services import FanOutTimeout, fan_out
+from app.services.fanout import _executor
+
+
+def test_queued_queries_run_on_the_calling_thread(app):
+    release = threading.Event()
+    app.config.update(FANOUT_MAX_WORKERS=2, FANOUT_TIMEOUT=0.5)
+    # 占满线程池，后续查询只能由请求线程执行，排队不应触发超时
+    pool = _executor(2)
+    blockers = [pool.submit(release.wait, 5) for _ in range(2)]
+    try:
+        with app.app_context():
+            caller = threading.get_ident()
+            results = fan_out({"x": lambda s: threading.get_ident(), "y": lambda s: (time.sleep(0.6), 1)[1]})
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+    assert results == {"x": caller, "y": 1}
+
+
+def test_slow_pooled_query_times_out(app):
+    app.config.update(FANOUT_MAX_WORKERS=4)
+    pooled_started = threading.Event()
+    release = threading.Event()
+
+    def query(_session):
+        # 线程池中的查询一直阻塞；请求线程就地认领的查询等到另一条已在线程池中开始，
+        # 因此无论调度顺序如何，总有一条查询在线程池中执行并超时
+        if threading.get_ident() == caller:
+            pooled_started.wait(5)
+        else:
+            pooled_started.set()
+            release.wait(5)
+
+    with app.app_context():
+        caller = threading.get_ident()
+        try:
+            with pytest.raises(FanOutTimeout):
+                fan_out({"a": query, "b": query}, timeout=0.1)
+        finally:
+            release.set()
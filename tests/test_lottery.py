@@ -0,0 +1,109 @@
+"""Tests for lottery allocation of registration rounds."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select, update
+
+from app.extensions import db
+from app.models import Enrollment, EnrollmentEvent, OperationLog, RegistrationRound
+from app.services import RoundClosedError, allocate_round, create_round, submit_requests
+from tests import factories
+
+
+def _round_with_requests():
+    factories.term()
+    factories.teacher()
+    factories.course("C100")
+    factories.teaching("C100", capacity=5)
+    for sno in ("S1", "S2"):
+        factories.student(sno)
+    db.session.commit()
+    registration_round = create_round(2024, "2024FAL", seed=7)
+    for sno in ("S1", "S2"):
+        submit_requests(registration_round, sno, ["C100"])
+    return registration_round.round_id
+
+
+def test_second_allocation_is_rejected_while_claimed(app):
+    with app.app_context():
+        round_id = _round_with_requests()
+        stale = db.session.get(RegistrationRound, round_id)
+        assert stale.status == "open"
+        # 另一进程已认领该轮次，本会话中的轮次对象仍是读取时的 open
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(RegistrationRound.__table__)
+                .where(RegistrationRound.__table__.c.RoundID == round_id)
+                .values(Status="allocating")
+            )
+        with pytest.raises(RoundClosedError):
+            allocate_round(round_id)
+        assert db.session.scalars(select(Enrollment)).all() == []
+
+
+def test_allocation_writes_enrollment_events_and_operation_log(app):
+    app.config["AUDIT_LOG_ENABLED"] = True
+    from app.services import init_operation_log
+
+    writer = init_operation_log(app)
+    with app.app_context():
+        round_id = _round_with_requests()
+        writer.flush()
+        report = allocate_round(round_id)
+        assert report["outcomes"]["assigned"] == 2
+        assert db.session.get(RegistrationRound, round_id).status == "allocated"
+        events = db.session.execute(select(EnrollmentEvent.kind, EnrollmentEvent.sno)).all()
+        assert sorted(events) == [("created", "S1"), ("created", "S2")]
+        writer.flush()
+        logged = db.session.execute(
+            select(OperationLog.operation, OperationLog.record_key).where(OperationLog.table_name == "SC")
+        ).all()
+        assert len(logged) == 2 and {operation for operation, _ in logged} == {"create"}
+        with pytest.raises(RoundClosedError):
+            allocate_round(round_id)
+    writer.close()
+
+
+def test_failed_allocation_reopens_round(app, monkeypatch):
+    with app.app_context():
+        round_id = _round_with_requests()
+
+        def fail(*_args, **_kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr("app.services.lottery.take_seats", fail)
+        with pytest.raises(RuntimeError):
+            allocate_round(round_id)
+        assert db.session.get(RegistrationRound, round_id).status == "open"
+
+
+def test_allocation_skips_requests_that_clash_with_the_timetable(app, monkeypatch):
+    monkeypatch.setattr(app.extensions["waitlist_promoter"], "enqueue", lambda keys: None)
+    with app.app_context():
+        factories.term()
+        factories.teacher()
+        # C100 两个班都在周一第 1 节；C200 另有周二的班，不算冲突；C300 只在周一
+        factories.course("C100")
+        factories.teaching("C100", capacity=5, slots=[(1, 1)])
+        factories.teaching("C100", capacity=5, slots=[(1, 1), (3, 2)])
+        factories.course("C200")
+        factories.teaching("C200", capacity=5, slots=[(1, 1)])
+        factories.teaching("C200", capacity=5, slots=[(2, 1)])
+        factories.course("C300")
+        factories.teaching("C300", capacity=5, slots=[(1, 1)])
+        factories.student("S1")
+        factories.student("S2")
+        db.session.commit()
+        db.session.add(Enrollment(sno="S2", cno="C300", year_taken=2024, term="2024FAL", status="enrolled"))
+        db.session.commit()
+        registration_round = create_round(2024, "2024FAL", seed=7)
+        submit_requests(registration_round, "S1", ["C100", "C200", "C300"])
+        submit_requests(registration_round, "S2", ["C100"])
+
+        report = allocate_round(registration_round.round_id)
+
+        assert report["outcomes"]["assigned"] == 2
+        assert report["outcomes"]["clash"] == 2
+        held = db.session.execute(select(Enrollment.sno, Enrollment.cno).order_by(Enrollment.sno, Enrollment.cno))
+        assert held.all() == [("S1", "C100"), ("S1", "C200"), ("S2", "C300")]
@@ -0,0 +1,70 @@
+"""Tests for the transactional room booking check."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import func, insert, select
+
+from app.extensions import db
+from app.models import Teaching
+from app.services import get_room_booking_index
+from tests import factories
+
+
+def _setup(app) -> int:
+    with app.app_context():
+        factories.term()
+        factories.teacher()
+        factories.course("C100")
+        factories.course("C200")
+        factories.classroom("R101")
+        other = factories.teaching("C200")
+        db.session.commit()
+        # 先加载索引，再绕过 ORM 写入一条预订，模拟其他 worker 刚提交、变更总线尚未送达的情况
+        assert get_room_booking_index().conflicts("R101", date(2024, 9, 1), date(2024, 12, 31)) == []
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(Teaching.__table__).values(
+                    Cno="C100",
+                    Tno="T001",
+                    YearOffered=2024,
+                    Term="2024FAL",
+                    RoomID="R101",
+                    Capacity=30,
+                    StartDate=date(2024, 9, 1),
+                    EndDate=date(2024, 12, 31),
+                )
+            )
+        return other.teach_id
+
+
+def test_create_rejects_booking_the_index_has_not_seen(app, client):
+    _setup(app)
+    response = client.post(
+        "/api/v1/teachings/",
+        json={
+            "course_id": "C200",
+            "teacher_id": "T001",
+            "year": 2024,
+            "term": "2024FAL",
+            "room_id": "R101",
+            "start_date": "2024-10-01",
+            "end_date": "2024-10-31",
+        },
+    )
+    assert response.status_code == 409
+    assert [item["start_date"] for item in response.get_json()["conflicts"]] == ["2024-09-01"]
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Teaching).where(Teaching.room_id == "R101")) == 1
+
+
+def test_update_rejects_booking_the_index_has_not_seen(app, client):
+    teach_id = _setup(app)
+    response = client.put(
+        f"/api/v1/teachings/{teach_id}",
+        json={"room_id": "R101", "start_date": "2024-12-01", "end_date": "2025-01-15"},
+    )
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.get(Teaching, teach_id).room_id is None
@@ -0,0 +1,20 @@
+"""Tests for the stale-while-revalidate cache."""
+
+from __future__ import annotations
+
+from app.caching import get_swr_cache
+
+
+def test_result_computed_across_an_invalidation_is_not_stored(app):
+    with app.app_context():
+        cache = get_swr_cache()
+
+        def compute():
+            # 计算过程中有写入提交，依赖表的缓存被失效
+            cache.invalidate_tables(["SC"])
+            return "before-write"
+
+        assert cache.get_or_compute("dashboard", compute, tables=["SC"]) == "before-write"
+        assert cache.backend.get("dashboard") is None
+        assert cache.get_or_compute("dashboard", lambda: "after-write", tables=["SC"]) == "after-write"
+        assert cache.backend.get("dashboard").value == "after-write"
@@ -0,0 +1,102 @@
+"""Tests for per-section timetable clash detection."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+
+from app.extensions import db
+from app.models import Enrollment
+from app.services import TimetableClashError, check_timetable, student_timetable
+from app.services.timetable import term_clash_report
+from tests import factories
+
+
+def _offerings(sections):
+    factories.term()
+    factories.teacher()
+    factories.student("S1")
+    for cno, slot_lists in sections.items():
+        factories.course(cno)
+        for slots in slot_lists:
+            factories.teaching(cno, slots=slots)
+    db.session.commit()
+
+
+def _hold(cno):
+    db.session.add(Enrollment(sno="S1", cno=cno, year_taken=2024, term="2024FAL", status="enrolled"))
+    db.session.commit()
+
+
+def test_new_offering_fits_when_one_section_is_free(app):
+    with app.app_context():
+        _offerings({"C100": [[(1, 1)], [(2, 1)]], "C200": [[(1, 1)]]})
+        _hold("C200")
+        check_timetable("S1", "C100", 2024, "2024FAL")
+
+
+def test_new_offering_is_rejected_when_every_section_clashes(app):
+    with app.app_context():
+        _offerings({"C100": [[(1, 1)], [(1, 1), (2, 2)]], "C200": [[(1, 1)]]})
+        _hold("C200")
+        with pytest.raises(TimetableClashError) as info:
+            check_timetable("S1", "C100", 2024, "2024FAL")
+        assert info.value.clashes == [{"course_id": "C200", "slots": [{"weekday": 1, "period": 1}]}]
+
+
+def test_held_offering_blocks_only_when_all_its_sections_clash(app):
+    with app.app_context():
+        # 已选 C200 的两个班分别在周一、周二第 1 节，C100 只占周一，学生仍可上周二的班
+        _offerings({"C100": [[(1, 1)]], "C200": [[(1, 1)], [(2, 1)]], "C300": [[(1, 1), (2, 1)]]})
+        _hold("C200")
+        check_timetable("S1", "C100", 2024, "2024FAL")
+        with pytest.raises(TimetableClashError):
+            check_timetable("S1", "C300", 2024, "2024FAL")
+
+
+def test_timetable_and_report_use_sections(app):
+    with app.app_context():
+        _offerings({"C100": [[(1, 1)]], "C200": [[(1, 1), (3, 1)], [(2, 1), (3, 1)]], "C300": [[(3, 1)]]})
+        _hold("C100")
+        _hold("C200")
+        _hold("C300")
+        timetable = student_timetable("S1", 2024, "2024FAL")
+        by_course = {course["course_id"]: course for course in timetable["courses"]}
+        assert by_course["C200"]["slots"] == [{"weekday": 3, "period": 1}]
+        assert len(by_course["C200"]["sections"]) == 2
+        assert timetable["occupied"] == [{"weekday": 1, "period": 1}, {"weekday": 3, "period": 1}]
+        report = term_clash_report(2024, "2024FAL")
+        assert [item["courses"] for item in report["clashes"]] == [["C200", "C300"]]
+
+
+def test_locked_check_locks_the_student_row(app):
+    with app.app_context():
+        _offerings({"C100": [[(1, 1)]]})
+        statements = []
+
+        def capture(state):
+            statements.append(str(state.statement.compile(dialect=mysql.dialect())))
+
+        event.listen(db.session, "do_orm_execute", capture)
+        try:
+            check_timetable("S1", "C100", 2024, "2024FAL", lock=True)
+        finally:
+            event.remove(db.session, "do_orm_execute", capture)
+        assert any("FROM `Student`" in sql and sql.endswith("FOR UPDATE") for sql in statements)
+        assert any("FROM `SC`" in sql and sql.endswith("LOCK IN SHARE MODE") for sql in statements)
+
+
+def test_web_update_rejects_reactivation_that_clashes(app, client):
+    with app.app_context():
+        _offerings({"C100": [[(1, 1)]], "C200": [[(1, 1)]]})
+        _hold("C200")
+        db.session.add(Enrollment(sno="S1", cno="C100", year_taken=2024, term="2024FAL", status="dropped"))
+        db.session.commit()
+    response = client.post(
+        "/enrollments/S1/C100/update",
+        data={"year_taken": "2024", "term": "2024FAL", "status": "enrolled"},
+    )
+    assert response.status_code == 302
+    with app.app_context():
+        assert db.session.get(Enrollment, ("S1", "C100")).status == "dropped"
@@ -0,0 +1,73 @@
+"""Tests for waitlist promotion."""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Enrollment, Waitlist
+from app.services import promote_waitlist
+from tests import factories
+
+
+def test_promotion_skips_students_with_timetable_clash(app, monkeypatch):
+    # 关掉后台递补，由测试同步调用
+    monkeypatch.setattr(app.extensions["waitlist_promoter"], "enqueue", lambda keys: None)
+    with app.app_context():
+        factories.term()
+        factories.teacher()
+        factories.course("C100")
+        factories.course("C200")
+        factories.teaching("C100", capacity=1, slots=[(1, 1)])
+        factories.teaching("C200", capacity=10, slots=[(1, 1)])
+        for sno in ("S1", "S2", "S3"):
+            factories.student(sno)
+        db.session.commit()
+        db.session.add(Enrollment(sno="S3", cno="C100", year_taken=2024, term="2024FAL", status="enrolled"))
+        # S1 已选的 C200 与 C100 同在周一第 1 节
+        db.session.add(Enrollment(sno="S1", cno="C200", year_taken=2024, term="2024FAL", status="enrolled"))
+        db.session.commit()
+        db.session.add(Waitlist(sno="S1", cno="C100", year_taken=2024, term="2024FAL"))
+        db.session.add(Waitlist(sno="S2", cno="C100", year_taken=2024, term="2024FAL"))
+        db.session.commit()
+
+        db.session.delete(db.session.get(Enrollment, ("S3", "C100")))
+        db.session.commit()
+        promoted = promote_waitlist(("C100", 2024, "2024FAL"))
+
+        assert promoted == ["S2"]
+        assert db.session.get(Enrollment, ("S1", "C100")) is None
+        assert db.session.scalars(select(Waitlist.sno)).all() == ["S1"]
+
+
+def test_promotion_retries_when_free_seat_count_is_stale(app, monkeypatch):
+    monkeypatch.setattr(app.extensions["waitlist_promoter"], "enqueue", lambda keys: None)
+    from app.services import waitlist
+
+    real_free_seats = waitlist._free_seats
+    calls = []
+
+    def stale_free_seats(key, batch_size):
+        # 第一次返回过期的空位数，挑选中途的自动 flush 会因名额不足而失败
+        calls.append(key)
+        return 3 if len(calls) == 1 else real_free_seats(key, batch_size)
+
+    monkeypatch.setattr(waitlist, "_free_seats", stale_free_seats)
+    with app.app_context():
+        factories.term()
+        factories.teacher()
+        factories.course("C100")
+        factories.teaching("C100", capacity=1)
+        for sno in ("S1", "S2", "S3"):
+            factories.student(sno)
+        db.session.commit()
+        for sno in ("S1", "S2", "S3"):
+            db.session.add(Waitlist(sno=sno, cno="C100", year_taken=2024, term="2024FAL"))
+        db.session.commit()
+
+        promoted = promote_waitlist(("C100", 2024, "2024FAL"))
+
+        assert len(calls) >= 2
+        assert promoted == ["S1"]
+        assert db.session.scalars(select(Enrollment.sno)).all() == ["S1"]
+        assert db.session.scalars(select(Waitlist.sno).order_by(Waitlist.wait_id)).all() == ["S2", "S3"]